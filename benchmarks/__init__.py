@@ -0,0 +1,12 @@
+"""
+This file is part of Filmot API wrapper.
+
+Filmot API is free software: you can redistribute it and/or modify
+it under the terms of the MIT License as published by the Massachusetts
+Institute of Technology.
+
+For full details, please see the LICENSE file located in the root
+directory of this project.
+
+Benchmarks of the Filmot client against a local mock server, run with: python -m benchmarks --help
+"""
@@ -0,0 +1,83 @@
+"""
+This file is part of Filmot API wrapper.
+
+Filmot API is free software: you can redistribute it and/or modify
+it under the terms of the MIT License as published by the Massachusetts
+Institute of Technology.
+
+For full details, please see the LICENSE file located in the root
+directory of this project.
+
+Run the benchmarks, print a summary and optionally save the results as json, e.g.
+
+    python -m benchmarks --output bench.json
+    python -m benchmarks --latency-ms 20 --error-rate 0.05 --rate-limit-rate 0.02 --compare bench.json
+    python -m benchmarks import --max-import-ms 50
+"""
+import sys
+import json
+import argparse
+
+from .mock_server import MockConfig
+from .suite import BENCHMARKS, compare, run_suite
+
+
+def main(argv=None) -> int:
+    """Run the benchmarks command line."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmark the Filmot client.")
+    parser.add_argument("names", nargs="*", help=f"Benchmarks to run (default: all): {', '.join(BENCHMARKS)}.")
+    parser.add_argument("--iterations", type=int, default=20, help="Measured operations per benchmark.")
+    parser.add_argument("--concurrency", type=int, default=5, help="Client concurrency.")
+    parser.add_argument("--results", type=int, default=10, help="Results per search response.")
+    parser.add_argument("--hits", type=int, default=5, help="Hits per result.")
+    parser.add_argument("--more-results", type=int, default=20, help="more_results ids per first page.")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Server latency per request.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of a 500 response.")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Probability of a 429 response.")
+    parser.add_argument("--retry-after", type=float, default=0.05, help="Retry-After of the 429 responses.")
+    parser.add_argument("--output", default=None, help="Save the results to this json file.")
+    parser.add_argument("--compare", default=None, help="Compare with the results json of a previous run.")
+    parser.add_argument(
+        "--max-import-ms", type=float, default=None, help="Fail when the import benchmark p50 is above this."
+    )
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+
+    config = MockConfig(
+        results=args.results,
+        hits=args.hits,
+        more_results=args.more_results,
+        latency=args.latency_ms / 1000,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+    )
+    report = run_suite(args.names or list(BENCHMARKS), config, args.iterations, args.concurrency)
+    print(f"{'benchmark':<18} {'ops/sec':>10} {'req/sec':>10} {'p50 ms':>9} {'p99 ms':>9} {'peak KiB':>10}")
+    for result in report["results"]:
+        print(
+            f"{result['name']:<18} {result['ops_per_sec']:>10.1f} {result['requests_per_sec']:>10.1f} "
+            f"{result['p50_ms']:>9.2f} {result['p99_ms']:>9.2f} {result['peak_memory_bytes'] / 1024:>10.1f}"
+        )
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            report["comparison"] = compare(report, json.load(f))
+        print(f"\n{'vs baseline':<18} {'ops/sec':>10} {'p99':>9} {'memory':>10}")
+        for item in report["comparison"]:
+            ratios = [item["ops_per_sec_ratio"], item["p99_ratio"], item["peak_memory_ratio"]]
+            ops, p99, memory = (f"x{ratio:.2f}" if ratio is not None else "-" for ratio in ratios)
+            print(f"{item['name']:<18} {ops:>10} {p99:>9} {memory:>10}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    for result in report["results"]:
+        if result["name"] == "import" and args.max_import_ms is not None and result["p50_ms"] > args.max_import_ms:
+            print(f"\nimport p50 {result['p50_ms']:.2f} ms is above the {args.max_import_ms:.2f} ms limit")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""
+This file is part of Filmot API wrapper.
+
+Filmot API is free software: you can redistribute it and/or modify
+it under the terms of the MIT License as published by the Massachusetts
+Institute of Technology.
+
+For full details, please see the LICENSE file located in the root
+directory of this project.
+
+Cold import time of the package, measured in a fresh interpreter per run.
+"""
+import os
+import sys
+import json
+import subprocess  # nosec B404 - runs the current interpreter only
+from typing import List, Tuple
+
+import filmot
+
+# modules `import filmot` should leave to the first request / first use
+HEAVY_MODULES = ("requests", "urllib3", "aiohttp", "asyncio", "sqlite3")
+
+_SCRIPT = """
+import sys, time, json
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "modules": [name for name in {modules!r} if name in sys.modules]}}))
+"""
+
+
+def measure_import(statement: str = "import filmot") -> Tuple[float, List[str]]:
+    """
+    Run the import statement in a new interpreter.
+
+    Args:
+        statement (str): The statement to time.
+
+    Returns:
+        tuple: The statement seconds, and the heavy modules it loaded.
+    """
+    src_path = os.path.dirname(os.path.dirname(os.path.abspath(filmot.__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [src_path, os.environ.get("PYTHONPATH")])))
+    output = subprocess.run(  # nosec B603
+        [sys.executable, "-c", _SCRIPT.format(statement=statement, modules=HEAVY_MODULES)],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    return result["seconds"], result["modules"]
@@ -0,0 +1,215 @@
+"""
+This file is part of Filmot API wrapper.
+
+Filmot API is free software: you can redistribute it and/or modify
+it under the terms of the MIT License as published by the Massachusetts
+Institute of Technology.
+
+For full details, please see the LICENSE file located in the root
+directory of this project.
+
+Local stand-in for the Filmot RapidAPI endpoints, with configurable payload size, latency, errors and 429s.
+"""
+import json
+import time
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+COMMANDS = ("getsubtitlesearch", "getsearchsubtitles")
+
+
+class MockConfig:
+    """Mock server behaviour."""
+
+    def __init__(
+        self,
+        results: int = 10,
+        hits: int = 5,
+        more_results: int = 20,
+        latency: float = 0.005,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: float = 0.05,
+        seed: int = 0,
+    ):
+        """
+        Initialize the mock server behaviour.
+
+        Args:
+            results (int): Results per search response.
+            hits (int): Hits per result.
+            more_results (int): Video ids listed in `more_results` of the first page, for the follow-up requests.
+            latency (float): Seconds to wait before responding.
+            error_rate (float): Probability of a 500 response.
+            rate_limit_rate (float): Probability of a 429 response.
+            retry_after (float): The Retry-After header of the 429 responses.
+            seed (int): Random seed, for reproducible errors.
+        """
+        self.results = results
+        self.hits = hits
+        self.more_results = more_results
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.seed = seed
+
+    def to_dict(self) -> dict:
+        """Get the behaviour settings."""
+        return dict(vars(self))
+
+
+def make_result(video_id: str, query: str, category: str, hits: int) -> dict:
+    """Build a search result item, shaped like the API `result` items."""
+    return {
+        "id": video_id,
+        "title": f"Video {video_id} about {query}",
+        "duration": 600,
+        "uploaddate": "2023-05-17",
+        "viewcount": 1000 + len(video_id) * 37,
+        "likecount": 42,
+        "channelid": "UC" + video_id.rjust(22, "x"),
+        "lang": "en",
+        "category": category or "Gaming",
+        "channelname": "Benchmark channel",
+        "channelsubcount": 12345,
+        "channelcountryname": "United States",
+        "channelthumbnailurl": "https://yt3.ggpht.com/benchmark",
+        "hits": [
+            {
+                "start": f"{index * 12.5:.2f}",
+                "dur": "3.2",
+                "ctx_before": "" if index % 3 == 0 else "some words before the",
+                "ctx_after": "and some words after it, to make a realistic line",
+                "token": query,
+                "break": index % 2,
+            }
+            for index in range(hits)
+        ],
+    }
+
+
+class MockFilmotServer:
+    """Threaded HTTP server answering the search commands.
+
+    >>> with MockFilmotServer(MockConfig(latency=0.01)) as server:
+    >>>     client = Filmot()
+    >>>     client.base_url = server.url
+    """
+
+    def __init__(self, config: MockConfig = None, host: str = "127.0.0.1", port: int = 0):
+        """
+        Initialize the server, on a free port by default.
+
+        Args:
+            config (MockConfig): The server behaviour.
+            host (str): The host to listen on.
+            port (int): The port to listen on, 0 for a free port.
+        """
+        self.config = config or MockConfig()
+        self.random = random.Random(self.config.seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self._bodies = {}
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # the headers and the body are separate writes, avoid the delayed ACK stall on keep-alive connections
+            disable_nagle_algorithm = True
+
+            def do_GET(self):  # noqa: N802
+                server.handle(self)
+
+            def log_message(self, format, *args):  # noqa: A002
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """Get the server base url, to set as the client `base_url`."""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Start serving in a background thread."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="mock-filmot", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        """Start serving."""
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Stop serving."""
+        self.stop()
+
+    def reset_counters(self):
+        """Reset the request counters."""
+        with self.lock:
+            self.requests = self.errors = self.rate_limited = 0
+
+    def body(self, cmd: str, query: str, category: str, video_id: str = None) -> bytes:
+        """Get the response body, rendered once per request shape."""
+        key = (cmd, query, category, video_id)
+        body = self._bodies.get(key)
+        if body is None:
+            config = self.config
+            if video_id:
+                results = [make_result(video_id, query, category, config.hits)]
+                more_results = []
+            else:
+                results = [
+                    make_result(f"v{index:09d}", query, category, config.hits) for index in range(config.results)
+                ]
+                more_results = [{"id": f"m{index:09d}"} for index in range(config.more_results)]
+            body = json.dumps({"result": results, "more_results": more_results}).encode("utf-8")
+            self._bodies[key] = body
+        return body
+
+    def handle(self, request: BaseHTTPRequestHandler):
+        """Answer a request."""
+        config = self.config
+        with self.lock:
+            self.requests += 1
+            roll = self.random.random()
+        if config.latency:
+            time.sleep(config.latency)
+        url = urlparse(request.path)
+        cmd = url.path.strip("/")
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if cmd not in COMMANDS:
+            return self._send(request, 404, b'{"message": "unknown command"}')
+        if roll < config.rate_limit_rate:
+            with self.lock:
+                self.rate_limited += 1
+            return self._send(request, 429, b'{"message": "rate limited"}', {"Retry-After": str(config.retry_after)})
+        if roll < config.rate_limit_rate + config.error_rate:
+            with self.lock:
+                self.errors += 1
+            return self._send(request, 500, b'{"message": "internal error"}')
+        body = self.body(cmd, params.get("query", ""), params.get("category", ""), params.get("queryVideoID"))
+        return self._send(request, 200, body)
+
+    @staticmethod
+    def _send(request: BaseHTTPRequestHandler, status: int, body: bytes, headers: dict = None):
+        request.send_response(status)
+        request.send_header("Content-Type", "application/json")
+        request.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            request.send_header(name, value)
+        request.end_headers()
+        request.wfile.write(body)
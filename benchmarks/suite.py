@@ -0,0 +1,275 @@
+"""
+This file is part of Filmot API wrapper.
+
+Filmot API is free software: you can redistribute it and/or modify
+it under the terms of the MIT License as published by the Massachusetts
+Institute of Technology.
+
+For full details, please see the LICENSE file located in the root
+directory of this project.
+
+The benchmarks: each one is a function of (context, iterations) that runs `iterations` operations and returns
+the latency of each one, in seconds.
+"""
+import io
+import json
+import time
+import platform
+import tracemalloc
+from typing import Callable, Dict, List
+
+from filmot import Filmot, RetryPolicy
+from filmot.asyncit import Asyncit
+from filmot.export import write_jsonl
+from filmot.filmot_base import BaseFilmot
+
+from .import_time import measure_import
+from .mock_server import MockConfig, MockFilmotServer
+
+CATEGORIES = ["Gaming", "Music", "Sports", "Education"]
+BENCHMARKS: Dict[str, Callable] = {}
+
+
+def benchmark(name: str):
+    """Register a benchmark function."""
+
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+
+    return register
+
+
+class BenchContext:
+    """Shared state of a benchmarks run: the mock server, and a client pointed to it."""
+
+    def __init__(self, config: MockConfig, concurrency: int):
+        """
+        Initialize the context.
+
+        Args:
+            config (MockConfig): The mock server behaviour.
+            concurrency (int): The client concurrency.
+        """
+        self.config = config
+        self.concurrency = concurrency
+        self.server = MockFilmotServer(config)
+        self.client = None
+        self._payload = None
+
+    def __enter__(self):
+        """Start the server and create the client."""
+        self.server.start()
+        self.client = self.create_client()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close the client and stop the server."""
+        self.client.close()
+        self.server.stop()
+
+    def create_client(self) -> Filmot:
+        """Create a client pointed to the mock server, with short retry delays."""
+        client = Filmot(
+            concurrency=self.concurrency,
+            pool_size=max(self.concurrency * 2, 10),
+            throttle=False,
+            circuit_breaker=False,
+            retry_policy=RetryPolicy(max_attempts=4, base_delay=0.01, max_delay=0.1),
+        )
+        client.base_url = self.server.url
+        return client
+
+    @property
+    def payload(self) -> dict:
+        """Get a first page payload, for the parsing / serialization benchmarks."""
+        if self._payload is None:
+            self._payload = json.loads(self.server.body("getsearchsubtitles", "benchmark", "Gaming"))
+        return self._payload
+
+
+def _timed(iterations: int, operation: Callable) -> List[float]:
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        operation()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+@benchmark("search")
+def bench_search(context: BenchContext, iterations: int) -> List[float]:
+    """Filmot.search of several categories, with follow-up requests."""
+    limit = context.config.results + min(context.config.more_results, 5)
+    return _timed(iterations, lambda: context.client.search("benchmark", category=CATEGORIES, limit=limit))
+
+
+@benchmark("search_bulk")
+def bench_search_bulk(context: BenchContext, iterations: int) -> List[float]:
+    """Filmot.search_bulk, a single large response."""
+    return _timed(iterations, lambda: context.client.search_bulk({"query": "benchmark"}))
+
+
+@benchmark("iter_search_bulk")
+def bench_iter_search_bulk(context: BenchContext, iterations: int) -> List[float]:
+    """Filmot.iter_search_bulk, the streamed and incrementally parsed response."""
+    return _timed(iterations, lambda: list(context.client.iter_search_bulk({"query": "benchmark"})))
+
+
+@benchmark("asyncit_fanout")
+def bench_asyncit_fanout(context: BenchContext, iterations: int) -> List[float]:
+    """Asyncit fan-out of search_one calls, one operation is a batch of `concurrency * 4` calls."""
+    fanout = context.concurrency * 4
+
+    def operation():
+        with Asyncit(pool_size=context.concurrency, save_output=True) as asyncit:
+            for index in range(fanout):
+                asyncit.run(context.client.search_one, {"query": "benchmark", "queryVideoID": f"m{index % 20:09d}"})
+            asyncit.wait()
+            asyncit.get_output()
+
+    return _timed(iterations, operation)
+
+
+@benchmark("parse")
+def bench_parse(context: BenchContext, iterations: int) -> List[float]:
+    """Parse a search response payload into SearchResponse objects, and read their hits."""
+    payload = context.payload
+
+    def operation():
+        for response in BaseFilmot.parse_search_results({"query": "benchmark"}, payload):
+            response.hits_data()
+
+    return _timed(iterations, operation)
+
+
+@benchmark("to_json")
+def bench_to_json(context: BenchContext, iterations: int) -> List[float]:
+    """SearchResponse.to_json of a parsed response page."""
+    responses = BaseFilmot.parse_search_results({"query": "benchmark"}, context.payload)
+    return _timed(iterations, lambda: [response.to_json() for response in responses])
+
+
+@benchmark("export_jsonl")
+def bench_export_jsonl(context: BenchContext, iterations: int) -> List[float]:
+    """write_jsonl of a parsed response page, to memory."""
+    responses = BaseFilmot.parse_search_results({"query": "benchmark"}, context.payload)
+    return _timed(iterations, lambda: write_jsonl(responses, io.BytesIO()))
+
+
+@benchmark("import")
+def bench_import(context: BenchContext, iterations: int) -> List[float]:
+    """Cold `import filmot` in a new interpreter, which should not load the HTTP stack, asyncio or sqlite3."""
+    latencies = []
+    for _ in range(iterations):
+        seconds, modules = measure_import()
+        if modules:
+            raise RuntimeError(f"`import filmot` loaded {', '.join(modules)}, import them on first use instead")
+        latencies.append(seconds)
+    return latencies
+
+
+def percentile(values: List[float], percent: float) -> float:
+    """Get the nearest-rank percentile of the values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(int(round(percent / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+def run_benchmark(name: str, context: BenchContext, iterations: int, warmup: int = 1) -> dict:
+    """
+    Run a benchmark: warm up, measure the latencies, then measure the peak memory of one more iteration.
+
+    Returns:
+        dict: The benchmark results.
+    """
+    func = BENCHMARKS[name]
+    func(context, warmup)
+    context.server.reset_counters()
+    start = time.perf_counter()
+    latencies = func(context, iterations)
+    elapsed = time.perf_counter() - start
+    requests = context.server.requests
+    errors = context.server.errors
+    rate_limited = context.server.rate_limited
+    # tracemalloc slows down the allocations, so the peak memory is measured on a separate iteration
+    tracemalloc.start()
+    try:
+        func(context, 1)
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "name": name,
+        "description": (func.__doc__ or "").strip(),
+        "iterations": iterations,
+        "total_sec": elapsed,
+        "ops_per_sec": iterations / elapsed if elapsed else 0.0,
+        "requests": requests,
+        "requests_per_sec": requests / elapsed if elapsed else 0.0,
+        "server_errors": errors,
+        "server_rate_limited": rate_limited,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "peak_memory_bytes": peak_memory,
+    }
+
+
+def run_suite(names: List[str], config: MockConfig, iterations: int, concurrency: int) -> dict:
+    """
+    Run the benchmarks against a local mock server.
+
+    Returns:
+        dict: The run metadata and the results of each benchmark.
+    """
+    try:
+        from importlib.metadata import version
+
+        filmot_version = version("filmot")
+    except Exception:
+        filmot_version = None
+    results = []
+    with BenchContext(config, concurrency) as context:
+        for name in names:
+            results.append(run_benchmark(name, context, iterations))
+    return {
+        "meta": {
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "filmot_version": filmot_version,
+            "iterations": iterations,
+            "concurrency": concurrency,
+            "server": config.to_dict(),
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict) -> List[dict]:
+    """
+    Compare the results of two runs.
+
+    Returns:
+        list: Per benchmark in both runs: the ops/sec and p99 ratios of the current run to the baseline.
+    """
+    baseline_results = {result["name"]: result for result in baseline["results"]}
+    comparison = []
+    for result in current["results"]:
+        base = baseline_results.get(result["name"])
+        if not base:
+            continue
+        comparison.append(
+            {
+                "name": result["name"],
+                "ops_per_sec_ratio": result["ops_per_sec"] / base["ops_per_sec"] if base["ops_per_sec"] else None,
+                "p99_ratio": result["p99_ms"] / base["p99_ms"] if base["p99_ms"] else None,
+                "peak_memory_ratio": (
+                    result["peak_memory_bytes"] / base["peak_memory_bytes"] if base["peak_memory_bytes"] else None
+                ),
+            }
+        )
+    return comparison
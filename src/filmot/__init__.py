@@ -7,9 +7,60 @@ Institute of Technology.
 
 For full details, please see the LICENSE file located in the root
 directory of this project.
+
+The public names are imported from their modules on first access, so `import filmot` doesn't load the HTTP
+stack, asyncio or sqlite3 until they are used.
 """
+import importlib
 
-from .config import Config  # noqa: F401
 from .consts import Categories, Countries, Language  # noqa: F401
-from .filmot import Filmot  # noqa: F401
-from .exceptions import FilmotException  # noqa: F401
+from .exceptions import (  # noqa: F401
+    FilmotException,
+    FilmotHTTPException,
+    FilmotRateLimitException,
+    FilmotConnectionException,
+    FilmotCircuitOpenException,
+)
+
+# public name -> the module defining it
+_LAZY_IMPORTS = {
+    "Config": ".config",
+    "DiskCache": ".cache",
+    "MemoryCache": ".cache",
+    "Filmot": ".filmot",
+    "AsyncFilmot": ".async_filmot",
+    "SearchQuery": ".query",
+    "ResultFrame": ".frame",
+    "write_jsonl": ".export",
+    "BatchRunner": ".batch",
+    "RetryPolicy": ".retry",
+    "CircuitBreaker": ".retry",
+    "Metrics": ".metrics",
+}
+
+__all__ = [
+    "Categories",
+    "Countries",
+    "Language",
+    "FilmotException",
+    "FilmotHTTPException",
+    "FilmotRateLimitException",
+    "FilmotConnectionException",
+    "FilmotCircuitOpenException",
+    *_LAZY_IMPORTS,
+]
+
+
+def __getattr__(name: str):
+    """Import the public names on first access."""
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    """List the public names, including the ones not imported yet."""
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,452 @@
+"""
+This file is part of Filmot API wrapper.
+
+Filmot API wrapper is free software: you can redistribute it and/or modify
+it under the terms of the MIT License as published by the Massachusetts
+Institute of Technology.
+
+For full details, please see the LICENSE file located in the root
+directory of this project.
+
+Native asyncio client for the Filmot REST API, based on aiohttp.
+Requires the `async` extra: pip install filmot[async]
+"""
+import json
+import time
+import asyncio
+import logging
+from collections import deque
+
+from typing import TYPE_CHECKING, Literal, Union, Optional, List, AsyncIterator
+
+from .metrics import Metrics
+from .ratelimit import RateLimiter, AdaptiveThrottle, parse_retry_after
+from .query import SearchQuery
+from .filmot_base import BaseFilmot
+from .responses import SearchResponse, SearchResults
+from .exceptions import FilmotException, FilmotConnectionException, FilmotHTTPException, FilmotRateLimitException
+from .retry import RetryPolicy, CircuitBreaker
+from .streaming import JSONArrayParser
+from .transport import DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT
+
+if TYPE_CHECKING:
+    from .cache import BaseCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ASYNC_POOL_SIZE = 100
+DEFAULT_MAX_PENDING = 100
+DEFAULT_STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class AsyncFilmot(BaseFilmot):
+    """Filmot API asyncio Wrapper.
+
+    All the requests are sent from the event loop thread over a single non-blocking connection pool,
+    so thousands of searches can be in flight without a thread per request.
+
+    >>> async with AsyncFilmot() as filmot:
+    >>>     response = await filmot.search("Spill The Beans", category=[Categories.GAMING, Categories.SPORTS])
+    """
+
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_ASYNC_POOL_SIZE,
+        keep_alive: bool = True,
+        connect_timeout: Optional[float] = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: Optional[float] = DEFAULT_READ_TIMEOUT,
+        rate_limit: Optional[Union[List[dict], RateLimiter]] = None,
+        cache: Optional["BaseCache"] = None,
+        throttle: Union[bool, AdaptiveThrottle] = True,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Union[bool, CircuitBreaker] = True,
+        metrics: Union[bool, Metrics] = True,
+    ):
+        """
+        Initialize an AsyncFilmot Client object.
+
+        The HTTP session is created on first request, inside the running event loop.
+
+        Args:
+            pool_size (int, optional): Max concurrent connections to the RapidAPI host. 0 for no limit.
+            keep_alive (bool, optional): Whether to reuse connections between requests.
+            connect_timeout (float, optional): Seconds to wait for a connection. None to wait forever.
+            read_timeout (float, optional): Seconds to wait for the response data. None to wait forever.
+            rate_limit (list, optional): List of dicts with: max_calls, period_sec (and optional burst). Limits the
+                rate of all the requests sent by the client. A RateLimiter can be given instead, to share it with
+                other clients.
+            cache (BaseCache, optional): Cache for the API responses, e.g. MemoryCache(). Defaults to no cache.
+            throttle (bool, optional): Whether to slow down according to the rate limit headers of the API responses.
+                An AdaptiveThrottle can be given, to share it with other clients or to change how long a request may
+                be held back (max_wait).
+            retry_policy (RetryPolicy, optional): Which failed requests to retry and how long to wait between the
+                attempts. Defaults to RetryPolicy(), pass RetryPolicy(max_attempts=1) to disable retries.
+            circuit_breaker (bool, optional): Whether to fail fast after consecutive failures of the API.
+                A CircuitBreaker can be given, to set its thresholds or share it with other clients.
+            metrics (bool, optional): Whether to collect request metrics, see `Filmot`.
+                A Metrics can be given, to register hooks or share it with other clients.
+        """
+        super().__init__()
+        self.metrics = Metrics() if metrics is True else metrics or None
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.rate_limiter = RateLimiter.create(rate_limit)
+        self.cache = cache
+        self.throttle = AdaptiveThrottle() if throttle is True else throttle or None
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = CircuitBreaker() if circuit_breaker is True else circuit_breaker or None
+        self._session = None
+
+    async def __aenter__(self):
+        """Enter the async runtime context."""
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        """Exit the async runtime context and release the pooled connections."""
+        await self.close()
+
+    def _create_session(self):
+        try:
+            import aiohttp
+        except ImportError as ex:
+            raise FilmotException(f"AsyncFilmot requires aiohttp, install it with: pip install filmot[async] ({ex})")
+
+        connector = aiohttp.TCPConnector(limit=self.pool_size, force_close=not self.keep_alive)
+        timeout = aiohttp.ClientTimeout(sock_connect=self.connect_timeout, sock_read=self.read_timeout)
+        return aiohttp.ClientSession(connector=connector, timeout=timeout, headers=self.headers)
+
+    @property
+    def session(self):
+        """Get the shared aiohttp session, creating it on first use."""
+        if self._session is None or self._session.closed:
+            self._session = self._create_session()
+        return self._session
+
+    async def close(self):
+        """Close the HTTP session."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def send_api(self, cmd: str, query: dict) -> dict:
+        """
+        Send the API request, or get its response from the client cache.
+
+        Args:
+            cmd: The command to send.
+            query: The query data.
+        """
+        if self.cache is None:
+            return await self._send_request(cmd, query)
+        if self.metrics is None:
+            return await self.cache.aget_or_load(cmd, query, lambda: self._send_request(cmd, query))
+        loaded = []
+
+        def loader():
+            loaded.append(True)
+            return self._send_request(cmd, query)
+
+        result = await self.cache.aget_or_load(cmd, query, loader)
+        self.metrics.inc("cache_misses" if loaded else "cache_hits", command=cmd)
+        return result
+
+    async def _send_request(self, cmd: str, query: dict) -> dict:
+        """Send the API request over the aiohttp session, retrying it according to the client retry policy."""
+        return await self.retry_policy.call_async(
+            lambda: self._send_request_once(cmd, query),
+            circuit_breaker=self.circuit_breaker,
+            on_retry=self.metrics.record_retry if self.metrics is not None else None,
+        )
+
+    async def _send_request_once(self, cmd: str, query: dict) -> dict:
+        """Send the API request over the aiohttp session."""
+        import aiohttp
+
+        response = await self._open_request(cmd, query)
+        try:
+            body = await response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as req_err:
+            raise FilmotConnectionException(f"Failed to read response: {req_err}")
+        finally:
+            response.release()
+        start = time.perf_counter()
+        try:
+            json_response = json.loads(body)
+        except ValueError as ex:
+            raise FilmotException(f"Failed to parse JSON response: {ex}")
+        if self.metrics is not None:
+            self.metrics.inc("bytes_received", len(body), command=cmd)
+            self.metrics.observe("parse_seconds", cmd, time.perf_counter() - start)
+        return json_response
+
+    async def _open_request(self, cmd: str, query: dict):
+        """Send the API request over the aiohttp session, and check the response status.
+
+        The caller must release the returned response.
+        """
+        metrics = self.metrics
+        wait = await self.rate_limiter.acquire_async()
+        if self.throttle:
+            wait += await self.throttle.acquire_async()
+        if metrics is None:
+            return await self._get_response(cmd, query)
+
+        metrics.record_throttle(wait)
+        if metrics.hooks["before_request"]:
+            metrics.emit("before_request", cmd=cmd, query=query)
+        start = time.perf_counter()
+        try:
+            response = await self._get_response(cmd, query)
+        except FilmotException as ex:
+            metrics.record_request(cmd, query, getattr(ex, "status_code", None), time.perf_counter() - start, error=ex)
+            raise
+        # the body is not read yet, its bytes are counted while it is read
+        metrics.record_request(cmd, query, response.status, time.perf_counter() - start)
+        return response
+
+    async def _get_response(self, cmd: str, query: dict):
+        """Send the API request over the aiohttp session, with the response status check."""
+        import aiohttp
+
+        url = f"{self.base_url}/{cmd}"
+        # aiohttp accepts only str / int / float query values
+        params = {k: str(v) for k, v in query.items() if v is not None}
+        try:
+            response = await self.session.get(url, params=params)
+        except aiohttp.ClientError as req_err:
+            raise FilmotConnectionException(f"Failed to send request: {req_err}")
+        except asyncio.TimeoutError:
+            raise FilmotConnectionException(f"Request timed out: {url}")
+
+        if self.throttle:
+            self.throttle.update(response.headers)
+        if response.status == 429:
+            response.release()
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if self.throttle:
+                self.throttle.on_rate_limited(retry_after)
+            raise FilmotRateLimitException(f"API `{cmd}` rate limited, retry after {retry_after} sec", retry_after)
+        if response.status >= 400:
+            try:
+                content = await response.text()
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                content = ""
+            finally:
+                response.release()
+            logger.error(f"API `{cmd}` failed with {response.status}: {content}")
+            raise FilmotHTTPException(f"Failed with HTTP {response.status}: {response.reason}", response.status)
+        return response
+
+    async def search_bulk(self, query_params: Union[dict, SearchQuery]) -> List[SearchResponse]:
+        """
+        Perform a bulk search.
+
+        Args:
+            query_params (Union[dict, SearchQuery]): Parameters for the search, or a SearchQuery of up to one category.
+
+        Returns:
+            list: The SearchResponse objects for the search.
+        """
+        query_params = self.as_query_params(query_params)
+        logger.info(f"Searching for {query_params}")
+        response = await self.send_api("getsearchsubtitles", query_params)
+        return self.build_results("getsearchsubtitles", query_params, response)
+
+    async def iter_search_bulk(
+        self, query_params: Union[dict, SearchQuery], chunk_size: int = DEFAULT_STREAM_CHUNK_SIZE
+    ) -> AsyncIterator[SearchResponse]:
+        """
+        Perform a bulk search, parsing the response while it downloads.
+
+        See `Filmot.iter_search_bulk`. Streamed responses bypass the client cache.
+
+        Args:
+            query_params (Union[dict, SearchQuery]): Parameters for the search, or a SearchQuery of up to one category.
+            chunk_size (int, optional): Bytes to read from the response stream at a time.
+
+        Yields:
+            SearchResponse: The search results, in the response order.
+        """
+        import aiohttp
+
+        query_params = self.as_query_params(query_params)
+        logger.info(f"Searching for {query_params}")
+        response = await self.retry_policy.call_async(
+            lambda: self._open_request("getsearchsubtitles", query_params),
+            circuit_breaker=self.circuit_breaker,
+            on_retry=self.metrics.record_retry if self.metrics is not None else None,
+        )
+        parser = JSONArrayParser("result")
+        try:
+            async for chunk in response.content.iter_chunked(chunk_size):
+                if self.metrics is not None:
+                    self.metrics.inc("bytes_received", len(chunk), command="getsearchsubtitles")
+                for item in parser.feed(chunk):
+                    yield SearchResponse(query=query_params["query"], result=item)
+            for item in parser.close():
+                yield SearchResponse(query=query_params["query"], result=item)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as req_err:
+            raise FilmotConnectionException(f"Failed to read response: {req_err}")
+        except ValueError as ex:
+            raise FilmotException(f"Failed to parse JSON response: {ex}")
+        finally:
+            response.release()
+
+    async def search_one(self, query_params: Union[dict, SearchQuery]) -> List[SearchResponse]:
+        """
+        Perform a single search.
+
+        Args:
+            query_params (Union[dict, SearchQuery]): Parameters for the search, or a SearchQuery of up to one category.
+
+        Returns:
+            list: The SearchResponse objects for the search.
+        """
+        query_params = self.as_query_params(query_params)
+        logger.info(f"Searching for {query_params}")
+        response = await self.send_api("getsubtitlesearch", query_params)
+        return self.build_results("getsubtitlesearch", query_params, response)
+
+    async def search(
+        self,
+        query: Union[str, SearchQuery],
+        language: Optional[str] = None,
+        category: Optional[Union[str, List[str]]] = None,
+        exclude_category: Optional[str] = None,
+        license: Optional[Literal[1, 2]] = None,
+        max_views: Optional[int] = None,
+        min_views: Optional[int] = None,
+        min_likes: Optional[int] = None,
+        country: Optional[int] = None,
+        channel_id: Optional[str] = None,
+        title: Optional[str] = None,
+        start_duration: Optional[int] = None,
+        end_duration: Optional[int] = None,
+        search_manual_subs: Optional[Literal[1, 2]] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        limit: int = 10,
+    ) -> SearchResults:
+        """
+        Perform a search request, the categories and their follow-up videos are searched concurrently.
+
+        See `Filmot.search` for the arguments description.
+
+        Returns:
+            SearchResults: Dict of category and list of SearchResponse objects. If no category provided the key will be
+                None. A failed category is mapped to an empty list and its exception is kept in the `errors` dict of
+                the results, the other categories are still returned.
+        """
+        search_query = SearchQuery.build(
+            query,
+            language=language,
+            category=category,
+            exclude_category=exclude_category,
+            license=license,
+            max_views=max_views,
+            min_views=min_views,
+            min_likes=min_likes,
+            country=country,
+            channel_id=channel_id,
+            title=title,
+            start_duration=start_duration,
+            end_duration=end_duration,
+            search_manual_subs=search_manual_subs,
+            start_date=start_date,
+            end_date=end_date,
+        )
+        category_params = search_query.category_params()
+        category_results = await asyncio.gather(
+            *[self._search_pages(params, limit) for params in category_params.values()], return_exceptions=True
+        )
+
+        aggregated_results = SearchResults()
+        for category, category_result in zip(category_params, category_results):
+            if isinstance(category_result, Exception):
+                logger.error(f"Search of category {category} failed: {category_result}")
+                aggregated_results.add_error(category, category_result)
+            elif isinstance(category_result, BaseException):
+                raise category_result
+            else:
+                aggregated_results[category] = category_result
+        return aggregated_results
+
+    async def _search_pages(self, query_params: dict, limit: int) -> List[SearchResponse]:
+        """Get up to `limit` videos for the query, the follow-up requests are sent concurrently."""
+        results, follow_ups = await self._search_first_page(query_params, limit)
+        follow_up_results = await asyncio.gather(
+            *[self.search_one(params) for params in follow_ups], return_exceptions=True
+        )
+        for params, follow_up_result in zip(follow_ups, follow_up_results):
+            if isinstance(follow_up_result, FilmotException):
+                logger.warning(f"Follow-up search for video {params['queryVideoID']} failed: {follow_up_result}")
+            elif isinstance(follow_up_result, BaseException):
+                raise follow_up_result
+            else:
+                results.extend(follow_up_result)
+        return results[:limit]
+
+    async def _search_first_page(self, query_params: dict, limit: int) -> tuple:
+        """Get the first page of the query, and the follow-up requests needed to reach `limit` videos."""
+        logger.info(f"Searching for {query_params}")
+        response = await self.send_api("getsubtitlesearch", query_params)
+        results = self.build_results("getsubtitlesearch", query_params, response)[:limit]
+        return results, self.build_follow_up_params(query_params, response, results, limit)
+
+    async def iter_search(
+        self, query: Union[str, SearchQuery], limit: int = 10, max_pending: int = DEFAULT_MAX_PENDING, **filters
+    ) -> AsyncIterator[SearchResponse]:
+        """
+        Perform a search request, yielding each SearchResponse as soon as its request completes.
+
+        No more than `max_pending` requests are in flight or waiting to be consumed, so a slow consumer holds back
+        new requests. Closing the generator (or breaking out of the loop) cancels the requests in flight.
+
+        >>> async for response in filmot.iter_search("Spill The Beans", category=Categories.get_all_categories()):
+        >>>     await index(response)
+
+        Args:
+            query (Union[str, SearchQuery]): The search query.
+            limit (int, optional): The limit videos to return, per category. Defaults to 10.
+            max_pending (int, optional): Max requests in flight.
+            filters: The search filters, see `Filmot.search`.
+
+        Yields:
+            SearchResponse: The results, in completion order. Failed requests are logged and skipped.
+        """
+        search_query = SearchQuery.build(query, **filters)
+        category_params = search_query.category_params()
+        tasks = deque((self._search_first_page, params, limit) for params in category_params.values())
+        # videos left to yield per category, the follow-ups of a category are dropped once it reaches the limit
+        remaining = dict.fromkeys(category_params, limit)
+        pending = {}
+        try:
+            while tasks or pending:
+                while tasks and len(pending) < max_pending:
+                    func, *args = tasks.popleft()
+                    pending[asyncio.ensure_future(func(*args))] = args[0]
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    params = pending.pop(task)
+                    if task.cancelled():
+                        continue
+                    try:
+                        result = task.result()
+                    except FilmotException as ex:
+                        logger.error(f"Search for {params} failed: {ex}")
+                        continue
+                    if isinstance(result, tuple):
+                        result, follow_ups = result
+                        tasks.extend((self.search_one, follow_up) for follow_up in follow_ups)
+                    category = params.get("category")
+                    result = result[: remaining[category]]
+                    remaining[category] -= len(result)
+                    if not remaining[category]:
+                        tasks = self._drop_category_tasks(category, tasks, pending)
+                    for response in result:
+                        yield response
+        finally:
+            for task in pending:
+                task.cancel()
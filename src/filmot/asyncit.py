@@ -14,24 +14,69 @@ import queue
 import asyncio
 import logging
 import threading
-from random import randint
 from datetime import timedelta
 from functools import partial
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
-from .dicts import DotDict
+from .retry import RetryPolicy
+from .ratelimit import RateLimiter
 
 logger = logging.getLogger(__name__)
 
 
+class TaskResult:
+    """The result of an Asyncit call, with its arguments.
+
+    :param index: The submission order of the call, starting from 0.
+    :param args: The call positional arguments.
+    :param kwargs: The call keyword arguments.
+    :param value: The returned value, None if the call failed.
+    :param exception: The exception of the last attempt if the call failed, else None.
+    """
+
+    __slots__ = ("index", "args", "kwargs", "value", "exception")
+
+    def __init__(self, index, args, kwargs, value=None, exception=None):
+        """Init TaskResult."""
+        self.index = index
+        self.args = args
+        self.kwargs = kwargs
+        self.value = value
+        self.exception = exception
+
+    @property
+    def ok(self):
+        """Whether the call succeeded."""
+        return self.exception is None
+
+    def __repr__(self):
+        """Return a string representation of the result."""
+        outcome = f"value={self.value!r}" if self.ok else f"exception={self.exception!r}"
+        return f"<TaskResult index={self.index} args={self.args!r} {outcome}>"
+
+
 class Asyncit:  # pylint: disable=too-many-instance-attributes
     """Create Asyncit client, for simple run of function using asuncio.
 
-    :param pool_size: Max function concurrent invocations.
-    :param rate_limit: List of dicts with: max_calls, period_sec
-    :param max_retry: If value greater than 1, retry function run in case of exception
-    :param save_output: If true, function returned valued are saved in a queue.
-    :param save_as_json: If true and save_output is true, function returned valued will be saved as json values.
+    :param pool_size: Max function concurrent invocations, the number of threads of the Asyncit executor.
+        0 for the ThreadPoolExecutor default (min(32, cpu count + 4)).
+    :param rate_limit: List of dicts with: max_calls, period_sec. Or a RateLimiter, to share it with other callers.
+    :param max_retry: Max attempts per call, short for `RetryPolicy(max_attempts=max_retry, deadline=None)`.
+        Defaults to 1, no retries.
+    :param retry_policy: Optional RetryPolicy, which exceptions to retry, how many attempts and how long to wait
+        between them. Overrides max_retry. Only the retryable Filmot exceptions (connection errors, 5xx and 429
+        responses) are retried.
+    :param save_output: If true, the result of each call is saved, see `results()`, `as_completed()` and `get_output()`.
+    :param save_as_json: If true and save_output is true, `get_output` returns the json representation of the values.
     :param iter_indication: If true, a log will be printed every `iter` invocations
+    :param metrics: Optional Metrics, to record the calls (`calls`, `call_errors` and `retries` counters,
+        `call_seconds` histogram per function name) and the rate limit waits.
+    :param max_pending: If set, `run` blocks (and `run_async` awaits) once this many calls are pending, so feeding
+        any number of calls keeps a constant number of futures in memory.
+    :param process_pool: If true (or a number of processes), the functions run in a process pool, for CPU heavy
+        functions. The function, its arguments and its return value must be picklable. The retries, rate limit,
+        metrics and outputs are still handled by the Asyncit threads.
+    The executors are owned by Asyncit, close it (or use it as a context manager) to shut them down.
     Here is a sample usage example:
     >>> from asyncit import Asyncit
     >>> asyncit = Asyncit(iter_indication=10)
@@ -50,14 +95,32 @@ class Asyncit:  # pylint: disable=too-many-instance-attributes
     >>>     asyncit.run(foo_call_some_api, arg1, arg2)
     >>> asyncit.wait()
     >>> return asyncit.get_output()
+    In the following example no more than 1000 calls are pending at a time, whatever the number of queries:
+    >>> with Asyncit(pool_size=50, max_pending=1000) as asyncit:
+    >>>     for query in read_queries():
+    >>>         asyncit.run(search_and_store, query)
+    >>>     asyncit.wait()
     """
 
     def __init__(
-        self, pool_size=0, rate_limit=None, max_retry=None, save_output=False, save_as_json=False, iter_indication=None
+        self,
+        pool_size=0,
+        rate_limit=None,
+        max_retry=None,
+        save_output=False,
+        save_as_json=False,
+        iter_indication=None,
+        retry_policy=None,
+        metrics=None,
+        max_pending=None,
+        process_pool=False,
     ):
         """Init Asyncit."""
-        rate_limit = rate_limit or []
-        self.futures = []
+        # the pending futures, a completed future is removed by its done callback
+        self.futures = set()
+        # the executor futures of the pending calls, to cancel the queued calls on close
+        self._calls = set()
+        self.max_pending = max_pending
 
         try:
             loop = asyncio.get_event_loop()
@@ -69,35 +132,71 @@ class Asyncit:  # pylint: disable=too-many-instance-attributes
 
         self.save_output = save_output
         self.save_as_json = save_as_json
-        self.output_queue = queue.Queue()  # QueueEx() if self.save_output else None
-        self.sem = threading.Semaphore(pool_size) if pool_size else None
+        # TaskResult of each completed call when save_output, in completion order
+        self.output_queue = queue.Queue()
+        self._next_index = 0
+        self.pool_size = pool_size
+        self.process_pool = process_pool
+        self._executor = None
+        self._process_executor = None
         self.clock_time = time.perf_counter
         self.raise_on_limit = True
-        self.rate_limit = []
-        self.max_retry = max_retry or 1
+        self.rate_limiter = RateLimiter.create(rate_limit)
+        self.rate_limit = self.rate_limiter.limits
+        self.retry_policy = retry_policy or RetryPolicy(max_attempts=max_retry or 1, deadline=None)
+        self.max_retry = self.retry_policy.max_attempts
+        self.metrics = metrics
         self.iter_indication = iter_indication
         self.iter_counter = 0
-        for limit in rate_limit:
-            limit = DotDict(limit)
-            self.rate_limit.append(
-                DotDict(
-                    dict(
-                        max_calls=limit.max_calls,
-                        period_sec=limit.period_sec,
-                        last_reset=self.clock_time(),
-                        num_calls=0,
-                        total_calls=0,
-                    )
-                )
-            )
         self.lock = threading.RLock()
         self.total_counter = 0
         self.total_run_start = self.clock_time()
 
-    def __period_remaining(self, last_reset, period_sec) -> float:
-        """Return the period remaining for the current rate limit window."""
-        elapsed = self.clock_time() - last_reset
-        return period_sec - elapsed
+    def __enter__(self):
+        """Use Asyncit as a context manager, closing it on exit."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close the executors."""
+        self.close(cancel_pending=exc_type is not None)
+
+    @property
+    def executor(self):
+        """Get the thread pool the calls run in, creating it on first use."""
+        if self._executor is None:
+            with self.lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.pool_size or None, thread_name_prefix="asyncit"
+                    )
+        return self._executor
+
+    @property
+    def process_executor(self):
+        """Get the process pool the functions run in (process_pool mode), creating it on first use."""
+        if self._process_executor is None:
+            with self.lock:
+                if self._process_executor is None:
+                    processes = self.process_pool if self.process_pool is not True else None
+                    self._process_executor = ProcessPoolExecutor(max_workers=processes)
+        return self._process_executor
+
+    def close(self, wait=True, cancel_pending=False):
+        """Shut down the executors.
+
+        :param wait: If true, wait for the running calls to complete.
+        :param cancel_pending: If true, cancel the calls that did not start yet.
+        """
+        if cancel_pending:
+            # the executor futures are cancelled right away, the asyncio futures only once the loop runs again
+            for call in list(self._calls):
+                call.cancel()
+            for future in list(self.futures):
+                future.cancel()
+        for executor in (self._executor, self._process_executor):
+            if executor is not None:
+                executor.shutdown(wait=wait)
+        self._executor = self._process_executor = None
 
     def reset_start_time(self):
         """Reset the start time.
@@ -113,61 +212,65 @@ class Asyncit:  # pylint: disable=too-many-instance-attributes
 
     def func_wrapper(self, func, *args, **kwargs):
         """Wrap for the function execution."""
-        if self.sem:
-            self.sem.acquire()
+        value, _ = self._execute(func, args, kwargs)
+        return value
 
-        if self.rate_limit:
-            with self.lock:
-                for limit in self.rate_limit:
-                    period_remaining = self.__period_remaining(limit.last_reset, limit.period_sec)
-
-                    # If the time window has elapsed then reset.
-                    if period_remaining <= 0:
-                        limit.num_calls = 0
-                        limit.last_reset = self.clock_time()
-
-                    limit.num_calls += 1
-                    limit.total_calls += 1
-                    if limit.num_calls > limit.max_calls:
-                        logger.info(f"going to sleep for {period_remaining:.2f} {limit}")
-                        time.sleep(period_remaining)
-
-        value = None
-        retry_counter = 0
-        exception = None
-
-        while retry_counter < self.max_retry:
-            retry_counter += 1
+    def _run_task(self, index, func, args, kwargs):
+        value, exception = self._execute(func, args, kwargs)
+        if self.save_output:
+            self.output_queue.put(TaskResult(index, args, kwargs, value, exception))
+        return value
+
+    def _execute(self, func, args, kwargs):
+        """Run the function with the retries, return its value and the exception of the last failed attempt."""
+        if self.rate_limiter:
+            wait = self.rate_limiter.acquire()
+            if self.metrics is not None:
+                self.metrics.record_throttle(wait)
+
+        metrics = self.metrics
+        func_name = getattr(func, "__name__", type(func).__name__)
+        if self.process_pool:
+            func = partial(self._call_in_process, func)
+
+        def attempt():
+            if metrics is None:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
             try:
-                value = func(*args, **kwargs)
-                if self.iter_indication:
-                    self.iter_counter += 1
-                    if self.iter_counter % self.iter_indication == 0:
-                        logger.info(f"running iter {self.iter_counter}")
-                save_value = bool(value is not None and self.save_output and self.output_queue is not None)
-                if save_value:
-                    if self.save_as_json:
-                        value = json.dumps(value)
-                    self.output_queue.put(value)
-                break
-            except asyncio.CancelledError:
-                logger.info("worker cancelled")
-                break
-            except Exception as ex:
-                exception = ex
-                if retry_counter < self.max_retry:
-                    sleep_time = randint(1, 6)
-                    logger.error(f"ex: {type(ex)}")
-                    logger.info(f"sleep before retry: {sleep_time} sec ({self.rate_limit})")
-                    time.sleep(sleep_time)
-        else:
+                return func(*args, **kwargs)
+            except Exception:
+                metrics.inc("call_errors", command=func_name)
+                raise
+            finally:
+                metrics.inc("calls", command=func_name)
+                metrics.observe("call_seconds", func_name, time.perf_counter() - start)
+
+        def on_retry(attempt_number, delay, ex):
+            if metrics is not None:
+                metrics.record_retry(attempt_number, delay, ex)
+            logger.error(f"ex: {type(ex)}")
+            logger.info(f"sleep before retry: {delay:.2f} sec ({self.rate_limit})")
+
+        try:
+            value = self.retry_policy.call(attempt, on_retry=on_retry)
+        except asyncio.CancelledError as ex:
+            logger.info("worker cancelled")
+            return None, ex
+        except Exception as ex:
             logger.error(
-                f"!!! Error: function {func.__name__} failed with args: {args} and kwargs: {kwargs}. "
-                f"Exception caught: {exception}"
+                f"!!! Error: function {func_name} failed with args: {args} and kwargs: {kwargs}. "
+                f"Exception caught: {ex}"
             )
-        if self.sem:
-            self.sem.release()
-        return value
+            return None, ex
+        if self.iter_indication:
+            self.iter_counter += 1
+            if self.iter_counter % self.iter_indication == 0:
+                logger.info(f"running iter {self.iter_counter}")
+        return value, None
+
+    def _call_in_process(self, func, *args, **kwargs):
+        return self.process_executor.submit(func, *args, **kwargs).result()
 
     def run(self, func, *args, **kwargs):
         """Execute the given function in async way.
@@ -175,19 +278,100 @@ class Asyncit:  # pylint: disable=too-many-instance-attributes
         :param func: The function to be invoked.
         :param args: Positional arguments for the function.
         :param kwargs: Keyword arguments for the function.
+        :return: The task index, the submission order of its TaskResult.
+        """
+        if self.max_pending and len(self.futures) >= self.max_pending:
+            self.loop.run_until_complete(self._wait_for_slot())
+        return self._submit(func, args, kwargs)
+
+    async def run_async(self, func, *args, **kwargs):
+        """Execute the given function in async way, from a coroutine running in the Asyncit loop.
+
+        Awaits, instead of blocking the loop, while `max_pending` calls are pending.
+
+        :param func: The function to be invoked.
+        :param args: Positional arguments for the function.
+        :param kwargs: Keyword arguments for the function.
+        :return: The task index, the submission order of its TaskResult.
         """
-        func = partial(self.func_wrapper, func, *args, **kwargs)
+        if self.max_pending:
+            await self._wait_for_slot()
+        return self._submit(func, args, kwargs)
+
+    def _submit(self, func, args, kwargs):
+        index = self._next_index
+        self._next_index += 1
+        func = partial(self._run_task, index, func, args, kwargs)
+
+        call = self.executor.submit(func)
+        self._calls.add(call)
+        call.add_done_callback(self._calls.discard)
+        future = asyncio.wrap_future(call, loop=self.loop)
+        self.futures.add(future)
+        future.add_done_callback(self.futures.discard)
+        return index
 
-        # Run tasks in the default loop's executor
-        self.futures.append(self.loop.run_in_executor(None, func))
+    async def _wait_for_slot(self):
+        while len(self.futures) >= self.max_pending:
+            done, _ = await asyncio.wait(self.futures, return_when=asyncio.FIRST_COMPLETED)
+            self.futures.difference_update(done)
 
     def wait(self):
         """Wait for all run to be completed."""
         self.loop.run_until_complete(self._gather_with_concurrency())
-        self.futures = []
+        self.futures.clear()
+
+    async def wait_async(self):
+        """Wait for all run to be completed, from a coroutine running in the Asyncit loop."""
+        await self._gather_with_concurrency()
+        self.futures.clear()
+
+    def results(self):
+        """Get the TaskResult of each call completed since the last collection, in submission order.
+
+        Requires save_output. The values are kept as returned, without any copy or serialization.
+
+        >>> with Asyncit(pool_size=10, save_output=True) as asyncit:
+        >>>     for channel_id in channel_ids:
+        >>>         asyncit.run(search_channel, channel_id)
+        >>>     asyncit.wait()
+        >>>     for result in asyncit.results():
+        >>>         print(result.args[0], result.exception or len(result.value))
+        """
+        return sorted(self._drain(), key=lambda result: result.index)
+
+    def as_completed(self):
+        """Yield the TaskResult of each call as soon as it completes, until no call is pending.
+
+        Requires save_output. Drives the Asyncit loop, so it can't be used from a coroutine running in it.
+        """
+        while True:
+            try:
+                yield self.output_queue.get_nowait()
+                continue
+            except queue.Empty:
+                pass
+            if not self.futures:
+                # a call puts its result before its future completes
+                yield from self._drain()
+                return
+            done, _ = self.loop.run_until_complete(asyncio.wait(self.futures, return_when=asyncio.FIRST_COMPLETED))
+            self.futures.difference_update(done)
+
+    def _drain(self):
+        items = []
+        while True:
+            try:
+                items.append(self.output_queue.get_nowait())
+            except queue.Empty:
+                return items
 
     def get_output(self):
-        """Get the returned values.
+        """Get the returned values, in submission order. Failed calls and None values are skipped.
+
+        Prefer `results()`, which also gives the call arguments and exception of each value.
+        If save_as_json, the values are converted to their json representation (e.g. tuples become lists), values
+        json doesn't support (e.g. datetime) are converted to str.
 
         >>> from asyncit import Asyncit
         >>> asyncit = Asyncit(
@@ -202,16 +386,9 @@ class Asyncit:  # pylint: disable=too-many-instance-attributes
         >>> asyncit.wait()
         >>> return asyncit.get_output()
         """
-        if not self.output_queue:
-            return None
-
-        items = []
-        while not self.output_queue.empty():
-            items.append(self.output_queue.get())
-
+        items = [result.value for result in self.results() if result.value is not None]
         if items and self.save_as_json:
-            items = [json.loads(i) for i in items]  # pylint: disable=not-an-iterable
-
+            items = [json.loads(json.dumps(item, default=str)) for item in items]
         return items
 
     async def _gather_with_concurrency(self):
@@ -0,0 +1,227 @@
+"""
+This file is part of Filmot API wrapper.
+
+Filmot API is free software: you can redistribute it and/or modify
+it under the terms of the MIT License as published by the Massachusetts
+Institute of Technology.
+
+For full details, please see the LICENSE file located in the root
+directory of this project.
+
+Batch runner for a JSON lines file of search queries, with checkpoint / resume.
+"""
+import os
+import json
+import time
+import logging
+from pathlib import Path
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterator, List, Optional, Set, Tuple, Union
+
+from .dicts import DotDict
+from .exceptions import FilmotException
+from .export import JSONLWriter
+from .query import SearchQuery
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROGRESS_INTERVAL = 30.0
+
+
+def read_queries(path: Union[str, Path]) -> Iterator[Tuple[str, dict]]:
+    """
+    Read a JSON lines file of `Filmot.search` kwargs (one json object per line, with a `query` key).
+
+    Args:
+        path (str | Path): The queries file.
+
+    Yields:
+        tuple: The query hash, and the search kwargs: the validated `SearchQuery` as `query`, and the `limit` if set.
+            Queries that only differ in the text spacing or quoting, or in the categories order, have the same hash.
+
+    Raises:
+        FilmotException: If a line is not a valid query.
+    """
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                kwargs = json.loads(line)
+            except ValueError as ex:
+                raise FilmotException(f"Invalid json in {path} line {line_number}: {ex}")
+            if not isinstance(kwargs, dict) or not kwargs.get("query"):
+                raise FilmotException(f"Invalid query in {path} line {line_number}, expected an object with a `query`")
+            limit = kwargs.pop("limit", None)
+            try:
+                query = SearchQuery(**kwargs)
+            except TypeError as ex:
+                raise FilmotException(f"Invalid query in {path} line {line_number}: {ex}")
+            except FilmotException as ex:
+                raise FilmotException(f"Invalid query in {path} line {line_number}: {ex.message}")
+            if limit is None:
+                yield query.key, {"query": query}
+            else:
+                yield f"{query.key}:{limit}", {"query": query, "limit": limit}
+
+
+class BatchRunner:
+    """Run the queries of a JSON lines file concurrently, and stream their results to a JSON lines file.
+
+    The queries share the client, so they run under its rate limits, throttle and retry policy.
+    The hash of every completed query is appended to a checkpoint file (after its results are written), so
+    an interrupted run resumes with the remaining queries. A query interrupted before its checkpoint is run
+    again on resume, so its results may appear twice in the output.
+
+    >>> runner = BatchRunner(Filmot(), concurrency=4)
+    >>> stats = runner.run("queries.jsonl", "results.jsonl.gz")
+    """
+
+    def __init__(
+        self,
+        client,
+        concurrency: Optional[int] = None,
+        flatten_hits: bool = False,
+        progress_interval: float = DEFAULT_PROGRESS_INTERVAL,
+    ):
+        """
+        Initialize the runner.
+
+        Args:
+            client (Filmot): The client to run the searches with.
+            concurrency (int): Max queries to run at once, defaults to the client concurrency.
+            flatten_hits (bool): Write one line per hit instead of one line per result, see `write_jsonl`.
+            progress_interval (float): Seconds between the progress (throughput and ETA) log lines.
+        """
+        self.client = client
+        self.concurrency = concurrency or client.concurrency
+        self.flatten_hits = flatten_hits
+        self.progress_interval = progress_interval
+
+    @staticmethod
+    def load_checkpoint(checkpoint_path: Union[str, Path]) -> Set[str]:
+        """Get the hashes of the completed queries."""
+        if not os.path.exists(checkpoint_path):
+            return set()
+        with open(checkpoint_path, encoding="utf-8") as f:
+            return {line.strip() for line in f if line.strip()}
+
+    def run(
+        self,
+        input_path: Union[str, Path],
+        output_path: Union[str, Path],
+        checkpoint_path: Optional[Union[str, Path]] = None,
+        limit: Optional[int] = None,
+    ) -> DotDict:
+        """
+        Run the queries, skipping the ones completed by a previous run.
+
+        Args:
+            input_path (str | Path): JSON lines file of `Filmot.search` kwargs.
+            output_path (str | Path): JSON lines output, appended to when resuming (.gz / .zst are compressed).
+            checkpoint_path (str | Path): Completed queries file, defaults to the output path + ".checkpoint".
+            limit (int): Default `limit` for the queries that don't set one.
+
+        Returns:
+            DotDict: Run stats: total, skipped, completed, failed, lines, elapsed, failed_queries.
+        """
+        checkpoint_path = checkpoint_path or f"{output_path}.checkpoint"
+        completed = self.load_checkpoint(checkpoint_path)
+        pending: List[Tuple[str, dict]] = []
+        seen = set()
+        skipped = 0
+        for query_hash, kwargs in read_queries(input_path):
+            if query_hash in completed or query_hash in seen:
+                skipped += 1
+                continue
+            seen.add(query_hash)
+            if limit is not None:
+                kwargs.setdefault("limit", limit)
+            pending.append((query_hash, kwargs))
+        stats = DotDict(
+            total=len(pending) + skipped,
+            skipped=skipped,
+            completed=0,
+            failed=0,
+            lines=0,
+            elapsed=0.0,
+            failed_queries=[],
+        )
+        if skipped:
+            logger.info(f"Resuming, {skipped} queries already completed")
+        if not pending:
+            return stats
+
+        resume = os.path.exists(output_path) and bool(completed)
+        start_time = time.monotonic()
+        last_report = start_time
+        queue = iter(pending)
+        with JSONLWriter(output_path, append=resume) as writer, open(
+            checkpoint_path, "a", encoding="utf-8"
+        ) as checkpoint, ThreadPoolExecutor(self.concurrency, thread_name_prefix="filmot-batch") as executor:
+            running = {}
+
+            def submit_next() -> bool:
+                item = next(queue, None)
+                if item is None:
+                    return False
+                query_hash, kwargs = item
+                running[executor.submit(self.client.search, **kwargs)] = (query_hash, kwargs)
+                return True
+
+            # keep a bounded window of running queries, instead of submitting all of them at once
+            while len(running) < self.concurrency and submit_next():
+                pass
+            try:
+                while running:
+                    done, _ = wait(running, timeout=self.progress_interval, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        query_hash, kwargs = running.pop(future)
+                        self._handle_result(future, query_hash, kwargs, writer, checkpoint, stats)
+                        submit_next()
+                    now = time.monotonic()
+                    if now - last_report >= self.progress_interval:
+                        last_report = now
+                        self._report_progress(stats, len(pending), now - start_time)
+            finally:
+                for future in running:
+                    future.cancel()
+        stats.elapsed = time.monotonic() - start_time
+        self._report_progress(stats, len(pending), stats.elapsed)
+        return stats
+
+    def _handle_result(self, future, query_hash: str, kwargs: dict, writer: JSONLWriter, checkpoint, stats: DotDict):
+        """Write the results of a finished query and checkpoint it, if all its categories succeeded."""
+        try:
+            results = future.result()
+        except Exception as ex:
+            logger.warning(f"Query {kwargs} failed: {ex}")
+            stats.failed += 1
+            stats.failed_queries.append(kwargs)
+            return
+        errors = getattr(results, "errors", None)
+        if errors:
+            # the partial results are dropped, a resume runs the whole query again
+            logger.warning(f"Query {kwargs} failed for categories: {list(errors)}")
+            stats.failed += 1
+            stats.failed_queries.append(kwargs)
+            return
+        lines_before = writer.count
+        for responses in results.values():
+            writer.write_responses(responses, flatten_hits=self.flatten_hits)
+        stats.lines += writer.count - lines_before
+        writer.flush()
+        checkpoint.write(f"{query_hash}\n")
+        checkpoint.flush()
+        stats.completed += 1
+
+    @staticmethod
+    def _report_progress(stats: DotDict, total: int, elapsed: float):
+        done = stats.completed + stats.failed
+        rate = done / elapsed if elapsed > 0 else 0.0
+        eta = (total - done) / rate if rate > 0 else float("inf")
+        logger.info(
+            f"Batch progress: {done}/{total} queries ({stats.failed} failed), {stats.lines} lines, "
+            f"{rate:.2f} queries/sec, ETA {eta:.0f} sec"
+        )
@@ -0,0 +1,538 @@
+"""
+This file is part of Filmot API wrapper.
+
+Filmot API is free software: you can redistribute it and/or modify
+it under the terms of the MIT License as published by the Massachusetts
+Institute of Technology.
+
+For full details, please see the LICENSE file located in the root
+directory of this project.
+"""
+import os
+import json
+import time
+import zlib
+import hashlib
+import logging
+import weakref
+import threading
+from typing import Any, Awaitable, Callable, Optional
+from collections import OrderedDict
+from pathlib import Path
+
+from .config import DEFAULT_CONFIG_PATH
+from .retry import load_asyncio
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = str(Path(DEFAULT_CONFIG_PATH).parent / "cache.sqlite")
+DEFAULT_CACHE_TTL = 24 * 60 * 60
+DEFAULT_CACHE_MAX_SIZE = 256 * 1024 * 1024
+DEFAULT_MEMORY_CACHE_MAX_ENTRIES = 1024
+# seconds between the DiskCache writes of an entry access time, and of the hit / miss counters
+ACCESS_UPDATE_INTERVAL = 60
+COUNTERS_FLUSH_INTERVAL = 5
+
+
+def make_cache_key(cmd: str, query: dict) -> str:
+    """Build a cache key from the API command and its normalized query params.
+
+    None values are dropped (they are not sent), and keys are sorted, so equivalent queries share a key.
+    """
+    params = {k: v for k, v in query.items() if v is not None}
+    normalized = json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(f"{cmd}?{normalized}".encode("utf-8")).hexdigest()  # nosec B324 - not for security
+
+
+class BaseCache:
+    """Base class for the API response caches.
+
+    A cache is set on the client, e.g. `Filmot(cache=DiskCache())`, and is consulted by `send_api`
+    before any request is sent.
+    """
+
+    def __init__(self, ttl: Optional[float] = DEFAULT_CACHE_TTL, command_ttl: Optional[dict] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl (float, optional): Seconds an entry is valid. None for no expiration, 0 to disable caching.
+            command_ttl (dict, optional): TTL per API command, overriding `ttl`. e.g. {"getsearchsubtitles": 3600}
+        """
+        self.ttl = ttl
+        self.command_ttl = command_ttl or {}
+        self.hits = 0
+        self.misses = 0
+        self._counters_lock = threading.Lock()
+
+    def get_ttl(self, cmd: str) -> Optional[float]:
+        """Get the TTL of the given API command."""
+        return self.command_ttl.get(cmd, self.ttl)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a cached value, None if missing or expired."""
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """Store a value for `ttl` seconds (None for no expiration)."""
+        raise NotImplementedError
+
+    def clear(self):
+        """Remove all the cached values."""
+        raise NotImplementedError
+
+    def close(self):
+        """Release the cache resources, the in-memory caches have none."""
+
+    def stats(self) -> dict:
+        """Get the cache counters."""
+        return {"hits": self.hits, "misses": self.misses}
+
+    def _count(self, hit: bool):
+        with self._counters_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get_or_load(self, cmd: str, query: dict, loader: Callable[[], Any]) -> Any:
+        """
+        Get the cached response of the API call, or load and cache it.
+
+        Args:
+            cmd (str): The API command.
+            query (dict): The API query params.
+            loader (callable): Sends the API request, called on a cache miss.
+
+        Returns:
+            The API response.
+        """
+        ttl = self.get_ttl(cmd)
+        if ttl == 0:
+            return loader()
+        key = make_cache_key(cmd, query)
+        value = self.get(key)
+        self._count(hit=value is not None)
+        if value is not None:
+            return value
+        value = loader()
+        self.set(key, value, ttl)
+        return value
+
+    async def aget_or_load(self, cmd: str, query: dict, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Get the cached response of the API call, or load and cache it - for asyncio callers.
+
+        Args:
+            cmd (str): The API command.
+            query (dict): The API query params.
+            loader (callable): Returns an awaitable that sends the API request, called on a cache miss.
+
+        Returns:
+            The API response.
+        """
+        ttl = self.get_ttl(cmd)
+        if ttl == 0:
+            return await loader()
+        key = make_cache_key(cmd, query)
+        value = self.get(key)
+        self._count(hit=value is not None)
+        if value is not None:
+            return value
+        value = await loader()
+        self.set(key, value, ttl)
+        return value
+
+
+class _Flight:
+    """An in-flight load of a key, shared by the threads and the asyncio tasks waiting for it."""
+
+    __slots__ = ("event", "value", "error", "abandoned", "waiters")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+        # the leader was cancelled / interrupted, one of the waiters takes over the load
+        self.abandoned = False
+        # (loop, future) of the waiting asyncio tasks
+        self.waiters = []
+
+
+def _wake_waiter(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class MemoryCache(BaseCache):
+    """In-process LRU cache for the API responses, with request coalescing.
+
+    Concurrent identical calls (same command and params) wait for a single upstream request and share its
+    parsed response, whether they come from threads or from asyncio tasks.
+
+    >>> filmot = Filmot(cache=MemoryCache(max_entries=10000, ttl=60))
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MEMORY_CACHE_MAX_ENTRIES,
+        ttl: Optional[float] = DEFAULT_CACHE_TTL,
+        command_ttl: Optional[dict] = None,
+    ):
+        """
+        Initialize the memory cache.
+
+        Args:
+            max_entries (int): Max cached responses, the least recently used are evicted first.
+            ttl (float, optional): Seconds an entry is valid. None for no expiration, 0 to disable caching.
+            command_ttl (dict, optional): TTL per API command, overriding `ttl`.
+        """
+        super().__init__(ttl=ttl, command_ttl=command_ttl)
+        self.max_entries = max_entries
+        self.coalesced = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        # key -> _Flight, joined by both the threads and the asyncio tasks
+        self._in_flight = {}
+
+    def _get_locked(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires is not None and expires <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a cached value, None if missing or expired."""
+        with self._lock:
+            return self._get_locked(key)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """Store a value for `ttl` seconds (None for no expiration), evicting the least recently used entries."""
+        expires = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove all the cached values."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Get the cache counters and entries count."""
+        with self._lock:
+            entries = len(self._entries)
+        return {"hits": self.hits, "misses": self.misses, "coalesced": self.coalesced, "entries": entries}
+
+    def _join(self, key: str, waiter: Optional[tuple] = None) -> tuple:
+        """
+        Get the cached value of the key, or join its in-flight load - starting it if there is none.
+
+        Args:
+            key (str): The cache key.
+            waiter (tuple, optional): The (loop, future) to wake when the load ends, for asyncio callers.
+
+        Returns:
+            tuple: The cached value (None on a miss), the _Flight, and whether the caller leads the load.
+        """
+        with self._lock:
+            value = self._get_locked(key)
+            if value is not None:
+                self._count(hit=True)
+                return value, None, False
+            flight = self._in_flight.get(key)
+            if flight is None:
+                self._count(hit=False)
+                flight = self._in_flight[key] = _Flight()
+                return None, flight, True
+            if waiter is not None:
+                flight.waiters.append(waiter)
+            with self._counters_lock:
+                self.coalesced += 1
+            return None, flight, False
+
+    def _land(
+        self, key: str, flight: _Flight, value: Any = None, error: Optional[BaseException] = None, abandoned=False
+    ):
+        """End the load of the key and wake its waiters."""
+        with self._lock:
+            self._in_flight.pop(key, None)
+            flight.value = value
+            flight.error = error
+            flight.abandoned = abandoned
+            waiters, flight.waiters = flight.waiters, []
+        flight.event.set()
+        for loop, future in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake_waiter, future)
+            except RuntimeError:
+                # the waiter loop is closed
+                pass
+
+    @staticmethod
+    def _flight_result(flight: _Flight) -> Any:
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    def get_or_load(self, cmd: str, query: dict, loader: Callable[[], Any]) -> Any:
+        """Get the cached response of the API call, or load it - only once for concurrent identical calls."""
+        ttl = self.get_ttl(cmd)
+        if ttl == 0:
+            return loader()
+        key = make_cache_key(cmd, query)
+        while True:
+            value, flight, leader = self._join(key)
+            if value is not None:
+                return value
+            if leader:
+                break
+            flight.event.wait()
+            if not flight.abandoned:
+                return self._flight_result(flight)
+            # the leader was interrupted, the first waiter to join again takes over the load
+
+        try:
+            value = loader()
+        except Exception as ex:
+            self._land(key, flight, error=ex)
+            raise
+        except BaseException:
+            self._land(key, flight, abandoned=True)
+            raise
+        self.set(key, value, ttl)
+        self._land(key, flight, value=value)
+        return value
+
+    async def aget_or_load(self, cmd: str, query: dict, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Get the cached response of the API call, or load it - only once for concurrent identical tasks."""
+        ttl = self.get_ttl(cmd)
+        if ttl == 0:
+            return await loader()
+
+        asyncio = load_asyncio()
+
+        key = make_cache_key(cmd, query)
+        loop = asyncio.get_running_loop()
+        while True:
+            future = loop.create_future()
+            value, flight, leader = self._join(key, (loop, future))
+            if value is not None:
+                return value
+            if leader:
+                break
+            await future
+            if not flight.abandoned:
+                return self._flight_result(flight)
+            # the leader was cancelled, the first waiter to join again takes over the load
+
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            self._land(key, flight, abandoned=True)
+            raise
+        except Exception as ex:
+            self._land(key, flight, error=ex)
+            raise
+        except BaseException:
+            self._land(key, flight, abandoned=True)
+            raise
+        self.set(key, value, ttl)
+        self._land(key, flight, value=value)
+        return value
+
+
+class DiskCache(BaseCache):
+    """Persistent SQLite cache for the API responses, stored next to the config file.
+
+    Entries expire after their command TTL, and the least recently used entries are evicted once the stored
+    payloads exceed `max_size` bytes. Payloads are stored as zlib compressed json.
+
+    >>> filmot = Filmot(cache=DiskCache(command_ttl={"getsearchsubtitles": 3600}))
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: Optional[float] = DEFAULT_CACHE_TTL,
+        command_ttl: Optional[dict] = None,
+        max_size: int = DEFAULT_CACHE_MAX_SIZE,
+        compress_level: int = 6,
+    ):
+        """
+        Initialize the disk cache.
+
+        Args:
+            path (str, optional): The SQLite file path. Defaults to ~/.config/filmot/cache.sqlite
+            ttl (float, optional): Seconds an entry is valid. None for no expiration, 0 to disable caching.
+            command_ttl (dict, optional): TTL per API command, overriding `ttl`.
+            max_size (int): Max total size in bytes of the stored (compressed) payloads.
+            compress_level (int): zlib compression level, 0 to store the payloads uncompressed.
+        """
+        import sqlite3
+
+        super().__init__(ttl=ttl, command_ttl=command_ttl)
+        self.path = Path(path or DEFAULT_CACHE_PATH).expanduser()
+        self.max_size = max_size
+        self.compress_level = compress_level
+        self._lock = threading.Lock()
+        os.makedirs(self.path.parent, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value BLOB, size INTEGER, compressed INTEGER, expires REAL, accessed REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER)")
+        self._conn.execute("INSERT OR IGNORE INTO counters VALUES ('hits', 0), ('misses', 0)")
+        # the stored size is kept in a counters row by triggers, so a write doesn't scan the table.
+        # recursive triggers make the delete trigger fire for the rows an INSERT OR REPLACE removes
+        self._conn.execute("PRAGMA recursive_triggers = ON")
+        self._conn.execute("INSERT OR IGNORE INTO counters SELECT 'size', COALESCE(SUM(size), 0) FROM entries")
+        self._conn.execute(
+            "CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN "
+            "UPDATE counters SET value = value + NEW.size WHERE name = 'size'; END"
+        )
+        self._conn.execute(
+            "CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN "
+            "UPDATE counters SET value = value - OLD.size WHERE name = 'size'; END"
+        )
+        # hits and misses not written to the counters table yet
+        self._pending = {"hits": 0, "misses": 0}
+        self._flushed = time.monotonic()
+        # a cache that is never closed still writes its pending counters, when collected or at exit
+        self._finalizer = weakref.finalize(self, self._close_connection, self._conn, self._lock, self._pending)
+
+    def close(self):
+        """Write the pending counters and close the database connection."""
+        self._finalizer()
+
+    @classmethod
+    def _close_connection(cls, conn, lock: threading.Lock, pending: dict):
+        with lock:
+            cls._write_counters(conn, pending)
+            conn.close()
+
+    def _encode(self, value: Any) -> tuple:
+        data = json.dumps(value, separators=(",", ":")).encode("utf-8")
+        if self.compress_level:
+            return zlib.compress(data, self.compress_level), 1
+        return data, 0
+
+    @staticmethod
+    def _decode(data: bytes, compressed: int) -> Any:
+        if compressed:
+            data = zlib.decompress(data)
+        return json.loads(data)
+
+    def _count(self, hit: bool):
+        super()._count(hit)
+        with self._lock:
+            self._pending["hits" if hit else "misses"] += 1
+            if time.monotonic() - self._flushed >= COUNTERS_FLUSH_INTERVAL:
+                self._flush_counters()
+
+    def _flush_counters(self):
+        """Add the pending hits and misses to the counters table, called with the lock held."""
+        self._write_counters(self._conn, self._pending)
+        self._flushed = time.monotonic()
+
+    @staticmethod
+    def _write_counters(conn, pending: dict):
+        updates = [(count, name) for name, count in pending.items() if count]
+        if updates:
+            conn.executemany("UPDATE counters SET value = value + ? WHERE name = ?", updates)
+            pending.update(hits=0, misses=0)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a cached value, None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, compressed, expires, accessed FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            data, compressed, expires, accessed = row
+            if expires is not None and expires <= now:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                return None
+            # a coarse access time is enough for the LRU eviction, and keeps most reads write free
+            if now - accessed >= ACCESS_UPDATE_INTERVAL:
+                self._conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+        try:
+            return self._decode(data, compressed)
+        except (zlib.error, ValueError) as ex:
+            logger.warning(f"Dropping corrupted cache entry {key}: {ex}")
+            with self._lock:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            return None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """Store a value for `ttl` seconds (None for no expiration), evicting old entries if needed."""
+        data, compressed = self._encode(value)
+        now = time.time()
+        expires = now + ttl if ttl is not None else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                (key, data, len(data), compressed, expires, now),
+            )
+            self._flush_counters()
+            self._evict(now)
+
+    def _total_size(self) -> int:
+        return self._conn.execute("SELECT value FROM counters WHERE name = 'size'").fetchone()[0]
+
+    def _evict(self, now: float):
+        """Remove expired entries, then least recently used entries until the cache fits `max_size`."""
+        if self._total_size() <= self.max_size:
+            return
+        self._conn.execute("DELETE FROM entries WHERE expires IS NOT NULL AND expires <= ?", (now,))
+        total_size = self._total_size()
+        evict_keys = []
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY accessed"):
+            if total_size <= self.max_size:
+                break
+            evict_keys.append((key,))
+            total_size -= size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", evict_keys)
+        logger.debug(f"Evicted {len(evict_keys)} cache entries")
+
+    def purge_expired(self) -> int:
+        """Remove the expired entries, return the amount removed."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM entries WHERE expires IS NOT NULL AND expires <= ?", (time.time(),)
+            )
+        return cursor.rowcount
+
+    def clear(self):
+        """Remove all the cached values."""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.execute("UPDATE counters SET value = 0")
+            self._pending.update(hits=0, misses=0)
+            self._conn.execute("VACUUM")
+
+    def stats(self) -> dict:
+        """Get the cache counters (persisted across runs), entries count and total stored size."""
+        with self._lock:
+            self._flush_counters()
+            counters = dict(self._conn.execute("SELECT name, value FROM counters").fetchall())
+            entries = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return {
+            "hits": counters.get("hits", 0),
+            "misses": counters.get("misses", 0),
+            "entries": entries,
+            "size": counters.get("size", 0),
+            "path": str(self.path),
+        }
@@ -0,0 +1,281 @@
+"""
+This file is part of Filmot API wrapper.
+
+Filmot API is free software: you can redistribute it and/or modify
+it under the terms of the MIT License as published by the Massachusetts
+Institute of Technology.
+
+For full details, please see the LICENSE file located in the root
+directory of this project.
+
+The `filmot` command line.
+
+    filmot search "Spill The Beans" --category Gaming --category Sports --limit 20 --format table
+    filmot bulk queries.jsonl results.jsonl.gz --concurrency 8 --rate-limit 5/1
+    filmot cache stats
+    filmot cache purge --expired
+
+The subcommands import the client modules only when they run, so `filmot --help` starts fast.
+"""
+import sys
+import argparse
+import logging
+from contextlib import contextmanager
+
+DEFAULT_LIMIT = 10
+OUTPUT_FORMATS = ("table", "json", "jsonl")
+CACHE_MODES = ("disk", "memory", "off")
+TITLE_MAX_LENGTH = 60
+
+
+def parse_rate_limit(value: str) -> dict:
+    """Parse a `max_calls/period_sec` rate limit, e.g. 5/1 for 5 calls per second."""
+    try:
+        max_calls, _, period_sec = value.partition("/")
+        limit = {"max_calls": int(max_calls), "period_sec": float(period_sec or 1)}
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid rate limit: {value}, expected max_calls/period_sec, e.g. 5/1")
+    if limit["max_calls"] <= 0 or limit["period_sec"] <= 0:
+        raise argparse.ArgumentTypeError(f"invalid rate limit: {value}, values should be positive")
+    return limit
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser."""
+    parser = argparse.ArgumentParser(prog="filmot", description="Search YouTube subtitles with the Filmot API.")
+    parser.add_argument("-v", "--verbose", action="count", default=0, help="Verbose logging (-vv for debug).")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    client_options = argparse.ArgumentParser(add_help=False)
+    client_options.add_argument("--concurrency", type=int, default=None, help="Max concurrent requests.")
+    client_options.add_argument(
+        "--rate-limit",
+        type=parse_rate_limit,
+        action="append",
+        default=None,
+        metavar="CALLS/SEC",
+        help="Max calls per period, e.g. 5/1 or 100/60. Can be repeated.",
+    )
+    client_options.add_argument("--cache", choices=CACHE_MODES, default="disk", help="Response cache (default: disk).")
+    client_options.add_argument("--cache-path", default=None, help="Disk cache file path.")
+    client_options.add_argument("--cache-ttl", type=float, default=None, help="Cache entries TTL, in seconds.")
+
+    search = subparsers.add_parser("search", parents=[client_options], help="Search subtitles for a query.")
+    search.add_argument("query", help="The search query.")
+    search.add_argument("--limit", type=int, default=DEFAULT_LIMIT, help="Max videos per category.")
+    search.add_argument("--category", action="append", default=None, help="Video category. Can be repeated.")
+    search.add_argument("--exclude-category", default=None, help="Video category to exclude.")
+    search.add_argument("--language", default=None, help="Subtitles language code, e.g. en.")
+    search.add_argument("--country", type=int, default=None, help="Channel country code.")
+    search.add_argument("--channel-id", default=None, help="Search only the videos of this channel.")
+    search.add_argument("--title", default=None, help="Search only the videos with this title.")
+    search.add_argument("--min-views", type=int, default=None)
+    search.add_argument("--max-views", type=int, default=None)
+    search.add_argument("--min-likes", type=int, default=None)
+    search.add_argument("--start-duration", type=int, default=None, help="Min video duration, in seconds.")
+    search.add_argument("--end-duration", type=int, default=None, help="Max video duration, in seconds.")
+    search.add_argument(
+        "--license", type=int, choices=(1, 2), default=None, help="1 for standard YouTube, 2 for Creative Commons."
+    )
+    search.add_argument(
+        "--search-manual-subs", type=int, choices=(1, 2), default=None, help="1 to search the manual subtitles."
+    )
+    search.add_argument("--start-date", default=None, help="Upload date from, YYYY-MM-DD.")
+    search.add_argument("--end-date", default=None, help="Upload date until, YYYY-MM-DD.")
+    search.add_argument("--format", choices=OUTPUT_FORMATS, default="table", help="Output format (default: table).")
+    search.add_argument("--output", default=None, help="Output file (default: stdout).")
+    search.add_argument("--flatten-hits", action="store_true", help="JSONL output: one line per hit.")
+    search.set_defaults(handler=run_search)
+
+    bulk = subparsers.add_parser(
+        "bulk",
+        parents=[client_options],
+        help="Run a JSON lines file of queries, resumable.",
+        description='Run a JSON lines file of search kwargs (e.g. {"query": "...", "category": "Gaming"}) '
+        "and write the results as JSON lines. Completed queries are checkpointed, rerun the command to resume.",
+    )
+    bulk.add_argument("input", help="Queries JSON lines file.")
+    bulk.add_argument("output", help="Results JSON lines file (.gz / .zst are compressed).")
+    bulk.add_argument("--limit", type=int, default=None, help="Max videos per category, for queries without one.")
+    bulk.add_argument("--flatten-hits", action="store_true", help="Write one line per hit.")
+    bulk.add_argument("--checkpoint", default=None, help="Checkpoint file (default: OUTPUT.checkpoint).")
+    bulk.add_argument("--progress-interval", type=float, default=30.0, help="Seconds between progress logs.")
+    bulk.set_defaults(handler=run_bulk)
+
+    cache = subparsers.add_parser("cache", help="Manage the disk cache.")
+    cache_commands = cache.add_subparsers(dest="cache_command", required=True)
+    stats = cache_commands.add_parser("stats", help="Show the cache stats.")
+    stats.add_argument("--cache-path", default=None, help="Disk cache file path.")
+    stats.set_defaults(handler=run_cache_stats)
+    purge = cache_commands.add_parser("purge", help="Remove the cached responses.")
+    purge.add_argument("--cache-path", default=None, help="Disk cache file path.")
+    purge.add_argument("--expired", action="store_true", help="Remove only the expired entries.")
+    purge.set_defaults(handler=run_cache_purge)
+    return parser
+
+
+def _create_cache(args):
+    if args.cache == "off":
+        return None
+    kwargs = {} if args.cache_ttl is None else {"ttl": args.cache_ttl}
+    if args.cache == "memory":
+        from .cache import MemoryCache
+
+        return MemoryCache(**kwargs)
+    from .cache import DiskCache
+
+    return DiskCache(path=args.cache_path, **kwargs)
+
+
+@contextmanager
+def _open_client(args):
+    """Get a client, and close it and its cache on exit, so the cache counters are written."""
+    from .filmot import Filmot
+
+    cache = _create_cache(args)
+    kwargs = {"rate_limit": args.rate_limit, "cache": cache}
+    if args.concurrency:
+        kwargs["concurrency"] = args.concurrency
+    try:
+        with Filmot(**kwargs) as client:
+            yield client
+    finally:
+        if cache is not None:
+            cache.close()
+
+
+def _write_table(results, out):
+    from prettytable import PrettyTable
+
+    table = PrettyTable(["Category", "Video", "Title", "Views", "Hits", "Link"])
+    table.align = "l"
+    for category, responses in results.items():
+        for response in responses:
+            info = response.video_info
+            title = info.title or ""
+            if len(title) > TITLE_MAX_LENGTH:
+                title = title[: TITLE_MAX_LENGTH - 3] + "..."
+            link = response.hit_data(0)["link"] if response.hit_count() else ""
+            table.add_row([category or "", info.id, title, info.view_count, response.hit_count(), link])
+    out.write(f"{table}\n")
+    for category, error in getattr(results, "errors", {}).items():
+        out.write(f"Failed to search {category or 'all categories'}: {error}\n")
+
+
+def _write_json(results, out):
+    import json
+
+    from .responses_base import ResponseJSONEncoder
+
+    data = {category or "": responses for category, responses in results.items()}
+    json.dump(data, out, cls=ResponseJSONEncoder, indent=2)
+    out.write("\n")
+
+
+def run_search(args) -> int:
+    """Run the search subcommand."""
+    search_kwargs = dict(
+        query=args.query,
+        category=args.category[0] if args.category and len(args.category) == 1 else args.category,
+        exclude_category=args.exclude_category,
+        language=args.language,
+        country=args.country,
+        channel_id=args.channel_id,
+        title=args.title,
+        min_views=args.min_views,
+        max_views=args.max_views,
+        min_likes=args.min_likes,
+        start_duration=args.start_duration,
+        end_duration=args.end_duration,
+        license=args.license,
+        search_manual_subs=args.search_manual_subs,
+        start_date=args.start_date,
+        end_date=args.end_date,
+        limit=args.limit,
+    )
+    with _open_client(args) as client:
+        results = client.search(**search_kwargs)
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        if args.format == "table":
+            _write_table(results, out)
+        elif args.format == "json":
+            _write_json(results, out)
+        else:
+            from .export import write_jsonl
+
+            write_jsonl(results, out, flatten_hits=args.flatten_hits)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 1 if getattr(results, "errors", None) else 0
+
+
+def run_bulk(args) -> int:
+    """Run the bulk subcommand."""
+    from .batch import BatchRunner
+
+    with _open_client(args) as client:
+        runner = BatchRunner(
+            client,
+            concurrency=args.concurrency,
+            flatten_hits=args.flatten_hits,
+            progress_interval=args.progress_interval,
+        )
+        stats = runner.run(args.input, args.output, checkpoint_path=args.checkpoint, limit=args.limit)
+    print(
+        f"{stats.completed} completed, {stats.failed} failed, {stats.skipped} skipped (already completed), "
+        f"{stats.lines} lines written in {stats.elapsed:.1f} sec"
+    )
+    return 1 if stats.failed else 0
+
+
+def run_cache_stats(args) -> int:
+    """Run the cache stats subcommand."""
+    from .cache import DiskCache
+
+    cache = DiskCache(path=args.cache_path)
+    try:
+        for name, value in cache.stats().items():
+            print(f"{name}: {value}")
+    finally:
+        cache.close()
+    return 0
+
+
+def run_cache_purge(args) -> int:
+    """Run the cache purge subcommand."""
+    from .cache import DiskCache
+
+    cache = DiskCache(path=args.cache_path)
+    try:
+        if args.expired:
+            print(f"Removed {cache.purge_expired()} expired entries")
+        else:
+            cache.clear()
+            print(f"Cleared {cache.path}")
+    finally:
+        cache.close()
+    return 0
+
+
+def main(argv=None) -> int:
+    """Run the command line."""
+    args = build_parser().parse_args(argv)
+    level = logging.WARNING if args.verbose == 0 else logging.INFO if args.verbose == 1 else logging.DEBUG
+    logging.basicConfig(level=level, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    try:
+        return args.handler(args)
+    except KeyboardInterrupt:
+        return 130
+    except Exception as ex:
+        from .exceptions import FilmotException
+
+        if not isinstance(ex, FilmotException):
+            raise
+        logging.getLogger("filmot").error(str(ex))
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -32,11 +32,7 @@ class Categories:
     @classmethod
     def get_all_categories(cls) -> list:
         """Get all available categories."""
-        categories = []
-        for attribute_name in dir(cls):
-            if not attribute_name.startswith("__") and not callable(getattr(cls, attribute_name)):
-                categories.append(getattr(cls, attribute_name))
-        return categories
+        return list(_ALL_CATEGORIES)
 
 
 class Countries:
@@ -296,11 +292,7 @@ class Countries:
     @classmethod
     def get_all_codes(cls) -> list:
         """Get all available country codes."""
-        codes = []
-        for attribute_name in dir(cls):
-            if not attribute_name.startswith("__") and not callable(getattr(cls, attribute_name)):
-                codes.append(getattr(cls, attribute_name))
-        return sorted(codes)
+        return list(_ALL_COUNTRY_CODES)
 
 
 class Language:
@@ -386,8 +378,19 @@ class Language:
     @classmethod
     def get_all_codes(cls) -> list:
         """Get all available language codes."""
-        codes = []
-        for attribute_name in dir(cls):
-            if not attribute_name.startswith("__") and not callable(getattr(cls, attribute_name)):
-                codes.append(getattr(cls, attribute_name))
-        return sorted(codes)
+        return list(_ALL_LANGUAGE_CODES)
+
+
+def _constant_values(cls) -> list:
+    """Get the constant values of a class, in the attribute names order."""
+    return [value for name, value in sorted(vars(cls).items()) if name.isupper()]
+
+
+# computed once at import, instead of walking dir() on every call
+_ALL_CATEGORIES = tuple(_constant_values(Categories))
+_ALL_COUNTRY_CODES = tuple(sorted(_constant_values(Countries)))
+_ALL_LANGUAGE_CODES = tuple(sorted(_constant_values(Language)))
+
+VALID_CATEGORIES = frozenset(_ALL_CATEGORIES)
+VALID_COUNTRIES = frozenset(_ALL_COUNTRY_CODES)
+VALID_LANGUAGES = frozenset(_ALL_LANGUAGE_CODES)
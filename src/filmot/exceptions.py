@@ -19,4 +19,49 @@ class FilmotException(Exception):
 
         :param message: exception message.
         """
+        super().__init__(message)
         self.message = message
+
+
+class FilmotHTTPException(FilmotException):
+    """Exception raised when the API responds with an HTTP error status."""
+
+    def __init__(self, message: str, status_code: int):  # noqa: B042 - pickled by __reduce__
+        """
+        Initialize the HTTP exception.
+
+        :param message: exception message.
+        :param status_code: the response HTTP status code.
+        """
+        super().__init__(message)
+        self.status_code = status_code
+
+    def __reduce__(self):
+        """Pickle the exception by its arguments, e.g. to send it back from a process pool."""
+        return self.__class__, (self.message, self.status_code)
+
+
+class FilmotRateLimitException(FilmotHTTPException):
+    """Exception raised when the API rejects a request with HTTP 429 (Too Many Requests)."""
+
+    def __init__(self, message: str, retry_after: float):  # noqa: B042 - pickled by __reduce__
+        """
+        Initialize the rate limit exception.
+
+        :param message: exception message.
+        :param retry_after: seconds to wait before retrying, as advertised by the API.
+        """
+        super().__init__(message, status_code=429)
+        self.retry_after = retry_after
+
+    def __reduce__(self):
+        """Pickle the exception by its arguments."""
+        return self.__class__, (self.message, self.retry_after)
+
+
+class FilmotConnectionException(FilmotException):
+    """Exception raised when the request fails before a response is received (connection error, timeout)."""
+
+
+class FilmotCircuitOpenException(FilmotException):
+    """Exception raised when a request is rejected because the circuit breaker is open."""
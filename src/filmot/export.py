@@ -0,0 +1,205 @@
+"""
+This file is part of Filmot API wrapper.
+
+Filmot API is free software: you can redistribute it and/or modify
+it under the terms of the MIT License as published by the Massachusetts
+Institute of Technology.
+
+For full details, please see the LICENSE file located in the root
+directory of this project.
+
+Streaming JSON lines (NDJSON) export of search results, optionally gzip / zstd compressed.
+"""
+import io
+import gzip
+import logging
+from pathlib import Path
+from typing import IO, Iterable, Iterator, Optional, Union
+
+from .exceptions import FilmotException
+from .responses_base import fast_json_dumps
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+COMPRESSIONS = ("gzip", "zstd")
+COMPRESSION_SUFFIXES = {".gz": "gzip", ".gzip": "gzip", ".zst": "zstd", ".zstd": "zstd"}
+
+
+def _detect_compression(path) -> Optional[str]:
+    """Get the compression of a path from its suffix, None if not compressed."""
+    return COMPRESSION_SUFFIXES.get(Path(path).suffix.lower())
+
+
+def _open_binary(path_or_fileobj, compression: Optional[str], append: bool, buffer_size: int):
+    """
+    Open the output as a binary stream.
+
+    Returns:
+        tuple: The binary stream, and the streams to close (outermost first) - a given file object is not closed.
+    """
+    to_close = []
+    if isinstance(path_or_fileobj, (str, Path)):
+        raw = open(path_or_fileobj, "ab" if append else "wb", buffering=buffer_size)
+        to_close.append(raw)
+    elif isinstance(path_or_fileobj, io.TextIOBase):
+        if not hasattr(path_or_fileobj, "buffer"):
+            raise FilmotException("Can't write to a text stream without a binary buffer, use a binary file object")
+        path_or_fileobj.flush()
+        raw = path_or_fileobj.buffer
+    else:
+        raw = path_or_fileobj
+    if compression == "gzip":
+        stream = gzip.GzipFile(fileobj=raw, mode="ab" if append else "wb")
+        to_close.insert(0, stream)
+    elif compression == "zstd":
+        try:
+            import zstandard
+        except ImportError as ex:
+            for item in to_close:
+                item.close()
+            raise FilmotException(f"zstd compression requires zstandard, install it with: pip install zstandard ({ex})")
+        stream = zstandard.ZstdCompressor().stream_writer(raw, closefd=False)
+        to_close.insert(0, stream)
+    else:
+        stream = raw
+    return stream, to_close
+
+
+def iter_jsonl_records(responses: Iterable, flatten_hits: bool = False) -> Iterator[dict]:
+    """
+    Convert search responses to the exported records.
+
+    Args:
+        responses (iterable): SearchResponse objects.
+        flatten_hits (bool): One record per hit (query, category, video_id, link and text from `hits_data`),
+            instead of one record per response.
+
+    Yields:
+        dict: The records.
+    """
+    for response in responses:
+        if not flatten_hits:
+            yield response.to_dict()
+            continue
+        for hit in response.hits_data():
+            yield {
+                "query": response.query,
+                "category": response.category,
+                "video_id": response.video_info.id,
+                "link": hit["link"],
+                "text": hit["text"],
+            }
+
+
+class JSONLWriter:
+    """Buffered JSON lines writer, for records that are produced over time.
+
+    >>> with JSONLWriter("results.jsonl.gz", append=True) as writer:
+    >>>     writer.write_responses(responses)
+    """
+
+    def __init__(
+        self,
+        path_or_fileobj: Union[str, Path, IO],
+        compression: Optional[str] = "auto",
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        append: bool = False,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+    ):
+        """
+        Open the writer.
+
+        Args:
+            path_or_fileobj (str | Path | file): Output path, or an open (binary or text) file object, which is not
+                closed.
+            compression (str): gzip, zstd or None. "auto" detects it from the path suffix (.gz / .zst).
+            batch_size (int): Write and flush the output every this many lines.
+            append (bool): Append to an existing file instead of overwriting it.
+            buffer_size (int): File write buffer size, in bytes (when given a path).
+        """
+        if compression == "auto":
+            is_path = isinstance(path_or_fileobj, (str, Path))
+            compression = _detect_compression(path_or_fileobj) if is_path else None
+        if compression is not None and compression not in COMPRESSIONS:
+            raise FilmotException(f"Invalid compression: {compression}, valid values: {COMPRESSIONS}")
+        if batch_size <= 0:
+            raise FilmotException(f"Invalid batch_size: {batch_size}, should be positive")
+        self.name = str(path_or_fileobj)
+        self.batch_size = batch_size
+        self.count = 0
+        self._batch = []
+        self._stream, self._to_close = _open_binary(path_or_fileobj, compression, append, buffer_size)
+
+    def __enter__(self):
+        """Enter the context."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Exit the context, flush and close the output."""
+        self.close()
+
+    def write(self, record):
+        """Write one record (a dict, or any value `fast_json_dumps` supports)."""
+        self._batch.append(fast_json_dumps(record))
+        self.count += 1
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+            logger.debug(f"Exported {self.count} lines")
+
+    def write_responses(self, responses: Iterable, flatten_hits: bool = False):
+        """Write SearchResponse objects, see `iter_jsonl_records`."""
+        for record in iter_jsonl_records(responses, flatten_hits=flatten_hits):
+            self.write(record)
+
+    def flush(self):
+        """Write the pending lines, and flush the output."""
+        if self._batch:
+            # one encode and write call per batch
+            self._stream.write(("\n".join(self._batch) + "\n").encode("utf-8"))
+            self._batch = []
+        self._stream.flush()
+
+    def close(self):
+        """Flush and close the output (a given file object is only flushed)."""
+        if self._stream is None:
+            return
+        try:
+            self.flush()
+        finally:
+            for item in self._to_close:
+                item.close()
+            self._stream = None
+
+
+def write_jsonl(
+    responses: Iterable,
+    path_or_fileobj: Union[str, Path, IO],
+    compression: Optional[str] = "auto",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    flatten_hits: bool = False,
+    append: bool = False,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+) -> int:
+    """
+    Write search responses as JSON lines, as they come from the iterable (e.g. `Filmot.iter_search`).
+
+    Args:
+        responses (iterable): SearchResponse objects (or a dict of category to list of them, as returned by `search`).
+        path_or_fileobj (str | Path | file): Output path, or an open (binary or text) file object, which is not closed.
+        compression (str): gzip, zstd or None. "auto" detects it from the path suffix (.gz / .zst).
+        batch_size (int): Write and flush the output every this many lines.
+        flatten_hits (bool): Write one line per hit (from `hits_data`), instead of one line per response.
+        append (bool): Append to an existing file instead of overwriting it.
+        buffer_size (int): File write buffer size, in bytes (when given a path).
+
+    Returns:
+        int: The amount of lines written.
+    """
+    if isinstance(responses, dict):
+        responses = (response for category_responses in responses.values() for response in category_responses)
+    with JSONLWriter(path_or_fileobj, compression, batch_size, append, buffer_size) as writer:
+        writer.write_responses(responses, flatten_hits=flatten_hits)
+    logger.info(f"Exported {writer.count} lines to {writer.name}")
+    return writer.count
@@ -11,123 +11,292 @@ directory of this project.
 This is the main module for the Filmot API wrapper.
 It contains wrpper functoins for the Filmot REST API.
 """
+import time
 import logging
-import requests
+import threading
 
-from typing import Literal, Union, Optional, List
-from collections import defaultdict
+from typing import TYPE_CHECKING, Literal, Union, Optional, List, Iterator
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 
-from .config import Config
-from .asyncit import Asyncit
-from .consts import Categories, Countries, Language
-from .responses import SearchResponse
-from .exceptions import FilmotException
+from .metrics import Metrics
+from .ratelimit import RateLimiter, AdaptiveThrottle, parse_retry_after
+from .transport import HttpTransport, DEFAULT_POOL_SIZE, DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT
+from .query import SearchQuery
+from .filmot_base import BaseFilmot, VALID_CATEGORIES, VALID_COUNTRIES, VALID_LANGUAGES  # noqa: F401
+from .responses import SearchResponse, SearchResults
+from .exceptions import FilmotException, FilmotConnectionException, FilmotHTTPException, FilmotRateLimitException
+from .retry import RetryPolicy, CircuitBreaker
+from .streaming import JSONArrayParser
+
+if TYPE_CHECKING:
+    import requests
+
+    from .cache import BaseCache
 
 logger = logging.getLogger(__name__)
 
-VALID_CATEGORIES = Categories.get_all_categories()
-VALID_COUNTRIES = Countries.get_all_codes()
-VALID_LANGUAGES = Language.get_all_codes()
+DEFAULT_CONCURRENCY = 5
+DEFAULT_STREAM_CHUNK_SIZE = 64 * 1024
 
 
-class Filmot:
+class Filmot(BaseFilmot):
     """Filmot API Wrapper."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        keep_alive: bool = True,
+        connect_timeout: Optional[float] = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: Optional[float] = DEFAULT_READ_TIMEOUT,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        rate_limit: Optional[Union[List[dict], RateLimiter]] = None,
+        cache: Union[bool, "BaseCache", None] = None,
+        throttle: Union[bool, AdaptiveThrottle] = True,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Union[bool, CircuitBreaker] = True,
+        metrics: Union[bool, Metrics] = True,
+    ):
         """
         Initialize a Filmot Client object.
 
-        Args:
-            rapidapi_key (str, optional): The RapidAPI key. If None, the value will be taken from the config file.
-        """
-        self._config = Config()
-        self.rapidapi_key = self._config.rapidapi_key
-        self.rapidapi_host = self._config.rapidapi_host
-        self.base_url = f"https://{self.rapidapi_host}"
-
-    @staticmethod
-    def set_rapidapi_key(value):
-        """
-        Set the RapidAPI key in the config file.
+        The client owns a pooled HTTP transport, shared by all its requests (including concurrent ones).
 
         Args:
-            value (str): The RapidAPI key value.
+            pool_size (int, optional): Max connections kept open to the RapidAPI host.
+            keep_alive (bool, optional): Whether to reuse connections between requests.
+            connect_timeout (float, optional): Seconds to wait for a connection. None to wait forever.
+            read_timeout (float, optional): Seconds to wait for the response data. None to wait forever.
+            concurrency (int, optional): Max concurrent requests of each search stage: the first page of every
+                category, and the follow-up requests for more videos.
+            rate_limit (list, optional): List of dicts with: max_calls, period_sec (and optional burst). Limits the
+                rate of all the requests sent by the client. For example [{"period_sec": 1, "max_calls": 5}]
+                A RateLimiter can be given instead, to share the limit with other clients.
+            cache (BaseCache, optional): Cache for the API responses, e.g. DiskCache(). Defaults to no cache.
+                True for a DiskCache at the default path, owned by the client: closed with it. A given cache is
+                left open on close, to share it with other clients.
+            throttle (bool, optional): Whether to slow down according to the rate limit headers of the API responses,
+                before the plan quota is exhausted. An AdaptiveThrottle can be given, to share it with other clients or
+                to change how long a request may be held back (max_wait).
+            retry_policy (RetryPolicy, optional): Which failed requests to retry and how long to wait between the
+                attempts. Defaults to RetryPolicy(), pass RetryPolicy(max_attempts=1) to disable retries.
+            circuit_breaker (bool, optional): Whether to fail fast after consecutive failures of the API.
+                A CircuitBreaker can be given, to set its thresholds or share it with other clients.
+            metrics (bool, optional): Whether to collect request metrics (latency histograms, bytes, retries, cache
+                hits...), see `Metrics`. A Metrics can be given, to register hooks or share it with other clients.
         """
-        config = Config()
-        config.rapidapi_key = value
-        if config.save():
-            print("Credentials set successfully!")
+        super().__init__()
+        self.concurrency = concurrency
+        self.metrics = Metrics() if metrics is True else metrics or None
+        self.rate_limiter = RateLimiter.create(rate_limit)
+        self._owns_cache = cache is True
+        if cache is True:
+            from .cache import DiskCache
+
+            cache = DiskCache()
+        self.cache = cache if cache is not False else None
+        self.throttle = AdaptiveThrottle() if throttle is True else throttle or None
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = CircuitBreaker() if circuit_breaker is True else circuit_breaker or None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self.transport = HttpTransport(
+            pool_size=pool_size,
+            keep_alive=keep_alive,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+        )
+
+    def __enter__(self):
+        """Enter the runtime context."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Exit the runtime context and release the pooled connections."""
+        self.close()
+
+    def close(self):
+        """Close the HTTP transport, the follow-up requests executor, and the cache if the client created it."""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+        self.transport.close()
+        if self._owns_cache:
+            self.cache.close()
+            self._owns_cache = False
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Get the executor used for the follow-up requests, creating it on first use."""
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="filmot")
+        return self._executor
 
     def send_api(self, cmd: str, query: dict) -> dict:
         """
-        Send the API request.
+        Send the API request, or get its response from the client cache.
 
         rgs:
             cmd: The command to send.
             query: The query data.
         """
-        headers = {
-            "X-RapidAPI-Key": self.rapidapi_key,
-            "X-RapidAPI-Host": self.rapidapi_host,
-        }
+        if self.cache is None:
+            return self._send_request(cmd, query)
+        if self.metrics is None:
+            return self.cache.get_or_load(cmd, query, lambda: self._send_request(cmd, query))
+        loaded = []
+
+        def loader():
+            loaded.append(True)
+            return self._send_request(cmd, query)
+
+        result = self.cache.get_or_load(cmd, query, loader)
+        self.metrics.inc("cache_misses" if loaded else "cache_hits", command=cmd)
+        return result
+
+    def _send_request(self, cmd: str, query: dict) -> dict:
+        """Send the API request over the HTTP transport, retrying it according to the client retry policy."""
+        return self.retry_policy.call(
+            lambda: self._send_request_once(cmd, query),
+            circuit_breaker=self.circuit_breaker,
+            on_retry=self.metrics.record_retry if self.metrics is not None else None,
+        )
+
+    def _send_request_once(self, cmd: str, query: dict) -> dict:
+        """Send the API request over the HTTP transport."""
+        response = self._open_request(cmd, query)
+        start = time.perf_counter()
+        try:
+            json_response = response.json()
+        except ValueError as ex:
+            raise FilmotException(f"Failed to parse JSON response: {ex}")
+        if self.metrics is not None:
+            self.metrics.observe("parse_seconds", cmd, time.perf_counter() - start)
+        return json_response
+
+    def _open_request(self, cmd: str, query: dict, stream: bool = False) -> "requests.Response":
+        """Send the API request over the HTTP transport, and check the response status."""
+        metrics = self.metrics
+        wait = self.rate_limiter.acquire()
+        if self.throttle:
+            wait += self.throttle.acquire()
+        if metrics is None:
+            return self._get_response(cmd, query, stream)
+
+        metrics.record_throttle(wait)
+        if metrics.hooks["before_request"]:
+            metrics.emit("before_request", cmd=cmd, query=query)
+        start = time.perf_counter()
+        try:
+            response = self._get_response(cmd, query, stream)
+        except FilmotException as ex:
+            metrics.record_request(cmd, query, getattr(ex, "status_code", None), time.perf_counter() - start, error=ex)
+            raise
+        # a streamed body is not downloaded yet, its bytes are counted while it is read
+        bytes_received = 0 if stream else len(response.content)
+        metrics.record_request(cmd, query, response.status_code, time.perf_counter() - start, bytes_received)
+        return response
+
+    def _get_response(self, cmd: str, query: dict, stream: bool) -> "requests.Response":
+        """Send the API request over the HTTP transport, with the response status check."""
+        import requests  # loaded with the first request, by the transport session
+
         try:
             url = f"{self.base_url}/{cmd}"
-            response = requests.get(url, headers=headers, params=query)
+            response = self.transport.get(url, headers=self.headers, params=query, stream=stream)
+            if self.throttle:
+                self.throttle.update(response.headers)
+            if response.status_code == 429:
+                response.close()
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if self.throttle:
+                    self.throttle.on_rate_limited(retry_after)
+                raise FilmotRateLimitException(f"API `{cmd}` rate limited, retry after {retry_after} sec", retry_after)
             if response.status_code >= 400:
                 logger.error(f"API `{cmd}` failed with {response.status_code}: {response.content.decode('utf-8')}")
             response.raise_for_status()
-            json_response = response.json()
-            return json_response
+            return response
         except requests.exceptions.HTTPError as http_err:
-            raise FilmotException(f"Failed with HTTP {http_err}: {http_err}")
+            raise FilmotHTTPException(f"Failed with HTTP {http_err}: {http_err}", http_err.response.status_code)
         except requests.exceptions.RequestException as req_err:
-            raise FilmotException(f"Failed to send request: {req_err}")
-        except ValueError as ex:
-            raise FilmotException(f"Failed to parse JSON response: {ex}")
+            raise FilmotConnectionException(f"Failed to send request: {req_err}")
 
-    def search_bulk(self, query_params: dict) -> List[SearchResponse]:
+    def search_bulk(self, query_params: Union[dict, SearchQuery]) -> List[SearchResponse]:
         """
         Perform a single search.
 
         Args:
-            query_params (dict): Parameters for the search.
+            query_params (Union[dict, SearchQuery]): Parameters for the search, or a SearchQuery of up to one category.
 
         Returns:
             SearchResponse: The response for the search.
         """
+        query_params = self.as_query_params(query_params)
         logger.info(f"Searching for {query_params}")
 
         response = self.send_api("getsearchsubtitles", query_params)
-        result = response["result"]
+        return self.build_results("getsearchsubtitles", query_params, response)
+
+    def iter_search_bulk(
+        self, query_params: Union[dict, SearchQuery], chunk_size: int = DEFAULT_STREAM_CHUNK_SIZE
+    ) -> Iterator[SearchResponse]:
+        """
+        Perform a bulk search, parsing the response while it downloads.
 
-        all_results = [SearchResponse(
-            query=query_params["query"],
-            result=single_result
-        ) for single_result in result]
+        The `result` array is parsed incrementally from the response stream, and a SearchResponse is yielded per
+        item, so the peak memory is a single result instead of the whole body and its decoded tree.
+        Streamed responses bypass the client cache.
 
-        return all_results
+        Args:
+            query_params (Union[dict, SearchQuery]): Parameters for the search, or a SearchQuery of up to one category.
+            chunk_size (int, optional): Bytes to read from the response stream at a time.
+
+        Yields:
+            SearchResponse: The search results, in the response order.
+        """
+        query_params = self.as_query_params(query_params)
+        logger.info(f"Searching for {query_params}")
+        response = self.retry_policy.call(
+            lambda: self._open_request("getsearchsubtitles", query_params, stream=True),
+            circuit_breaker=self.circuit_breaker,
+            on_retry=self.metrics.record_retry if self.metrics is not None else None,
+        )
+        import requests
+
+        parser = JSONArrayParser("result")
+        try:
+            for chunk in response.iter_content(chunk_size):
+                if self.metrics is not None:
+                    self.metrics.inc("bytes_received", len(chunk), command="getsearchsubtitles")
+                for item in parser.feed(chunk):
+                    yield SearchResponse(query=query_params["query"], result=item)
+            for item in parser.close():
+                yield SearchResponse(query=query_params["query"], result=item)
+        except requests.exceptions.RequestException as req_err:
+            raise FilmotConnectionException(f"Failed to read response: {req_err}")
+        except ValueError as ex:
+            raise FilmotException(f"Failed to parse JSON response: {ex}")
+        finally:
+            response.close()
 
-    def search_one(self, query_params: dict) -> List[SearchResponse]:
+    def search_one(self, query_params: Union[dict, SearchQuery]) -> List[SearchResponse]:
         """
         Perform a single search.
 
         Args:
-            query_params (dict): Parameters for the search.
+            query_params (Union[dict, SearchQuery]): Parameters for the search, or a SearchQuery of up to one category.
 
         Returns:
             SearchResponse: The response for the search.
         """
+        query_params = self.as_query_params(query_params)
         logger.info(f"Searching for {query_params}")
 
         response = self.send_api("getsubtitlesearch", query_params)
-        result = response["result"]
-
-        all_results = [SearchResponse(
-            query=query_params["query"],
-            result=single_result
-        ) for single_result in result]
-
-        return all_results
+        return self.build_results("getsubtitlesearch", query_params, response)
         # return SearchResponse(
         #     query=query_params["query"],
         #     category=query_params.get("category"),
@@ -136,7 +305,7 @@ class Filmot:
 
     def search(
         self,
-        query: str,
+        query: Union[str, SearchQuery],
         language: Optional[str] = None,
         category: Optional[Union[str, list[str]]] = None,
         exclude_category: Optional[str] = None,
@@ -153,15 +322,17 @@ class Filmot:
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
         limit: int = 10,
-    ) -> dict:
+    ) -> SearchResults:
         """
         Perform a search equest.
 
         Args:
-            query (str, required): The search query. the text which is being found in the subtitle data.
+            query (Union[str, SearchQuery], required): The search query. the text which is being found in the subtitle
+                data. Or a SearchQuery, the other filters given override its own.
             language (str, optional): A two letter code that can be used to limit the search to only work on
                 subtitles with the specified language.
-            category (str, optional): Exact string for the video category.
+            category (str, optional): Exact string for the video category, or a list of categories.
+                Multiple categories are searched concurrently, see the client `concurrency` and `rate_limit`.
             exclude_category (str, optional): A comma delimited list of categories to be excluded from the results.
                 For example Music,Gaming
             license (Union[int, Literal[1, 2]], optional): The license type of the video:
@@ -180,86 +351,161 @@ class Filmot:
                 Set to 1 to search in manual subtitles, default searches in automatic subtitles
             start_date (str, optional): The start date. Defaults to None.
             end_date (str, optional): The end date. Defaults to None.
-            limit (int, optional): The limit videos to return. Defaults to 10.
+            limit (int, optional): The limit videos to return, per category. Defaults to 10.
+                After the first page of a category arrives, the videos listed in its `more_results` are fetched
+                concurrently with `queryVideoID` follow-up requests, and merged in order.
 
         Returns:
-            dict: Dict of category and list of SearchResponse objects. If no category provided the key will be None.
+            SearchResults: Dict of category and list of SearchResponse objects. If no category provided the key will be
+                None. When searching multiple categories, a failed category is mapped to an empty list and its
+                exception is kept in the `errors` dict of the results.
         """
+        search_query = SearchQuery.build(
+            query,
+            language=language,
+            category=category,
+            exclude_category=exclude_category,
+            license=license,
+            max_views=max_views,
+            min_views=min_views,
+            min_likes=min_likes,
+            country=country,
+            channel_id=channel_id,
+            title=title,
+            start_duration=start_duration,
+            end_duration=end_duration,
+            search_manual_subs=search_manual_subs,
+            start_date=start_date,
+            end_date=end_date,
+        )
+
+        category_params = search_query.category_params()
+        if len(category_params) == 1:
+            ((category, params),) = category_params.items()
+            return SearchResults({category: self._search_pages(params, limit)})
+
+        return self._search_categories(category_params, limit)
+
+    def _search_categories(self, category_params: dict, limit: int) -> SearchResults:
+        """
+        Search all the categories concurrently on the client executor.
 
-        def add_param(name, value):
-            # Helper function to add a parameter to the query_params list
-            if value is not None:
-                if name == "category":
-                    assert value in VALID_CATEGORIES
-                if name == "country":
-                    assert value in VALID_COUNTRIES
-                if name == "language":
-                    assert value in VALID_LANGUAGES
-                query_params[name] = value
-
-        query_params = {}
-        add_param("query", f'"{query}"' if " " in query else query)
-        add_param("lang", language)
-        add_param("excludeCategory", exclude_category)
-        add_param("license", license)
-        add_param("maxViews", max_views)
-        add_param("minViews", min_views)
-        add_param("minLikes", min_likes)
-        add_param("country", country)
-        add_param("channelID", channel_id)
-        add_param("title", title)
-        add_param("startDuration", start_duration)
-        add_param("endDuration", end_duration)
-        add_param("searchManualSubs", search_manual_subs)
-        add_param("startDate", start_date)
-        add_param("endDate", end_date)
-
-        categories = [None]
-        # categories = []
-        if category:
-            categories = [category] if isinstance(category, str) else category
-
-        aggregated_results = {}
-        # asyncit = Asyncit(save_output=True)
-
-        for category in categories:
-            query_params["category"] = category
-            category_result = self.search_one(query_params)
-            aggregated_results[category] = category_result
-
+        The first pages are submitted at once, and the follow-up requests of each category as soon as its first
+        page arrives. All the submissions are made from the calling thread, so no worker ever waits for another
+        request of the bounded executor. A failed category is recorded in the results errors.
+        """
+        first_pages = {
+            self.executor.submit(self._search_first_page, params, limit): category
+            for category, params in category_params.items()
+        }
+        pages = {}
+        for future in as_completed(first_pages):
+            category = first_pages[future]
+            try:
+                results, follow_ups = future.result()
+            except Exception as ex:
+                logger.error(f"Search of category {category} failed: {ex}")
+                pages[category] = ex
+                continue
+            pages[category] = (results, follow_ups, self._submit_follow_ups(follow_ups))
+
+        # in the requested categories order
+        aggregated_results = SearchResults()
+        for category in category_params:
+            page = pages[category]
+            if isinstance(page, Exception):
+                aggregated_results.add_error(category, page)
+            else:
+                aggregated_results[category] = self._merge_follow_ups(*page, limit)
         return aggregated_results
-            # for hit_data in category_result.more_results[1:limit]:
-            #     temp_query_params = query_params.copy()
-            #     temp_query_params["queryVideoID"] = hit_data["id"]
-            #     asyncit.run(self.search_one, temp_query_params)
-
-        # # 1. get first result from each category
-        # for category in categories:
-        #     # set search category if exists - do nothing if None
-        #     temp_query_params = query_params.copy()
-        #     temp_query_params["category"] = category
-        #     # query using category
-        #     asyncit.run(self.search_one, temp_query_params)
-        # asyncit.wait()
-        # category_results = asyncit.get_output()
-        # aggregated_results.extend(category_results)
-        #
-        # # 2. get rest wanted result for each category
-        # for result in category_results:
-        #     more_results = [i["id"] for i in result.more_results[: limit - 1]]
-        #     for video_id in more_results:
-        #         temp_query_params = query_params.copy()
-        #         temp_query_params["queryVideoID"] = video_id
-        #         temp_query_params["category"] = result.video_info.category
-        #         asyncit.run(self.search_one, temp_query_params)
-
-        # obtain all results
-        # asyncit.wait()
-        # aggregated_results.extend(asyncit.get_output())
-
-        # order results by category
-        # ordered_results = defaultdict(list)
-        # for result in aggregated_results:
-        #     ordered_results[result.category].append(result)
-        #
-        # return dict(ordered_results)
+
+    def _search_pages(self, query_params: dict, limit: int) -> List[SearchResponse]:
+        """
+        Get up to `limit` videos for the query.
+
+        The follow-up requests are submitted as soon as the first page arrives, and the results are merged
+        in the first page `more_results` order. A failed follow-up request is logged and skipped.
+        """
+        results, follow_ups = self._search_first_page(query_params, limit)
+        return self._merge_follow_ups(results, follow_ups, self._submit_follow_ups(follow_ups), limit)
+
+    def _submit_follow_ups(self, follow_ups: list) -> list:
+        """Submit the follow-up requests to the client executor, return their futures."""
+        return [self.executor.submit(self.search_one, params) for params in follow_ups]
+
+    @staticmethod
+    def _merge_follow_ups(results: List[SearchResponse], follow_ups: list, futures: list, limit: int) -> list:
+        """Add the follow-up results to the first page results, in order, skipping the failed ones."""
+        if not follow_ups:
+            return results
+        for params, future in zip(follow_ups, futures):
+            try:
+                results.extend(future.result())
+            except FilmotException as ex:
+                logger.warning(f"Follow-up search for video {params['queryVideoID']} failed: {ex}")
+        return results[:limit]
+
+    def _search_first_page(self, query_params: dict, limit: int) -> tuple:
+        """Get the first page of the query, and the follow-up requests needed to reach `limit` videos."""
+        logger.info(f"Searching for {query_params}")
+        response = self.send_api("getsubtitlesearch", query_params)
+        results = self.build_results("getsubtitlesearch", query_params, response)[:limit]
+        return results, self.build_follow_up_params(query_params, response, results, limit)
+
+    def iter_search(
+        self, query: Union[str, SearchQuery], limit: int = 10, max_pending: Optional[int] = None, **filters
+    ) -> Iterator[SearchResponse]:
+        """
+        Perform a search request, yielding each SearchResponse as soon as its request completes.
+
+        The first page of every category, and then its follow-up videos, are fetched concurrently on the client
+        executor. No more than `max_pending` requests are in flight or waiting to be consumed, so a slow consumer
+        holds back new requests and memory stays flat. Closing the generator (or breaking out of the loop) cancels
+        the requests that were not sent yet.
+
+        >>> for response in filmot.iter_search("Spill The Beans", category=Categories.get_all_categories()):
+        >>>     index(response)
+
+        Args:
+            query (Union[str, SearchQuery]): The search query.
+            limit (int, optional): The limit videos to return, per category. Defaults to 10.
+            max_pending (int, optional): Max requests in flight. Defaults to the client concurrency.
+            filters: The search filters, see `search`.
+
+        Yields:
+            SearchResponse: The results, in completion order. Failed requests are logged and skipped.
+        """
+        search_query = SearchQuery.build(query, **filters)
+        max_pending = max_pending or self.concurrency
+        category_params = search_query.category_params()
+        tasks = deque((self._search_first_page, params, limit) for params in category_params.values())
+        # videos left to yield per category, the follow-ups of a category are dropped once it reaches the limit
+        remaining = dict.fromkeys(category_params, limit)
+        pending = {}
+        try:
+            while tasks or pending:
+                while tasks and len(pending) < max_pending:
+                    func, *args = tasks.popleft()
+                    pending[self.executor.submit(func, *args)] = args[0]
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    params = pending.pop(future)
+                    if future.cancelled():
+                        continue
+                    try:
+                        result = future.result()
+                    except FilmotException as ex:
+                        logger.error(f"Search for {params} failed: {ex}")
+                        continue
+                    if isinstance(result, tuple):
+                        result, follow_ups = result
+                        tasks.extend((self.search_one, follow_up) for follow_up in follow_ups)
+                    category = params.get("category")
+                    result = result[: remaining[category]]
+                    remaining[category] -= len(result)
+                    if not remaining[category]:
+                        tasks = self._drop_category_tasks(category, tasks, pending)
+                    yield from result
+        finally:
+            for future in pending:
+                future.cancel()
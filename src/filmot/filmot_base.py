@@ -0,0 +1,197 @@
+"""
+This file is part of Filmot API wrapper.
+
+Filmot API wrapper is free software: you can redistribute it and/or modify
+it under the terms of the MIT License as published by the Massachusetts
+Institute of Technology.
+
+For full details, please see the LICENSE file located in the root
+directory of this project.
+
+Shared logic of the sync and async Filmot clients: configuration, query parameters building and
+response parsing. The clients only differ in the way they send the HTTP requests.
+"""
+import time
+import logging
+from collections import deque
+
+from typing import Literal, Union, Optional, List, Tuple
+
+from .config import Config
+from .consts import VALID_CATEGORIES, VALID_COUNTRIES, VALID_LANGUAGES  # noqa: F401
+from .query import SearchQuery
+from .responses import SearchResponse
+
+logger = logging.getLogger(__name__)
+
+
+class BaseFilmot:
+    """Base class for the Filmot API clients."""
+
+    # the client Metrics, None when disabled
+    metrics = None
+
+    def __init__(self):
+        """Initialize the client configuration."""
+        self._config = Config()
+        self.rapidapi_key = self._config.rapidapi_key
+        self.rapidapi_host = self._config.rapidapi_host
+        self.base_url = f"https://{self.rapidapi_host}"
+
+    @staticmethod
+    def set_rapidapi_key(value):
+        """
+        Set the RapidAPI key in the config file.
+
+        Args:
+            value (str): The RapidAPI key value.
+        """
+        config = Config()
+        config.rapidapi_key = value
+        if config.save():
+            print("Credentials set successfully!")
+
+    @property
+    def headers(self) -> dict:
+        """Get the RapidAPI request headers."""
+        return {
+            "X-RapidAPI-Key": self.rapidapi_key,
+            "X-RapidAPI-Host": self.rapidapi_host,
+        }
+
+    @staticmethod
+    def build_query_params(
+        query: str,
+        language: Optional[str] = None,
+        category: Optional[Union[str, List[str]]] = None,
+        exclude_category: Optional[str] = None,
+        license: Optional[Literal[1, 2]] = None,
+        max_views: Optional[int] = None,
+        min_views: Optional[int] = None,
+        min_likes: Optional[int] = None,
+        country: Optional[int] = None,
+        channel_id: Optional[str] = None,
+        title: Optional[str] = None,
+        start_duration: Optional[int] = None,
+        end_duration: Optional[int] = None,
+        search_manual_subs: Optional[Literal[1, 2]] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> Tuple[dict, list]:
+        """
+        Build the API query parameters for a search.
+
+        See `Filmot.search` for the arguments description, and `SearchQuery` to validate a query once and reuse it.
+
+        Returns:
+            tuple: The query parameters (without category), and the list of categories to search.
+                If no category provided the list holds a single None item.
+
+        Raises:
+            FilmotException: If an argument is invalid.
+        """
+        search_query = SearchQuery(
+            query,
+            language=language,
+            category=category,
+            exclude_category=exclude_category,
+            license=license,
+            max_views=max_views,
+            min_views=min_views,
+            min_likes=min_likes,
+            country=country,
+            channel_id=channel_id,
+            title=title,
+            start_duration=start_duration,
+            end_duration=end_duration,
+            search_manual_subs=search_manual_subs,
+            start_date=start_date,
+            end_date=end_date,
+        )
+        return search_query.params(), list(search_query.category_params())
+
+    @staticmethod
+    def as_query_params(query_params: Union[dict, SearchQuery]) -> dict:
+        """
+        Get the API query parameters of a single request.
+
+        Args:
+            query_params (Union[dict, SearchQuery]): The query parameters, or a SearchQuery of up to one category.
+
+        Returns:
+            dict: The query parameters.
+        """
+        if isinstance(query_params, SearchQuery):
+            return query_params.single_params()
+        return query_params
+
+    @staticmethod
+    def parse_search_results(query_params: dict, response: dict) -> List[SearchResponse]:
+        """
+        Convert a search API response into SearchResponse objects.
+
+        Args:
+            query_params (dict): The parameters the search was sent with.
+            response (dict): The API json response.
+
+        Returns:
+            list: List of SearchResponse objects.
+        """
+        query = query_params["query"]
+        return [SearchResponse(query=query, result=single_result) for single_result in response["result"]]
+
+    def build_results(self, cmd: str, query_params: dict, response: dict) -> List[SearchResponse]:
+        """Convert a search API response into SearchResponse objects, recording the build time in the metrics."""
+        if self.metrics is None:
+            return self.parse_search_results(query_params, response)
+        start = time.perf_counter()
+        results = self.parse_search_results(query_params, response)
+        self.metrics.observe("build_seconds", cmd, time.perf_counter() - start)
+        return results
+
+    @staticmethod
+    def build_follow_up_params(query_params: dict, response: dict, results: List[SearchResponse], limit: int) -> list:
+        """
+        Build the `queryVideoID` follow-up requests needed to reach `limit` videos.
+
+        Args:
+            query_params (dict): The parameters the first page was sent with.
+            response (dict): The first page API json response, holding the `more_results` video ids.
+            results (list): The SearchResponse objects of the first page.
+            limit (int): The total number of videos wanted.
+
+        Returns:
+            list: Query parameters of each follow-up request, in the `more_results` order.
+        """
+        missing = limit - len(results)
+        if missing <= 0:
+            return []
+        seen = {result.video_info.id for result in results}
+        follow_ups = []
+        for item in response.get("more_results") or []:
+            video_id = item["id"] if isinstance(item, dict) else item
+            if video_id in seen:
+                continue
+            seen.add(video_id)
+            follow_ups.append(dict(query_params, queryVideoID=video_id))
+            if len(follow_ups) == missing:
+                break
+        return follow_ups
+
+    @staticmethod
+    def _drop_category_tasks(category: Optional[str], tasks: deque, pending: dict) -> deque:
+        """
+        Drop the queued follow-ups of a category that reached its limit, and cancel its pending ones.
+
+        Args:
+            category (str, optional): The category, None if the query has no category.
+            tasks (deque): The queued (func, query_params, ...) tasks.
+            pending (dict): The pending futures / asyncio tasks, mapped to their query params.
+
+        Returns:
+            deque: The tasks of the other categories.
+        """
+        for future, params in pending.items():
+            if params.get("category") == category:
+                future.cancel()
+        return deque(task for task in tasks if task[1].get("category") != category)
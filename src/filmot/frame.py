@@ -0,0 +1,325 @@
+"""
+This file is part of Filmot API wrapper.
+
+Filmot API is free software: you can redistribute it and/or modify
+it under the terms of the MIT License as published by the Massachusetts
+Institute of Technology.
+
+For full details, please see the LICENSE file located in the root
+directory of this project.
+
+Columnar tables of search results, built in one pass from the SearchResponse objects
+(without going through `to_dict`), for analytics over large result sets.
+numpy / pandas are optional, and only needed for `to_numpy` / `to_pandas`.
+"""
+import math
+import logging
+import operator
+from array import array
+from itertools import compress, repeat
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+from .exceptions import FilmotException
+
+logger = logging.getLogger(__name__)
+
+# VideoInfo fields stored as packed floats (NaN for missing values), the others are kept as lists
+VIDEO_NUMERIC_COLUMNS = ("duration", "view_count", "like_count", "channel_sub_count")
+VIDEO_TEXT_COLUMNS = (
+    "id",
+    "title",
+    "upload_date",
+    "channel_id",
+    "language",
+    "category",
+    "channel_name",
+    "channel_country_name",
+    "channel_thumbnail_url",
+)
+HIT_NUMERIC_COLUMNS = ("start",)
+
+OPERATORS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "in": lambda value, values: value in values,
+}
+# operators that are False for NaN, so a numeric column is compared without checking for missing values
+NAN_FALSE_OPERATORS = frozenset(("==", "<", "<=", ">", ">="))
+
+
+def _take_values(values: Union[array, list], indices: List[int]) -> Union[array, list]:
+    """Get the column values at the given indices, in their order, as a column of the same type."""
+    if len(indices) > 1:
+        taken = operator.itemgetter(*indices)(values)
+    else:
+        taken = [values[i] for i in indices]
+    return array(values.typecode, taken) if isinstance(values, array) else list(taken)
+
+
+def _to_float(value) -> float:
+    """Convert an API value to float, NaN if it is missing or not a number."""
+    if value is None:
+        return math.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+class Table:
+    """Column store: each column is an `array('d')` (numeric columns) or a list, all of the same length.
+
+    Filtering and sorting compute the matching row indices once, then take them from every column.
+
+    >>> popular = frame.videos.where("view_count", ">=", 10**6).sort("view_count", reverse=True)
+    >>> popular["title"][:10]
+    """
+
+    __slots__ = ("columns",)
+
+    def __init__(self, columns: Dict[str, Union[array, list]]):
+        """
+        Initialize the table.
+
+        Args:
+            columns (dict): Column name to array('d') or list, all of the same length.
+        """
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise FilmotException(f"Columns length mismatch: {lengths}")
+        self.columns = columns
+
+    def __len__(self):
+        """Get the amount of rows."""
+        for values in self.columns.values():
+            return len(values)
+        return 0
+
+    def __getitem__(self, name: str) -> Union[array, list]:
+        """Get a column by name."""
+        return self.columns[name]
+
+    def __contains__(self, name: str):
+        """Check if the table has a column."""
+        return name in self.columns
+
+    def __repr__(self):
+        """Return a string representation of the table."""
+        return f"<Table {len(self)} rows: {', '.join(self.columns)}>"
+
+    @property
+    def names(self) -> List[str]:
+        """Get the column names."""
+        return list(self.columns)
+
+    def row(self, index: int) -> dict:
+        """Get a single row as a dict."""
+        return {name: values[index] for name, values in self.columns.items()}
+
+    def rows(self) -> Iterator[dict]:
+        """Iterate over the rows as dicts."""
+        names = list(self.columns)
+        for values in zip(*self.columns.values()):
+            yield dict(zip(names, values))
+
+    def take(self, indices: Sequence[int]) -> "Table":
+        """
+        Get a new table with the given rows, in the given order.
+
+        Args:
+            indices (sequence): Row indices.
+
+        Returns:
+            Table: The selected rows.
+        """
+        indices = list(indices)
+        return Table({name: _take_values(values, indices) for name, values in self.columns.items()})
+
+    def select(self, mask: Iterable[bool]) -> "Table":
+        """
+        Get the rows where the mask is True.
+
+        Args:
+            mask (iterable): One bool per row.
+
+        Returns:
+            Table: The selected rows.
+        """
+        return self.take(list(compress(range(len(self)), mask)))
+
+    def where(self, name: str, op: Union[str, Callable], value=None) -> "Table":
+        """
+        Get the rows where the column matches a condition.
+
+        Args:
+            name (str): The column name.
+            op (str | callable): One of ==, !=, <, <=, >, >=, in - or a predicate taking the column value.
+            value: The value to compare with (not used with a predicate).
+
+        Returns:
+            Table: The matching rows. Missing values (None / NaN) never match a comparison.
+        """
+        values = self.columns[name]
+        if callable(op):
+            return self.select(map(op, values))
+        if op not in OPERATORS:
+            raise FilmotException(f"Invalid operator: {op}, valid operators: {list(OPERATORS)}")
+        compare = OPERATORS[op]
+        if isinstance(values, array) and op in NAN_FALSE_OPERATORS:
+            return self.select(map(compare, values, repeat(value)))
+        return self.take(
+            [i for i, item in enumerate(values) if item is not None and item == item and compare(item, value)]
+        )
+
+    def sort(self, name: str, reverse: bool = False) -> "Table":
+        """
+        Get the rows sorted by a column, missing values (None / NaN) last.
+
+        Args:
+            name (str): The column name.
+            reverse (bool): Sort in descending order.
+
+        Returns:
+            Table: The sorted rows.
+        """
+        values = self.columns[name]
+        missing = [item is None or item != item for item in values]
+        if any(missing):
+            present = list(compress(range(len(values)), map(operator.not_, missing)))
+            present.sort(key=values.__getitem__, reverse=reverse)
+            order = present + list(compress(range(len(values)), missing))
+        else:
+            order = sorted(range(len(values)), key=values.__getitem__, reverse=reverse)
+        return self.take(order)
+
+    def to_numpy(self) -> dict:
+        """
+        Get the columns as numpy arrays: float64 for the numeric columns (without copying), object for the others.
+
+        Returns:
+            dict: Column name to numpy array.
+        """
+        try:
+            import numpy as np
+        except ImportError as ex:
+            raise FilmotException(f"to_numpy requires numpy, install it with: pip install numpy ({ex})")
+
+        columns = {}
+        for name, values in self.columns.items():
+            if isinstance(values, array):
+                columns[name] = np.frombuffer(values, dtype=np.float64) if len(values) else np.empty(0)
+            else:
+                columns[name] = np.array(values, dtype=object)
+        return columns
+
+    def to_pandas(self):
+        """
+        Get the table as a pandas DataFrame.
+
+        Returns:
+            pandas.DataFrame: The table.
+        """
+        try:
+            import pandas as pd
+        except ImportError as ex:
+            raise FilmotException(f"to_pandas requires pandas, install it with: pip install pandas ({ex})")
+
+        return pd.DataFrame(self.to_numpy())
+
+
+class ResultFrame:
+    """Columnar view of a batch of search results: a videos table, and a hits table keyed by video id.
+
+    The videos table has one row per SearchResponse: `query`, the VideoInfo fields, and `hit_count`.
+    The hits table has one row per hit: `video_id`, `start`, and the other hit fields.
+
+    >>> frame = ResultFrame.from_responses(filmot.search("hello world", limit=100))
+    >>> frame.videos.to_pandas().groupby("channel_name")["view_count"].sum()
+    >>> frame.video_hits("dQw4w9WgXcQ").sort("start")
+    """
+
+    __slots__ = ("videos", "hits", "_hit_ranges")
+
+    def __init__(self, videos: Table, hits: Table, hit_ranges: Optional[Dict[str, List[tuple]]] = None):
+        """
+        Initialize the frame.
+
+        Args:
+            videos (Table): The videos table.
+            hits (Table): The hits table.
+            hit_ranges (dict): Video id to the (begin, end) hit rows ranges of the video.
+        """
+        self.videos = videos
+        self.hits = hits
+        self._hit_ranges = hit_ranges
+
+    def __len__(self):
+        """Get the amount of videos."""
+        return len(self.videos)
+
+    def __repr__(self):
+        """Return a string representation of the frame."""
+        return f"<ResultFrame {len(self.videos)} videos, {len(self.hits)} hits>"
+
+    @classmethod
+    def from_responses(cls, responses) -> "ResultFrame":
+        """
+        Build the frame from SearchResponse objects.
+
+        Args:
+            responses (iterable | dict): SearchResponse objects, or a dict of category to list of them
+                (as returned by `Filmot.search`).
+
+        Returns:
+            ResultFrame: The frame.
+        """
+        if isinstance(responses, dict):
+            responses = [response for category_responses in responses.values() for response in category_responses]
+        videos = {"query": []}
+        videos.update({name: [] for name in VIDEO_TEXT_COLUMNS})
+        videos.update({name: array("d") for name in VIDEO_NUMERIC_COLUMNS})
+        videos["hit_count"] = array("d")
+        hit_columns = {"video_id": [], "start": array("d")}
+        hit_ranges = {}
+        for response in responses:
+            video_info = response.video_info
+            videos["query"].append(response.query)
+            for name in VIDEO_TEXT_COLUMNS:
+                videos[name].append(getattr(video_info, name))
+            for name in VIDEO_NUMERIC_COLUMNS:
+                videos[name].append(_to_float(getattr(video_info, name)))
+            hits = response.hits
+            videos["hit_count"].append(len(hits))
+            begin = len(hit_columns["video_id"])
+            for key in hits.keys():
+                if key not in hit_columns:
+                    # a new hit field, missing in the previous rows
+                    hit_columns[key] = [None] * begin
+            for name, values in hit_columns.items():
+                if name == "video_id":
+                    values.extend([video_info.id] * len(hits))
+                elif name == "start":
+                    values.extend(hits.start(i) for i in range(len(hits)))
+                else:
+                    values.extend(hits.value(i, name) for i in range(len(hits)))
+            hit_ranges.setdefault(video_info.id, []).append((begin, begin + len(hits)))
+        return cls(Table(videos), Table(hit_columns), hit_ranges)
+
+    def video_hits(self, video_id: str) -> Table:
+        """
+        Get the hits of a video.
+
+        Args:
+            video_id (str): The video id.
+
+        Returns:
+            Table: The video hits rows.
+        """
+        if self._hit_ranges is None:
+            return self.hits.where("video_id", "==", video_id)
+        ranges = self._hit_ranges.get(video_id, [])
+        return self.hits.take([i for begin, end in ranges for i in range(begin, end)])
@@ -0,0 +1,222 @@
+"""
+This file is part of Filmot API wrapper.
+
+Filmot API is free software: you can redistribute it and/or modify
+it under the terms of the MIT License as published by the Massachusetts
+Institute of Technology.
+
+For full details, please see the LICENSE file located in the root
+directory of this project.
+
+Request-level metrics (counters and histograms) and instrumentation hooks, to export to Prometheus / StatsD.
+"""
+import bisect
+import logging
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Sequence
+
+from .exceptions import FilmotException
+
+logger = logging.getLogger(__name__)
+
+# seconds, from 1ms to ~1min
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+HOOK_EVENTS = ("before_request", "after_request", "on_retry")
+
+
+class Histogram:
+    """Fixed buckets histogram, like the Prometheus ones: `buckets` are the inclusive upper bounds."""
+
+    __slots__ = ("buckets", "counts", "count", "sum", "min", "max")
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """
+        Initialize the histogram.
+
+        Args:
+            buckets (sequence): Sorted bucket upper bounds, an implicit +Inf bucket is added.
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value: float):
+        """Record a value (not thread safe, `Metrics` holds its lock)."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Estimate a percentile: the upper bound of the bucket holding it (the max for the +Inf bucket)."""
+        if not self.count:
+            return None
+        rank = percent / 100 * self.count
+        total = 0
+        for index, count in enumerate(self.counts):
+            total += count
+            if total >= rank and count:
+                return self.buckets[index] if index < len(self.buckets) else self.max
+        return self.max
+
+    def to_dict(self) -> dict:
+        """Get the histogram state, with cumulative bucket counts as in the Prometheus exposition format."""
+        cumulative = []
+        total = 0
+        for count in self.counts:
+            total += count
+            cumulative.append(total)
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+            "buckets": dict(zip([*self.buckets, float("inf")], cumulative)),
+        }
+
+
+class Metrics:
+    """Metrics of a client: counters and per-command histograms, plus instrumentation hooks.
+
+    Counters: requests, errors, retries, bytes_received, throttled_requests, throttle_sleep_seconds,
+    cache_hits, cache_misses (and `{name}.{command}` per command for requests, errors and bytes_received).
+    Histograms (seconds, per command): request_seconds, parse_seconds, build_seconds.
+
+    Hooks are called synchronously in the requesting thread, keep them fast:
+        before_request(cmd, query)
+        after_request(cmd, query, status_code, elapsed, bytes_received, error)
+        on_retry(attempt, delay, error)
+
+    >>> metrics = Metrics()
+    >>> metrics.add_hook("after_request", lambda cmd, query, status_code, elapsed, **_: statsd.timing(cmd, elapsed))
+    >>> filmot = Filmot(metrics=metrics)
+    >>> filmot.metrics.snapshot()
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """
+        Initialize the metrics.
+
+        Args:
+            buckets (sequence): The histograms bucket upper bounds, in seconds.
+        """
+        self.buckets = tuple(buckets)
+        self.counters: Dict[str, float] = defaultdict(float)
+        self.histograms: Dict[str, Dict[str, Histogram]] = defaultdict(dict)
+        self.hooks: Dict[str, List[Callable]] = {event: [] for event in HOOK_EVENTS}
+        self.lock = threading.Lock()
+
+    def __repr__(self):
+        """Return a string representation of the main counters."""
+        return f"<Metrics requests={self.counters['requests']:.0f} errors={self.counters['errors']:.0f}>"
+
+    def add_hook(self, event: str, callback: Callable):
+        """
+        Register a hook.
+
+        Args:
+            event (str): before_request, after_request or on_retry.
+            callback (callable): Called with the event keyword arguments.
+        """
+        if event not in self.hooks:
+            raise FilmotException(f"Invalid hook event: {event}, valid events: {HOOK_EVENTS}")
+        self.hooks[event].append(callback)
+
+    def remove_hook(self, event: str, callback: Callable):
+        """Unregister a hook."""
+        self.hooks[event].remove(callback)
+
+    def emit(self, event: str, **kwargs):
+        """Call the hooks of the event, a failing hook is logged and ignored."""
+        for callback in self.hooks[event]:
+            try:
+                callback(**kwargs)
+            except Exception as ex:
+                logger.warning(f"Metrics hook {event} failed: {ex}")
+
+    def inc(self, name: str, value: float = 1, command: Optional[str] = None):
+        """Increment a counter, and its per command counter if a command is given."""
+        with self.lock:
+            self.counters[name] += value
+            if command:
+                self.counters[f"{name}.{command}"] += value
+
+    def observe(self, name: str, command: str, value: float):
+        """Record a value in the command histogram."""
+        with self.lock:
+            histogram = self.histograms[name].get(command)
+            if histogram is None:
+                histogram = self.histograms[name][command] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def record_request(
+        self,
+        cmd: str,
+        query: dict,
+        status_code: Optional[int],
+        elapsed: float,
+        bytes_received: int = 0,
+        error: Optional[BaseException] = None,
+    ):
+        """Record a finished HTTP request (of a single attempt), and call the after_request hooks."""
+        with self.lock:
+            counters = self.counters
+            counters["requests"] += 1
+            counters[f"requests.{cmd}"] += 1
+            if bytes_received:
+                counters["bytes_received"] += bytes_received
+                counters[f"bytes_received.{cmd}"] += bytes_received
+            if error is not None:
+                counters["errors"] += 1
+                counters[f"errors.{cmd}"] += 1
+            histogram = self.histograms["request_seconds"].get(cmd)
+            if histogram is None:
+                histogram = self.histograms["request_seconds"][cmd] = Histogram(self.buckets)
+            histogram.observe(elapsed)
+        if self.hooks["after_request"]:
+            self.emit(
+                "after_request",
+                cmd=cmd,
+                query=query,
+                status_code=status_code,
+                elapsed=elapsed,
+                bytes_received=bytes_received,
+                error=error,
+            )
+
+    def record_retry(self, attempt: int, delay: float, error: BaseException):
+        """Record a retry, and call the on_retry hooks."""
+        self.inc("retries")
+        if self.hooks["on_retry"]:
+            self.emit("on_retry", attempt=attempt, delay=delay, error=error)
+
+    def record_throttle(self, wait: float):
+        """Record a request delayed by the rate limiter or the throttle."""
+        if wait > 0:
+            with self.lock:
+                self.counters["throttled_requests"] += 1
+                self.counters["throttle_sleep_seconds"] += wait
+
+    def snapshot(self) -> dict:
+        """Get a copy of the counters and histograms."""
+        with self.lock:
+            return {
+                "counters": dict(self.counters),
+                "histograms": {
+                    name: {command: histogram.to_dict() for command, histogram in histograms.items()}
+                    for name, histograms in self.histograms.items()
+                },
+            }
+
+    def reset(self):
+        """Reset the counters and histograms, the hooks are kept."""
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
@@ -0,0 +1,250 @@
+"""
+This file is part of Filmot API wrapper.
+
+Filmot API is free software: you can redistribute it and/or modify
+it under the terms of the MIT License as published by the Massachusetts
+Institute of Technology.
+
+For full details, please see the LICENSE file located in the root
+directory of this project.
+
+Immutable, validated search query, accepted by the client search methods.
+"""
+from typing import Literal, Optional, Tuple, Union, List
+
+from .cache import make_cache_key
+from .consts import VALID_CATEGORIES, VALID_COUNTRIES, VALID_LANGUAGES
+from .exceptions import FilmotException
+
+# filter argument name -> API parameter name, in the order the parameters are sent
+FILTER_PARAMS = (
+    ("language", "lang"),
+    ("exclude_category", "excludeCategory"),
+    ("license", "license"),
+    ("max_views", "maxViews"),
+    ("min_views", "minViews"),
+    ("min_likes", "minLikes"),
+    ("country", "country"),
+    ("channel_id", "channelID"),
+    ("title", "title"),
+    ("start_duration", "startDuration"),
+    ("end_duration", "endDuration"),
+    ("search_manual_subs", "searchManualSubs"),
+    ("start_date", "startDate"),
+    ("end_date", "endDate"),
+)
+FILTER_NAMES = tuple(name for name, _ in FILTER_PARAMS)
+# the __init__ arguments order, after `query`
+ARGUMENT_NAMES = ("language", "category", *FILTER_NAMES[1:])
+FLAG_VALUES = (1, 2)
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize the query text: collapse the whitespaces, and quote a multi-word query (once).
+
+    Args:
+        query (str): The query text, quoted or not.
+
+    Returns:
+        str: The query as sent to the API, e.g. `"spill the beans"` for spill  the beans.
+    """
+    text = " ".join(query.split())
+    if len(text) >= 2 and text[0] == text[-1] == '"':
+        text = " ".join(text[1:-1].split())
+    return f'"{text}"' if " " in text else text
+
+
+class SearchQuery:
+    """Immutable search query: validated once, then reused across calls.
+
+    Equal queries have the same hash and `key`, so caching, deduplication and batch scheduling can key on it.
+
+    >>> base = SearchQuery("Spill The Beans", category=Categories.GAMING, min_views=1000)
+    >>> queries = [base.replace(channel_id=channel_id) for channel_id in channel_ids]
+    >>> filmot.search(queries[0], limit=20)
+    """
+
+    __slots__ = ("query", "categories", *FILTER_NAMES, "_params", "_hash")
+
+    def __init__(
+        self,
+        query: str,
+        language: Optional[str] = None,
+        category: Optional[Union[str, List[str]]] = None,
+        exclude_category: Optional[str] = None,
+        license: Optional[Literal[1, 2]] = None,
+        max_views: Optional[int] = None,
+        min_views: Optional[int] = None,
+        min_likes: Optional[int] = None,
+        country: Optional[int] = None,
+        channel_id: Optional[str] = None,
+        title: Optional[str] = None,
+        start_duration: Optional[int] = None,
+        end_duration: Optional[int] = None,
+        search_manual_subs: Optional[Literal[1, 2]] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ):
+        """
+        Initialize and validate the query.
+
+        See `Filmot.search` for the arguments description.
+
+        Raises:
+            FilmotException: If an argument is invalid.
+        """
+        if not isinstance(query, str) or not query.strip(' "'):
+            raise FilmotException(f"Invalid query: {query!r}, expected a non empty string")
+        if category is None:
+            categories = ()
+        elif isinstance(category, str):
+            categories = (category,)
+        else:
+            # drop the duplicates, keep the order
+            categories = tuple(dict.fromkeys(category))
+        for value in categories:
+            if value not in VALID_CATEGORIES:
+                raise FilmotException(f"Invalid category: {value!r}, see Categories.get_all_categories()")
+        if language is not None and language not in VALID_LANGUAGES:
+            raise FilmotException(f"Invalid language: {language!r}, see Language.get_all_codes()")
+        if country is not None and country not in VALID_COUNTRIES:
+            raise FilmotException(f"Invalid country: {country!r}, see Countries.get_all_codes()")
+        if license is not None and license not in FLAG_VALUES:
+            raise FilmotException(f"Invalid license: {license!r}, expected 1 or 2")
+        if search_manual_subs is not None and search_manual_subs not in FLAG_VALUES:
+            raise FilmotException(f"Invalid search_manual_subs: {search_manual_subs!r}, expected 1 or 2")
+
+        filters = (
+            language,
+            exclude_category,
+            license,
+            max_views,
+            min_views,
+            min_likes,
+            country,
+            channel_id,
+            title,
+            start_duration,
+            end_duration,
+            search_manual_subs,
+            start_date,
+            end_date,
+        )
+        set_attr = object.__setattr__
+        set_attr(self, "query", normalize_query(query))
+        set_attr(self, "categories", categories)
+        params = {"query": self.query}
+        for (name, param), value in zip(FILTER_PARAMS, filters):
+            set_attr(self, name, value)
+            if value is not None:
+                params[param] = value
+        set_attr(self, "_params", params)
+        set_attr(self, "_hash", None)
+
+    @classmethod
+    def build(cls, query: Union[str, "SearchQuery"], **filters) -> "SearchQuery":
+        """
+        Get the query of a search call: a SearchQuery, with the given filters overriding its own, or a new one.
+
+        Args:
+            query (Union[str, SearchQuery]): The query text, or a SearchQuery.
+            filters: The search filters, None values are ignored for a SearchQuery.
+
+        Returns:
+            SearchQuery: The search query.
+        """
+        if isinstance(query, SearchQuery):
+            changes = {name: value for name, value in filters.items() if value is not None}
+            return query.replace(**changes) if changes else query
+        return cls(query, **filters)
+
+    @property
+    def category(self) -> Optional[Union[str, Tuple[str, ...]]]:
+        """Get the category argument: None, a single category or a tuple of categories."""
+        if not self.categories:
+            return None
+        return self.categories[0] if len(self.categories) == 1 else self.categories
+
+    def params(self, category: Optional[str] = None) -> dict:
+        """
+        Get the API query parameters, a new dict on each call.
+
+        Args:
+            category (str, optional): The category of the request, one of the query categories.
+
+        Returns:
+            dict: The query parameters.
+        """
+        return dict(self._params) if category is None else dict(self._params, category=category)
+
+    def category_params(self) -> dict:
+        """Get the API query parameters of each category request, keyed by category (None if no category)."""
+        return {category: self.params(category) for category in self.categories or (None,)}
+
+    def single_params(self) -> dict:
+        """
+        Get the API query parameters of a single request.
+
+        Raises:
+            FilmotException: If the query has more than one category.
+        """
+        if len(self.categories) > 1:
+            raise FilmotException(f"A single request can't search {len(self.categories)} categories, use search()")
+        return self.params(self.categories[0] if self.categories else None)
+
+    def to_dict(self) -> dict:
+        """Get the query arguments, without the None values."""
+        arguments = {"query": self.query, "category": self.category}
+        arguments.update((name, getattr(self, name)) for name in FILTER_NAMES)
+        if isinstance(arguments["category"], tuple):
+            arguments["category"] = list(arguments["category"])
+        return {name: value for name, value in arguments.items() if value is not None}
+
+    def replace(self, **changes) -> "SearchQuery":
+        """Get a copy of the query with some arguments changed.
+
+        >>> channel_query = query.replace(channel_id=channel_id)
+        """
+        arguments = self.to_dict()
+        arguments.update(changes)
+        return SearchQuery(**arguments)
+
+    def _canonical(self) -> tuple:
+        # the categories are searched independently, their order doesn't change the query
+        return tuple(sorted(self._params.items())), tuple(sorted(self.categories))
+
+    @property
+    def key(self) -> str:
+        """Get the canonical key of the query, stable across processes (unlike hash())."""
+        params = dict(self._params, category=sorted(self.categories) or None)
+        return make_cache_key("search", params)
+
+    def __hash__(self):
+        """Get the hash of the canonical query."""
+        if self._hash is None:
+            object.__setattr__(self, "_hash", hash(self._canonical()))
+        return self._hash
+
+    def __eq__(self, other):
+        """Compare the canonical queries."""
+        if not isinstance(other, SearchQuery):
+            return NotImplemented
+        return self._canonical() == other._canonical()
+
+    def __setattr__(self, name, value):
+        """Prevent changes, use replace()."""
+        raise AttributeError(f"SearchQuery is immutable, use replace({name}=...)")
+
+    def __delattr__(self, name):
+        """Prevent changes."""
+        raise AttributeError("SearchQuery is immutable")
+
+    def __reduce__(self):
+        """Pickle the query by its arguments."""
+        return SearchQuery, (self.query, *(getattr(self, name) for name in ARGUMENT_NAMES))
+
+    def __repr__(self):
+        """Return a string representation of the query arguments."""
+        arguments = ", ".join(f"{name}={value!r}" for name, value in self.to_dict().items())
+        return f"SearchQuery({arguments})"
@@ -0,0 +1,307 @@
+"""
+This file is part of Filmot API wrapper.
+
+Filmot API is free software: you can redistribute it and/or modify
+it under the terms of the MIT License as published by the Massachusetts
+Institute of Technology.
+
+For full details, please see the LICENSE file located in the root
+directory of this project.
+"""
+import time
+import logging
+import threading
+from typing import List, Mapping, Optional
+from email.utils import parsedate_to_datetime
+
+from .dicts import DotDict
+from .exceptions import FilmotException, FilmotRateLimitException
+from .retry import load_asyncio
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RETRY_AFTER = 1.0
+# max seconds the throttle makes a caller sleep, longer waits are raised as FilmotRateLimitException
+DEFAULT_MAX_THROTTLE_WAIT = 10.0
+# a reset header value above this is an epoch timestamp, not a number of seconds
+EPOCH_THRESHOLD = 10**9
+
+
+class RateLimiter:
+    """Rate limiter based on GCRA (the generic cell rate algorithm, a token bucket variant).
+
+    Each limit allows `max_calls` per `period_sec`, spread evenly: a call is allowed every
+    `period_sec / max_calls` seconds. An optional `burst` lets up to that many calls go at once after an
+    idle period, at the cost of up to `max_calls + burst - 1` calls in the first period (the default
+    burst of 1 never exceeds `max_calls` in any period). Multiple limits can be stacked, a call must be
+    allowed by all of them.
+
+    The lock is only held to reserve a time slot, the caller sleeps outside of it, so a throttled
+    caller never blocks the others from reserving their own slots.
+
+    >>> limiter = RateLimiter([{"period_sec": 1, "max_calls": 5}, {"period_sec": 60, "max_calls": 100, "burst": 5}])
+    >>> limiter.acquire()
+    >>> await limiter.acquire_async()
+    """
+
+    def __init__(self, rate_limit: Optional[List[dict]] = None, clock=time.monotonic):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            rate_limit (list): List of dicts with: max_calls, period_sec, and optional burst (calls, default 1).
+            clock (callable): Monotonic clock, returns seconds.
+
+        Raises:
+            FilmotException: If a burst is not between 1 and max_calls.
+        """
+        self.clock = clock
+        self.limits = []
+        for limit in rate_limit or []:
+            limit = DotDict(limit)
+            burst = limit.get("burst", 1)
+            if not 1 <= burst <= limit.max_calls:
+                raise FilmotException(f"Invalid burst: {burst!r}, expected 1 to max_calls ({limit.max_calls})")
+            interval = limit.period_sec / limit.max_calls
+            self.limits.append(
+                DotDict(
+                    dict(
+                        max_calls=limit.max_calls,
+                        period_sec=limit.period_sec,
+                        interval=interval,
+                        # GCRA tolerance: how far ahead of the schedule a call may go
+                        tolerance=(burst - 1) * interval,
+                        theoretical_arrival=0.0,
+                        total_calls=0,
+                    )
+                )
+            )
+        self.lock = threading.Lock()
+
+    @classmethod
+    def create(cls, rate_limit) -> "RateLimiter":
+        """Get a RateLimiter from a list of limit dicts, or return the given RateLimiter as is (to share it)."""
+        if isinstance(rate_limit, RateLimiter):
+            return rate_limit
+        return cls(rate_limit)
+
+    def __bool__(self):
+        """Return True if there is any limit to apply."""
+        return bool(self.limits)
+
+    def __repr__(self):
+        """Return a string representation of the limits."""
+        limits = ", ".join(f"{limit.max_calls}/{limit.period_sec}s" for limit in self.limits)
+        return f"<RateLimiter {limits}>"
+
+    def reserve(self) -> float:
+        """
+        Reserve a slot for one call.
+
+        Returns:
+            float: Seconds the caller should wait before making the call.
+        """
+        if not self.limits:
+            return 0.0
+        with self.lock:
+            now = self.clock()
+            # the call is allowed once all the limits allow it
+            allowed_at = now
+            for limit in self.limits:
+                tat = max(limit.theoretical_arrival, now)
+                allowed_at = max(allowed_at, tat - limit.tolerance)
+            for limit in self.limits:
+                limit.theoretical_arrival = max(limit.theoretical_arrival, allowed_at) + limit.interval
+                limit.total_calls += 1
+        return allowed_at - now
+
+    def acquire(self) -> float:
+        """Block until a call is allowed, return the seconds waited."""
+        wait = self.reserve()
+        if wait > 0:
+            logger.debug(f"going to sleep for {wait:.2f} {self}")
+            time.sleep(wait)
+        return max(wait, 0.0)
+
+    async def acquire_async(self) -> float:
+        """Wait, without blocking the event loop, until a call is allowed, return the seconds waited."""
+        asyncio = load_asyncio()
+
+        wait = self.reserve()
+        if wait > 0:
+            logger.debug(f"going to sleep for {wait:.2f} {self}")
+            await asyncio.sleep(wait)
+        return max(wait, 0.0)
+
+
+def parse_retry_after(value: Optional[str], default: float = DEFAULT_RETRY_AFTER) -> float:
+    """
+    Parse a Retry-After header value.
+
+    Args:
+        value (str): Number of seconds, or an HTTP date.
+        default (float): Seconds to return if the value is missing or invalid.
+
+    Returns:
+        float: Seconds to wait.
+    """
+    if not value:
+        return default
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return default
+
+
+class AdaptiveThrottle:
+    """Throttle driven by the rate limit headers the API responds with.
+
+    RapidAPI reports the plan quota on every response (`X-RateLimit-Requests-Limit`, `-Remaining`, `-Reset`).
+    Once the remaining quota drops below `slowdown_ratio` of the limit, the remaining calls are spread evenly
+    until the quota resets, instead of burning it and getting rejected. A 429 response blocks all the callers
+    for exactly its `Retry-After` interval.
+
+    A caller never sleeps longer than `max_wait`: the pacing interval is capped at `max_wait` (a quota that
+    resets in days is not spread over days), and a longer block (a long `Retry-After`, or a used up quota that
+    resets later) raises FilmotRateLimitException, so the retry policy decides whether it is worth waiting for.
+
+    The throttle state is shared by all the callers (threads or asyncio tasks) of a client.
+    """
+
+    HEADER_PREFIXES = ("x-ratelimit-requests-", "x-ratelimit-")
+
+    def __init__(
+        self,
+        slowdown_ratio: float = 0.1,
+        slowdown_below: int = 10,
+        max_wait: float = DEFAULT_MAX_THROTTLE_WAIT,
+        clock=time.monotonic,
+    ):
+        """
+        Initialize the throttle.
+
+        Args:
+            slowdown_ratio (float): Start pacing the calls once the remaining quota is below this ratio of the limit.
+            slowdown_below (int): Start pacing the calls below this remaining quota, if the limit is unknown.
+            max_wait (float): Max seconds a caller sleeps, a longer block raises FilmotRateLimitException.
+            clock (callable): Monotonic clock, returns seconds.
+        """
+        self.slowdown_ratio = slowdown_ratio
+        self.slowdown_below = slowdown_below
+        self.max_wait = max_wait
+        self.clock = clock
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset_at: Optional[float] = None
+        self.blocked_until = 0.0
+        self.next_allowed = 0.0
+        self.throttled_calls = 0
+        self.lock = threading.Lock()
+
+    def __repr__(self):
+        """Return a string representation of the throttle state."""
+        return f"<AdaptiveThrottle remaining={self.remaining}/{self.limit}>"
+
+    def _header(self, headers: Mapping, name: str) -> Optional[float]:
+        for prefix in self.HEADER_PREFIXES:
+            value = headers.get(f"{prefix}{name}")
+            if value is not None:
+                try:
+                    return float(value)
+                except ValueError:
+                    return None
+        return None
+
+    def update(self, headers: Mapping):
+        """
+        Update the quota state from a response headers.
+
+        Args:
+            headers (Mapping): The response headers.
+        """
+        headers = {k.lower(): v for k, v in headers.items()}
+        limit = self._header(headers, "limit")
+        remaining = self._header(headers, "remaining")
+        reset = self._header(headers, "reset")
+        if remaining is None:
+            return
+        now = self.clock()
+        with self.lock:
+            if limit is not None:
+                self.limit = int(limit)
+            self.remaining = int(remaining)
+            if reset is not None:
+                if reset > EPOCH_THRESHOLD:
+                    reset -= time.time()
+                self.reset_at = now + max(reset, 0.0)
+
+    def on_rate_limited(self, retry_after: float):
+        """
+        Block all the callers after a 429 response.
+
+        Args:
+            retry_after (float): Seconds to wait, as advertised by the API.
+        """
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, self.clock() + retry_after)
+        logger.warning(f"Rate limited by the API, backing off for {retry_after:.2f} sec")
+
+    def reserve(self) -> float:
+        """
+        Reserve a slot for one call.
+
+        Returns:
+            float: Seconds the caller should wait before making the call, at most `max_wait`.
+
+        Raises:
+            FilmotRateLimitException: If the calls are blocked, or the quota is used up, for more than `max_wait`.
+        """
+        with self.lock:
+            now = self.clock()
+            if self.blocked_until > now:
+                wait = self.blocked_until - now
+                if wait > self.max_wait:
+                    raise FilmotRateLimitException(f"Rate limited by the API for {wait:.2f} more sec", wait)
+            elif self.remaining is None or self.reset_at is None or self.reset_at <= now:
+                wait = 0.0
+            else:
+                threshold = self.limit * self.slowdown_ratio if self.limit else self.slowdown_below
+                if self.remaining >= threshold:
+                    wait = 0.0
+                elif self.remaining <= 0:
+                    wait = self.reset_at - now
+                    if wait > self.max_wait:
+                        raise FilmotRateLimitException(f"API quota used up, it resets in {wait:.2f} sec", wait)
+                else:
+                    # spread the remaining calls evenly until the quota resets, at most max_wait apart
+                    allowed_at = min(max(self.next_allowed, now), now + self.max_wait, self.reset_at)
+                    interval = min((self.reset_at - allowed_at) / self.remaining, self.max_wait)
+                    self.next_allowed = allowed_at + interval
+                    wait = allowed_at - now
+                if self.remaining > 0:
+                    self.remaining -= 1
+            if wait > 0:
+                self.throttled_calls += 1
+        return wait
+
+    def acquire(self) -> float:
+        """Block until a call is allowed, return the seconds waited."""
+        wait = self.reserve()
+        if wait > 0:
+            logger.debug(f"going to sleep for {wait:.2f} {self}")
+            time.sleep(wait)
+        return max(wait, 0.0)
+
+    async def acquire_async(self) -> float:
+        """Wait, without blocking the event loop, until a call is allowed, return the seconds waited."""
+        asyncio = load_asyncio()
+
+        wait = self.reserve()
+        if wait > 0:
+            logger.debug(f"going to sleep for {wait:.2f} {self}")
+            await asyncio.sleep(wait)
+        return max(wait, 0.0)
@@ -8,7 +8,9 @@ Institute of Technology.
 For full details, please see the LICENSE file located in the root
 directory of this project.
 """
+import math
 import logging
+from typing import Sequence
 
 from .responses_base import BaseResponse
 from .dicts import DotDict
@@ -19,6 +21,22 @@ logger = logging.getLogger(__name__)
 class VideoInfo(BaseResponse):
     """VideoInfo class for video info in search results."""
 
+    __slots__ = (
+        "id",
+        "title",
+        "duration",
+        "upload_date",
+        "view_count",
+        "like_count",
+        "channel_id",
+        "language",
+        "category",
+        "channel_name",
+        "channel_sub_count",
+        "channel_country_name",
+        "channel_thumbnail_url",
+    )
+
     def __init__(self, **kwargs):
         """Initialize a VideoInfo object."""
         self.id = kwargs.get("id")
@@ -40,10 +58,158 @@ class VideoInfo(BaseResponse):
         """Meta class for VideoInfo."""
 
         main_field = "id"
+        fields = (
+            "id",
+            "title",
+            "duration",
+            "upload_date",
+            "view_count",
+            "like_count",
+            "channel_id",
+            "language",
+            "category",
+            "channel_name",
+            "channel_sub_count",
+            "channel_country_name",
+            "channel_thumbnail_url",
+        )
+
+
+# marks a key missing in a hit, in the HitList values
+_MISSING = object()
+# the shared (keys, key index) layouts of the HitLists, by keys
+_LAYOUTS = {}
+MAX_SHARED_LAYOUTS = 256
+
+
+def _hits_layout(keys: tuple) -> tuple:
+    """Get the (keys, key index) layout of the given hit keys, shared by all the HitLists with the same keys."""
+    layout = _LAYOUTS.get(keys)
+    if layout is None:
+        layout = (keys, {key: i for i, key in enumerate(keys)})
+        if len(_LAYOUTS) < MAX_SHARED_LAYOUTS:
+            layout = _LAYOUTS.setdefault(keys, layout)
+    return layout
+
+
+class HitList(Sequence):
+    """Compact, read-only list of the query hits of a search result, sorted by start time.
+
+    Hits that are already sorted, as the API usually returns them, are not sorted again. The hit values are kept
+    in a single flat tuple, one row of values per hit, instead of a dict per hit. The keys and their index are
+    shared by all the HitLists with the same keys, so a HitList only holds its values. Items are materialized as
+    DotDict on access, with the values as the API returned them: `hits[0].ctx_after`, `hits[0]["start"]`. Hits
+    without a start time are sorted last. Use `value(index, key)` and `start(index)` to read a single value
+    without materializing the hit.
+    """
+
+    __slots__ = ("_layout", "_values", "_length")
+
+    def __init__(self, hits: list):
+        """
+        Initialize the hits list.
+
+        Args:
+            hits (list): The raw hit dicts of the API result.
+        """
+        sort_keys = [self._parse_start(hit.get("start")) for hit in hits]
+        # NaN (a missing start) compares false both ways, sort it as the last value
+        sort_keys = [math.inf if start != start else start for start in sort_keys]
+        if any(sort_keys[i] > sort_keys[i + 1] for i in range(len(sort_keys) - 1)):
+            hits = [hits[i] for i in sorted(range(len(hits)), key=sort_keys.__getitem__)]
+        keys = tuple(hits[0]) if hits else ()
+        if all(tuple(hit) == keys for hit in hits):
+            values = tuple(value for hit in hits for value in hit.values())
+        else:
+            # hits with other keys: the rows hold all the keys, the missing ones marked
+            keys = tuple({key: None for hit in hits for key in hit})
+            values = tuple(hit.get(key, _MISSING) for hit in hits for key in keys)
+        self._layout = _hits_layout(keys)
+        self._values = values
+        self._length = len(hits)
+
+    def __len__(self):
+        """Get the amount of hits."""
+        return self._length
+
+    def _row(self, index: int) -> tuple:
+        """Get the values of the hit at the given index."""
+        width = len(self._layout[0])
+        start = self._offset(index, width)
+        stop = start + width
+        return self._values[start:stop]
+
+    def _offset(self, index: int, width: int) -> int:
+        """Get the position of the given hit first value in the flat values."""
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("hit index out of range")
+        return index * width
+
+    def __getitem__(self, index):
+        """Get the hit (as a DotDict) at the given index, or a list of hits for a slice."""
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return DotDict(self._hit_items(self._row(index)))
+
+    def _hit_items(self, row: tuple):
+        return ((key, value) for key, value in zip(self._layout[0], row) if value is not _MISSING)
+
+    def __eq__(self, other):
+        """Compare with another sequence of hits, e.g. a list of dicts."""
+        if not isinstance(other, Sequence) or isinstance(other, str):
+            return NotImplemented
+        return len(self) == len(other) and all(hit == other_hit for hit, other_hit in zip(self, other))
+
+    __hash__ = None
+
+    def __repr__(self):
+        """Return the hits as a list representation."""
+        return repr(self.to_list())
+
+    def keys(self) -> tuple:
+        """Get the hit field names (of all the hits)."""
+        return self._layout[0]
+
+    @staticmethod
+    def _parse_start(value) -> float:
+        if value is None:
+            return math.nan
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return math.nan
+
+    def start(self, index: int) -> float:
+        """Get the start time of the given hit in seconds, NaN if it has none."""
+        return self._parse_start(self.value(index, "start"))
+
+    def value(self, index: int, key: str, default=None):
+        """Get a single value of the given hit, as the API returned it."""
+        position = self._layout[1].get(key)
+        if position is None:
+            return default
+        value = self._values[self._offset(index, len(self._layout[0])) + position]
+        return default if value is _MISSING else value
+
+    def to_list(self) -> list:
+        """Get the hits as a list of DotDicts."""
+        return [self[i] for i in range(len(self))]
+
+    def to_dict(self) -> list:
+        """Get the hits as a list of plain dicts, for serialization."""
+        return [dict(self._hit_items(self._row(i))) for i in range(len(self))]
 
 
 class SearchResponse(BaseResponse):
-    """Response class for search results."""
+    """Response class for search results.
+
+    The hits are parsed into a HitList on first access, and the raw API hit dicts are then released. Until then
+    the response keeps the raw hit dicts, so responses whose hits are never read hold the raw payload memory.
+    """
+
+    __slots__ = ("query", "category", "video_info", "_raw_hits", "_hits")
 
     def __init__(self, query: str, result: dict):
         """
@@ -61,7 +227,9 @@ class SearchResponse(BaseResponse):
         self.query = query
         self.category = category
         self.video_info = VideoInfo(**result)
-        self.hits = sorted([DotDict(hit) for hit in hits], key=lambda x: float(x["start"]))
+        # the hits are only parsed when accessed, listing the videos doesn't pay for them
+        self._raw_hits = hits
+        self._hits = None
         # self.subtitles = [DotDict(subtitle) for subtitle in subtitles]
         # self.more_results = more_results[1:]  # skip first result as it already in the result property
         super().__init__()
@@ -70,6 +238,20 @@ class SearchResponse(BaseResponse):
         """Meta class for SearchResponse."""
 
         main_field = "main_field"
+        fields = ("query", "category", "video_info", "hits")
+
+    @property
+    def hits(self) -> HitList:
+        """
+        Get the query hits, sorted by start time.
+
+        Returns:
+            HitList: The hits, parsed on first access (the raw API hit dicts are released then).
+        """
+        if self._hits is None:
+            self._hits = HitList(self._raw_hits)
+            self._raw_hits = None
+        return self._hits
 
     @property
     def main_field(self) -> str:
@@ -81,9 +263,34 @@ class SearchResponse(BaseResponse):
         """
         return f"{self.query} {self.video_info.id}"
 
+    def to_dict(self, ignore_none=False, dotted_key_to_dict=False) -> dict:
+        """Convert the SearchResponse object to a dictionary, with the hits as a list of plain dicts."""
+        data = super().to_dict(ignore_none=ignore_none, dotted_key_to_dict=dotted_key_to_dict)
+        if isinstance(data.get("hits"), HitList):
+            data["hits"] = data["hits"].to_dict()
+        return data
+
     def hit_count(self) -> int:
         """Get amount of hits."""
-        return len(self.hits)
+        if self._hits is None:
+            return len(self._raw_hits)
+        return len(self._hits)
+
+    def _hit_data(self, index: int, time_back_sec: int) -> dict:
+        """Get the link and text of the 'index' hit, with the previous hit context if it has none."""
+        hits = self.hits
+        ctx_before = hits.value(index, "ctx_before")
+        if not ctx_before and index > 0 and hits.value(index - 1, "break") == 0:
+            ctx_before = hits.value(index - 1, "ctx_after")
+        text = ctx_before + f" {self.query} " + hits.value(index, "ctx_after")
+        start = hits.start(index)
+        start = 0 if math.isnan(start) else int(start)
+        if start > time_back_sec:
+            start -= time_back_sec
+        return {
+            "link": f"https://www.youtube.com/watch?v={self.video_info.id}&t={start}s",
+            "text": text,
+        }
 
     def hit_data(self, index: int = 0) -> dict:
         """
@@ -95,18 +302,7 @@ class SearchResponse(BaseResponse):
         Returns:
             dict: Dictionary containing hit data.
         """
-        hit = self.hits[index]
-        ctx_before = hit.ctx_before
-        if not ctx_before and index > 0 and self.hits[index - 1]["break"] == 0:
-            ctx_before = self.hits[index - 1].ctx_after
-        text = ctx_before + f" {self.query} " + hit.ctx_after
-        start = int(hit.start)
-        if start > 1:
-            start -= 1
-        response = {
-            "link": f"https://www.youtube.com/watch?v={self.video_info.id}&t={start}s",
-            "text": text,
-        }
+        return self._hit_data(index, time_back_sec=1)
 
         # first_hit = self.hits[index]
         # hit_line = 0
@@ -122,7 +318,6 @@ class SearchResponse(BaseResponse):
         #     "link": f"https://www.youtube.com/watch?v={self.video_info.id}&t={start}s",
         #     "text": text,
         # }
-        return response
 
     def hits_data(self, time_back_sec=1) -> list:
         """
@@ -139,20 +334,7 @@ class SearchResponse(BaseResponse):
         # search_from = 1
         for index in range(len(self.hits)):
             try:
-                hit = self.hits[index]
-                ctx_before = hit.ctx_before
-                if not ctx_before and index > 0 and self.hits[index - 1]["break"] == 0:
-                    ctx_before = self.hits[index - 1].ctx_after
-                text = ctx_before + f" {self.query} " + hit.ctx_after
-                start = int(hit.start)
-                if start > time_back_sec:
-                    start -= time_back_sec
-                result.append(
-                    {
-                        "link": f"https://www.youtube.com/watch?v={self.video_info.id}&t={start}s",
-                        "text": text,
-                    }
-                )
+                result.append(self._hit_data(index, time_back_sec))
 
                 # for i, line in enumerate(self.subtitles[search_from:]):
                 #     if float(line.s) > float(hit.start):
@@ -173,3 +355,20 @@ class SearchResponse(BaseResponse):
                 logger.warning(f"Failed to get hits_data: {ex}")
                 break
         return result
+
+
+class SearchResults(dict):
+    """Dict of category and list of SearchResponse objects, returned by `Filmot.search`.
+
+    Categories that failed are mapped to an empty list, and their exception is kept in `errors`.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the results, with no errors."""
+        super().__init__(*args, **kwargs)
+        self.errors = {}
+
+    def add_error(self, category, error: Exception):
+        """Record a failed category."""
+        self[category] = []
+        self.errors[category] = error
@@ -11,9 +11,10 @@ directory of this project.
 
 import ast
 import json
+import operator
 import functools
 import logging
-from typing import Any
+from typing import Any, Callable, Optional
 from datetime import datetime, date
 
 logger = logging.getLogger(__name__)
@@ -61,14 +62,48 @@ class ResponseJSONEncoder(json.JSONEncoder):
         return super().default(o)
 
 
+# json.dumps(cls=...) builds a new encoder per call, the default options make a shared one safe to reuse
+_JSON_ENCODER = ResponseJSONEncoder()
+
+
+def _orjson_default(o: object) -> Any:
+    if hasattr(o, "to_dict"):
+        return o.to_dict()
+    raise TypeError(f"Object of type {o.__class__.__name__} is not JSON serializable")
+
+
+def _load_fast_dumps() -> Callable[[Any], str]:
+    """Get the fastest available compact json serializer: orjson if installed, else the stdlib encoder."""
+    try:
+        import orjson
+    except ImportError:
+        compact_encoder = ResponseJSONEncoder(separators=(",", ":"), ensure_ascii=False)
+        return compact_encoder.encode
+
+    def dumps(obj: Any) -> str:
+        return orjson.dumps(obj, default=_orjson_default).decode()
+
+    return dumps
+
+
+fast_json_dumps = _load_fast_dumps()
+fast_json_dumps.__doc__ = """Serialize to compact json (no spaces, utf-8 text), using orjson when it is installed.
+
+Unlike `to_json`, the exact formatting depends on the backend, use it where only the json value matters
+(e.g. bulk exports).
+"""
+
+
 class BaseResponse:
     """
     Base class for API responses.
 
     Attributes:
-        Meta (class): Meta class for BaseResponse.
+        Meta (class): Meta class for BaseResponse. Slotted subclasses list their fields in `Meta.fields`.
     """
 
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         """Initialize the BaseResponse object with optional keyword arguments."""
         pass
@@ -88,10 +123,43 @@ class BaseResponse:
         main_field_value = f" {getattr(self, main_field)}" if main_field else ""
         return f"<{self.__class__.__name__}{main_field_value}>"
 
+    @classmethod
+    def _fields_getter(cls) -> Optional[Callable]:
+        """Get the compiled fields getter of the class, built once and cached on the class.
+
+        Returns a function of an instance to the dict of its `Meta.fields` values, or None for classes
+        without a static fields list (their fields are read from `vars`).
+        """
+        if "_compiled_fields_getter" in cls.__dict__:
+            return cls.__dict__["_compiled_fields_getter"]
+        field_names = getattr(cls.Meta, "fields", None)
+        getter = None
+        if field_names and all(name.isidentifier() for name in field_names):
+            names = tuple(field_names)
+            values_getter = operator.attrgetter(*names)
+            if len(names) == 1:
+                # attrgetter of a single name returns the value, not a tuple
+                name = names[0]
+
+                def single_field_getter(obj):
+                    return {name: values_getter(obj)}
+
+                getter = single_field_getter
+            else:
+
+                def fields_getter(obj):
+                    return dict(zip(names, values_getter(obj)))
+
+                getter = fields_getter
+        cls._compiled_fields_getter = getter
+        return getter
+
     def fields(self):
         """Return a dictionary of attributes and their values."""
-        attributes = vars(self)
-        return attributes
+        field_names = getattr(self.Meta, "fields", None)
+        if field_names is None:
+            return vars(self)
+        return {name: getattr(self, name, None) for name in field_names}
 
     def attr(
         self,
@@ -184,15 +252,25 @@ class BaseResponse:
         Raises:
             Exception: If an error occurs while converting the object to a dictionary.
         """
-        returned_fields = self.fields()
-        key_styling = functools.partial(self.styling, camel_case=False, dotted_key_merge=False)
+        fields_data = None
+        getter = self._fields_getter()
+        if getter is not None:
+            try:
+                # fast path: the default styling and attr() options return the names and values as is
+                fields_data = getter(self)
+            except Exception:
+                # let the generic path below report the failing fields
+                fields_data = None
+        returned_fields = self.fields() if fields_data is None else fields_data
         try:
-            fields_data = {}
-            for field in returned_fields:
-                try:
-                    fields_data[key_styling(field)] = self.attr(key=field)
-                except Exception as ex:
-                    logger.warning(f"Failed to get value for {field}: {ex}")
+            if fields_data is None:
+                key_styling = functools.partial(self.styling, camel_case=False, dotted_key_merge=False)
+                fields_data = {}
+                for field in returned_fields:
+                    try:
+                        fields_data[key_styling(field)] = self.attr(key=field)
+                    except Exception as ex:
+                        logger.warning(f"Failed to get value for {field}: {ex}")
             if ignore_none:
                 fields_data = {k: v for k, v in fields_data.items() if v is not None}
             if dotted_key_to_dict:
@@ -214,4 +292,4 @@ class BaseResponse:
         Returns:
            str: The JSON-formatted string representation of the object.
         """
-        return json.dumps(self.to_dict(), cls=ResponseJSONEncoder)
+        return _JSON_ENCODER.encode(self.to_dict())
@@ -0,0 +1,281 @@
+"""
+This file is part of Filmot API wrapper.
+
+Filmot API is free software: you can redistribute it and/or modify
+it under the terms of the MIT License as published by the Massachusetts
+Institute of Technology.
+
+For full details, please see the LICENSE file located in the root
+directory of this project.
+"""
+import time
+import random
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Optional
+
+from .exceptions import (
+    FilmotConnectionException,
+    FilmotCircuitOpenException,
+    FilmotHTTPException,
+    FilmotRateLimitException,
+)
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+def load_asyncio():
+    """Import asyncio on the first async call: it is slow to import, and sync-only users never need it."""
+    import asyncio
+
+    return asyncio
+
+
+class RetryPolicy:
+    """Retry policy for the API requests.
+
+    Only retryable failures are retried: connection errors and timeouts, 5xx responses and 429 responses.
+    The delay between attempts uses exponential backoff with decorrelated jitter, except for 429 responses
+    that are retried after their advertised Retry-After interval. A call never retries past its deadline.
+
+    >>> filmot = Filmot(retry_policy=RetryPolicy(max_attempts=5, deadline=120))
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        deadline: Optional[float] = 60.0,
+        retryable_status_codes=RETRYABLE_STATUS_CODES,
+        clock=time.monotonic,
+    ):
+        """
+        Initialize the retry policy.
+
+        Args:
+            max_attempts (int): Max attempts per call, including the first one. 1 to disable retries.
+            base_delay (float): Min seconds to wait before a retry.
+            max_delay (float): Max seconds to wait before a retry.
+            deadline (float, optional): Max seconds a call may take, including all its retries. None for no deadline.
+            retryable_status_codes (set): HTTP status codes to retry.
+            clock (callable): Monotonic clock, returns seconds.
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.retryable_status_codes = frozenset(retryable_status_codes)
+        self.clock = clock
+
+    def is_retryable(self, ex: BaseException) -> bool:
+        """Check whether the failure is worth a retry."""
+        if isinstance(ex, FilmotConnectionException):
+            return True
+        if isinstance(ex, FilmotHTTPException):
+            return ex.status_code in self.retryable_status_codes
+        return False
+
+    def backoff(self, ex: BaseException, previous_delay: Optional[float] = None) -> float:
+        """
+        Get the delay before the next attempt.
+
+        Args:
+            ex (Exception): The failure of the previous attempt.
+            previous_delay (float, optional): The delay before the previous attempt, None after the first attempt.
+
+        Returns:
+            float: Seconds to wait.
+        """
+        if isinstance(ex, FilmotRateLimitException):
+            return ex.retry_after
+        previous_delay = previous_delay or self.base_delay
+        # decorrelated jitter: https://aws.amazon.com/blogs/architecture/exponential-backoff-and-jitter/
+        return min(self.max_delay, random.uniform(self.base_delay, previous_delay * 3))  # nosec B311
+
+    def _next_delay(self, ex: Exception, attempt: int, start: float, previous_delay: Optional[float]) -> float:
+        """Get the delay before the next attempt, or re-raise the failure if it shouldn't be retried."""
+        if not self.is_retryable(ex) or attempt >= self.max_attempts:
+            raise ex
+        delay = self.backoff(ex, previous_delay)
+        if self.deadline is not None and self.clock() - start + delay > self.deadline:
+            logger.warning(f"Giving up after {attempt} attempts, the call deadline is reached")
+            raise ex
+        logger.warning(f"Attempt {attempt} failed ({ex}), retrying in {delay:.2f} sec")
+        return delay
+
+    def call(
+        self,
+        func: Callable[[], Any],
+        circuit_breaker: Optional["CircuitBreaker"] = None,
+        on_retry: Optional[Callable[[int, float, Exception], None]] = None,
+    ) -> Any:
+        """
+        Call the function, retrying it according to the policy.
+
+        Args:
+            func (callable): The function to call.
+            circuit_breaker (CircuitBreaker, optional): Checked before each attempt, and updated with its result.
+            on_retry (callable, optional): Called with the failed attempt number, the delay and the failure,
+                before sleeping for the next attempt.
+
+        Returns:
+            The function returned value.
+        """
+        start = self.clock()
+        attempt = 0
+        delay = None
+        while True:
+            attempt += 1
+            if circuit_breaker:
+                circuit_breaker.before_call()
+            try:
+                result = func()
+            except Exception as ex:
+                if circuit_breaker:
+                    circuit_breaker.record_error(ex)
+                delay = self._next_delay(ex, attempt, start, delay)
+                if on_retry:
+                    on_retry(attempt, delay, ex)
+                time.sleep(delay)
+            except BaseException as ex:
+                # cancelled or interrupted: no verdict, a half-open trial must not stay in flight
+                if circuit_breaker:
+                    circuit_breaker.record_error(ex)
+                raise
+            else:
+                if circuit_breaker:
+                    circuit_breaker.record(success=True)
+                return result
+
+    async def call_async(
+        self,
+        func: Callable[[], Awaitable[Any]],
+        circuit_breaker: Optional["CircuitBreaker"] = None,
+        on_retry: Optional[Callable[[int, float, Exception], None]] = None,
+    ) -> Any:
+        """
+        Await the coroutine function, retrying it according to the policy.
+
+        Args:
+            func (callable): Returns the awaitable to retry.
+            circuit_breaker (CircuitBreaker, optional): Checked before each attempt, and updated with its result.
+            on_retry (callable, optional): Called with the failed attempt number, the delay and the failure,
+                before sleeping for the next attempt.
+
+        Returns:
+            The awaitable result.
+        """
+        asyncio = load_asyncio()
+
+        start = self.clock()
+        attempt = 0
+        delay = None
+        while True:
+            attempt += 1
+            if circuit_breaker:
+                circuit_breaker.before_call()
+            try:
+                result = await func()
+            except Exception as ex:
+                if circuit_breaker:
+                    circuit_breaker.record_error(ex)
+                delay = self._next_delay(ex, attempt, start, delay)
+                if on_retry:
+                    on_retry(attempt, delay, ex)
+                await asyncio.sleep(delay)
+            except BaseException as ex:
+                # cancelled or interrupted: no verdict, a half-open trial must not stay in flight
+                if circuit_breaker:
+                    circuit_breaker.record_error(ex)
+                raise
+            else:
+                if circuit_breaker:
+                    circuit_breaker.record(success=True)
+                return result
+
+
+class CircuitBreaker:
+    """Circuit breaker for the API requests.
+
+    After `failure_threshold` consecutive upstream failures (connection errors and 5xx responses) the circuit
+    opens, and requests fail fast with FilmotCircuitOpenException instead of tying up workers against a degraded
+    upstream. After `reset_timeout` seconds a single trial request is let through (half-open): its success closes
+    the circuit, its failure opens it again. Rate limited (429) and client errors are not counted either way.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, clock=time.monotonic):
+        """
+        Initialize the circuit breaker.
+
+        Args:
+            failure_threshold (int): Consecutive failures that open the circuit.
+            reset_timeout (float): Seconds the circuit stays open before a trial request is allowed.
+            clock (callable): Monotonic clock, returns seconds.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self.lock = threading.Lock()
+
+    def __repr__(self):
+        """Return a string representation of the circuit state."""
+        return f"<CircuitBreaker {self.state} failures={self.failures}>"
+
+    def before_call(self):
+        """Raise FilmotCircuitOpenException if the call is not allowed."""
+        with self.lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN and self.clock() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+        raise FilmotCircuitOpenException(f"Circuit is open after {self.failures} consecutive failures")
+
+    @staticmethod
+    def is_failure(ex: BaseException) -> bool:
+        """Check whether the error is an upstream failure: a connection error or a 5xx response.
+
+        A 429 response only means the quota is used up (the throttle paces it), and the other errors are
+        caused by the request itself, neither says the upstream is degraded.
+        """
+        if isinstance(ex, FilmotConnectionException):
+            return True
+        return isinstance(ex, FilmotHTTPException) and ex.status_code >= 500
+
+    def record_error(self, ex: BaseException):
+        """Record the error of an allowed call: count it if it is an upstream failure, otherwise ignore it."""
+        if self.is_failure(ex):
+            self.record(success=False)
+            return
+        with self.lock:
+            # a trial call that didn't reach a verdict lets the next call try
+            self._trial_in_flight = False
+
+    def record(self, success: bool):
+        """Record the result of an allowed call."""
+        with self.lock:
+            self._trial_in_flight = False
+            if success:
+                self.state = self.CLOSED
+                self.failures = 0
+                return
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.error(f"Opening the circuit after {self.failures} consecutive failures")
+                self.state = self.OPEN
+                self.opened_at = self.clock()
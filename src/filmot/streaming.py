@@ -0,0 +1,218 @@
+"""
+This file is part of Filmot API wrapper.
+
+Filmot API is free software: you can redistribute it and/or modify
+it under the terms of the MIT License as published by the Massachusetts
+Institute of Technology.
+
+For full details, please see the LICENSE file located in the root
+directory of this project.
+
+Incremental parsing of a json array nested in a top-level json object, e.g. the `result` array
+of the search responses, so the items can be processed while the response body is still downloading.
+"""
+import json
+import codecs
+import logging
+from typing import Any, Iterable, Iterator, List, Union
+
+logger = logging.getLogger(__name__)
+
+# drop the consumed part of the buffer once it grows over this size
+COMPACT_THRESHOLD = 64 * 1024
+WHITESPACE = " \t\n\r"
+# the characters a number (or a true / false / null literal) may continue with in the next chunk
+SCALAR_CHARS = frozenset("0123456789+-.eEtruefalsn")
+
+
+class JSONArrayParser:
+    """Push parser that yields the items of the `key` array of a top-level json object.
+
+    Feed it with the response body chunks (bytes or str) as they arrive; each `feed` returns the array items
+    completed so far. Only the current item is held in memory, not the whole body or the decoded tree.
+
+    >>> parser = JSONArrayParser("result")
+    >>> for chunk in response.iter_content(65536):
+    >>>     for item in parser.feed(chunk):
+    >>>         handle(item)
+    >>> parser.close()
+    """
+
+    def __init__(self, key: str = "result"):
+        """
+        Initialize the parser.
+
+        Args:
+            key (str): The top-level key of the array to parse.
+        """
+        self.key = key
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        # top-level object scan state, until the array is found
+        self._in_array = False
+        self._done = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string = None
+        self._current_key = None
+        # min buffer length before retrying to decode an incomplete item
+        self._retry_length = 0
+
+    @property
+    def done(self) -> bool:
+        """Whether the end of the array was reached."""
+        return self._done
+
+    def feed(self, data: Union[bytes, str]) -> List[Any]:
+        """
+        Feed the next chunk of the json document.
+
+        Args:
+            data (bytes | str): The next chunk.
+
+        Returns:
+            list: The array items completed by this chunk. Empty once the end of the array was reached, the rest
+                of the document is dropped.
+        """
+        if self._done:
+            return []
+        if isinstance(data, bytes):
+            data = self._text_decoder.decode(data)
+        self._buffer += data
+        if not self._in_array and not self._find_array():
+            return []
+        return self._parse_items(final=False)
+
+    def close(self) -> List[Any]:
+        """
+        Signal the end of the document.
+
+        Returns:
+            list: The last array items, if any.
+
+        Raises:
+            ValueError: If the document ended before the end of the array.
+        """
+        items = []
+        if self._done:
+            return items
+        self._buffer += self._text_decoder.decode(b"", final=True)
+        if self._in_array or self._find_array():
+            items = self._parse_items(final=True)
+        if not self._done:
+            if not self._in_array and self._depth == 0 and self._buffer.strip():
+                # a complete document without the key
+                self._done = True
+                return items
+            raise ValueError(f"Truncated json document, the `{self.key}` array is incomplete")
+        return items
+
+    def _find_array(self) -> bool:
+        """Scan the top-level object until the start of the `key` array, return True once found."""
+        buffer = self._buffer
+        pos = self._pos
+        while pos < len(buffer):
+            char = buffer[pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        start = self._string_start
+                        self._last_string = buffer[start:pos]
+            elif char in WHITESPACE:
+                pass
+            elif self._depth == 1 and self._current_key == self.key:
+                if char == "[":
+                    self._in_array = True
+                    pos += 1
+                    self._buffer = buffer[pos:]
+                    self._pos = 0
+                    return True
+                # the key holds no array (e.g. null), there are no items
+                self._done = True
+                self._pos = pos
+                return False
+            elif char == '"':
+                self._in_string = True
+                self._string_start = pos + 1
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+            elif char == ":" and self._depth == 1:
+                self._current_key = self._last_string
+            elif char == "," and self._depth == 1:
+                self._current_key = None
+            pos += 1
+        self._pos = pos
+        return False
+
+    def _parse_items(self, final: bool) -> List[Any]:
+        """Decode the complete items available in the buffer."""
+        items = []
+        buffer = self._buffer
+        pos = self._pos
+        while True:
+            while pos < len(buffer) and (buffer[pos] in WHITESPACE or buffer[pos] == ","):
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if buffer[pos] == "]":
+                # the rest of the document is not needed
+                self._done = True
+                buffer = ""
+                pos = 0
+                break
+            if not final and len(buffer) < self._retry_length:
+                break
+            try:
+                item, end = self._decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if final:
+                    raise ValueError(f"Invalid or truncated item in the `{self.key}` array")
+                # wait for the buffer to double before decoding the item again, to avoid quadratic retries
+                self._retry_length = pos + 2 * (len(buffer) - pos)
+                break
+            if not final and buffer[pos] not in '{["':
+                # a scalar is complete once a delimiter follows it, "1." or "1e" may continue in the next chunk
+                tail = end
+                while tail < len(buffer) and buffer[tail] in SCALAR_CHARS:
+                    tail += 1
+                if tail == len(buffer):
+                    self._retry_length = len(buffer) + 1
+                    break
+            self._retry_length = 0
+            items.append(item)
+            pos = end
+        if pos > COMPACT_THRESHOLD:
+            buffer = buffer[pos:]
+            self._retry_length = max(self._retry_length - pos, 0)
+            pos = 0
+        self._buffer = buffer
+        self._pos = pos
+        return items
+
+
+def iter_json_array(chunks: Iterable[Union[bytes, str]], key: str = "result") -> Iterator[Any]:
+    """
+    Iterate over the items of the `key` array of a json object, given as an iterable of chunks.
+
+    Args:
+        chunks (iterable): The json document chunks, bytes or str.
+        key (str): The top-level key of the array.
+
+    Yields:
+        The array items, as soon as each one is complete.
+    """
+    parser = JSONArrayParser(key)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
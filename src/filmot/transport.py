@@ -0,0 +1,108 @@
+"""
+This file is part of Filmot API wrapper.
+
+Filmot API is free software: you can redistribute it and/or modify
+it under the terms of the MIT License as published by the Massachusetts
+Institute of Technology.
+
+For full details, please see the LICENSE file located in the root
+directory of this project.
+"""
+import logging
+import threading
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import requests
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 30.0
+
+
+class HttpTransport:
+    """Pooled, keep-alive HTTP transport.
+
+    A single `requests.Session` is created lazily and shared by every call made through the transport.
+    `requests` itself is imported with the session, so creating a client doesn't load the HTTP stack.
+    The underlying urllib3 connection pools are thread-safe, so `Asyncit` workers and any other concurrent
+    callers reuse the same warm connections instead of paying a TCP+TLS handshake per request.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        keep_alive: bool = True,
+        connect_timeout: Optional[float] = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: Optional[float] = DEFAULT_READ_TIMEOUT,
+        pool_block: bool = False,
+    ):
+        """
+        Initialize the transport.
+
+        Args:
+            pool_size (int): Max connections kept open per host.
+            keep_alive (bool): Whether to keep connections open between requests.
+            connect_timeout (float, optional): Seconds to wait for the connection to be established.
+            read_timeout (float, optional): Seconds to wait for the server to send data.
+            pool_block (bool): If True, callers wait for a free connection once `pool_size` are in use,
+                instead of opening extra connections that are discarded afterwards.
+        """
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.pool_block = pool_block
+        self._session: Optional["requests.Session"] = None
+        self._lock = threading.Lock()
+
+    @property
+    def timeout(self) -> tuple:
+        """Get the (connect, read) timeout tuple passed to each request."""
+        return self.connect_timeout, self.read_timeout
+
+    @property
+    def session(self) -> "requests.Session":
+        """Get the shared session, creating it on first use."""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._create_session()
+        return self._session
+
+    def _create_session(self) -> "requests.Session":
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=self.pool_size, pool_block=self.pool_block)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        if not self.keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+    def get(self, url: str, headers: Optional[dict] = None, params: Optional[dict] = None, **kwargs):
+        """
+        Send a GET request over the pooled session.
+
+        Args:
+            url (str): The request url.
+            headers (dict, optional): Request headers.
+            params (dict, optional): Query string parameters.
+            kwargs: Additional arguments passed to `requests.Session.get`.
+
+        Returns:
+            requests.Response: The response object.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.get(url, headers=headers, params=params, **kwargs)
+
+    def close(self):
+        """Close the session and release all pooled connections."""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
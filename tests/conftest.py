@@ -0,0 +1,49 @@
+"""
+This file is part of Filmot API wrapper.
+
+Filmot API is free software: you can redistribute it and/or modify
+it under the terms of the MIT License as published by the Massachusetts
+Institute of Technology.
+
+For full details, please see the LICENSE file located in the root
+directory of this project.
+
+Shared test fixtures.
+"""
+import pytest
+
+from benchmarks.mock_server import MockConfig, MockFilmotServer
+from filmot import Filmot
+
+
+class FakeClock:
+    """Clock that only moves when told to."""
+
+    def __init__(self):
+        """Start at 0."""
+        self.now = 0.0
+
+    def __call__(self):
+        """Get the current time."""
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    """Get a FakeClock for the rate limiters, throttles and circuit breakers."""
+    return FakeClock()
+
+
+@pytest.fixture
+def mock_server():
+    """Get a running MockFilmotServer, see benchmarks/mock_server.py."""
+    with MockFilmotServer(MockConfig(latency=0)) as server:
+        yield server
+
+
+@pytest.fixture
+def client(mock_server):
+    """Get a Filmot client sending its requests to the mock server."""
+    with Filmot() as filmot:
+        filmot.base_url = mock_server.url
+        yield filmot
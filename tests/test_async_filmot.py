@@ -0,0 +1,80 @@
+"""
+This file is part of Filmot API wrapper.
+
+Filmot API is free software: you can redistribute it and/or modify
+it under the terms of the MIT License as published by the Massachusetts
+Institute of Technology.
+
+For full details, please see the LICENSE file located in the root
+directory of this project.
+
+Tests of the AsyncFilmot client against the mock server.
+"""
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from filmot import AsyncFilmot  # noqa: E402
+
+CATEGORIES = ["Gaming", "Music", "Education"]
+
+
+def run_with_client(mock_server, coroutine_function):
+    """Run the coroutine function with an AsyncFilmot client of the mock server."""
+
+    async def main():
+        async with AsyncFilmot() as filmot:
+            filmot.base_url = mock_server.url
+            return await coroutine_function(filmot)
+
+    return asyncio.run(main())
+
+
+def test_search_categories_and_follow_ups(mock_server):
+    """Each category gets its own results, with the follow-up requests above the first page."""
+
+    async def search(filmot):
+        return await filmot.search("hello", category=CATEGORIES, limit=12)
+
+    results = run_with_client(mock_server, search)
+    assert list(results) == CATEGORIES
+    assert results.errors == {}
+    for category, responses in results.items():
+        assert [response.video_info.category for response in responses] == [category] * 12
+        assert [response.video_info.id for response in responses[-2:]] == ["m000000000", "m000000001"]
+    assert mock_server.requests == 3 * 3
+
+
+def test_iter_search_early_stop(mock_server):
+    """iter_search yields up to `limit` videos per category, and breaking out of it stops the requests."""
+
+    async def iter_search(filmot):
+        all_responses = [response async for response in filmot.iter_search("hello", category=CATEGORIES[:2], limit=11)]
+        requests = mock_server.requests
+        responses = filmot.iter_search("hello", limit=30)
+        async for _ in responses:
+            break
+        await responses.aclose()
+        return all_responses, requests
+
+    responses, requests = run_with_client(mock_server, iter_search)
+    assert sorted(response.category for response in responses) == ["Gaming"] * 11 + ["Music"] * 11
+    assert requests == 2 + 2
+    assert mock_server.requests == requests + 1
+
+
+def test_bulk_search(mock_server):
+    """search_bulk and the streamed iter_search_bulk return the same results."""
+
+    async def bulk(filmot):
+        responses = await filmot.search_bulk({"query": "hello", "category": "Music"})
+        streamed = [response async for response in filmot.iter_search_bulk({"query": "hello"}, chunk_size=256)]
+        return responses, streamed
+
+    responses, streamed = run_with_client(mock_server, bulk)
+    assert len(responses) == len(streamed) == 10
+    assert [response.video_info.id for response in responses] == [response.video_info.id for response in streamed]
+    assert {response.video_info.category for response in responses} == {"Music"}
+    assert streamed[0].hits.to_dict() == responses[0].hits.to_dict()
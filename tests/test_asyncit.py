@@ -0,0 +1,203 @@
+"""
+This file is part of Filmot API wrapper.
+
+Filmot API is free software: you can redistribute it and/or modify
+it under the terms of the MIT License as published by the Massachusetts
+Institute of Technology.
+
+For full details, please see the LICENSE file located in the root
+directory of this project.
+
+Tests of the Asyncit executor.
+"""
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from benchmarks.mock_server import MockConfig, MockFilmotServer
+from filmot import Filmot
+from filmot.asyncit import Asyncit
+from filmot.exceptions import FilmotConnectionException, FilmotHTTPException
+from filmot.retry import RetryPolicy
+
+
+def slow_call(calls: list, index: int, seconds: float = 0.1) -> int:
+    """Record the call, then sleep."""
+    calls.append(index)
+    time.sleep(seconds)
+    return index
+
+
+def test_results_in_submission_order():
+    """results() gives a TaskResult per call, in submission order."""
+    with Asyncit(pool_size=4, save_output=True) as asyncit:
+        for index in range(8):
+            asyncit.run(slow_call, [], index, (8 - index) / 100)
+        asyncit.wait()
+        results = asyncit.results()
+    assert [result.value for result in results] == list(range(8))
+    assert all(result.ok for result in results)
+
+
+def test_close_cancels_the_queued_calls():
+    """close(cancel_pending=True) cancels the calls waiting for a worker, the running call completes."""
+    calls = []
+    asyncit = Asyncit(pool_size=1)
+    for index in range(5):
+        asyncit.run(slow_call, calls, index, 0.2)
+    time.sleep(0.05)
+    asyncit.close(wait=True, cancel_pending=True)
+    time.sleep(0.3)
+    assert calls == [0]
+
+
+def test_exit_on_error_cancels_the_queued_calls():
+    """Leaving the context on an exception cancels the queued calls."""
+    calls = []
+
+    def run_and_fail():
+        with Asyncit(pool_size=1) as asyncit:
+            for index in range(5):
+                asyncit.run(slow_call, calls, index, 0.2)
+            time.sleep(0.05)
+            raise RuntimeError("stop")
+
+    with pytest.raises(RuntimeError, match="stop"):
+        run_and_fail()
+    time.sleep(0.3)
+    assert calls == [0]
+
+
+def test_close_without_cancel_runs_all_the_calls():
+    """A plain close waits for all the submitted calls."""
+    calls = []
+    asyncit = Asyncit(pool_size=2)
+    for index in range(4):
+        asyncit.run(slow_call, calls, index, 0.01)
+    asyncit.close()
+    assert sorted(calls) == [0, 1, 2, 3]
+
+
+def test_executor_created_once():
+    """Concurrent first uses of the executor share a single pool."""
+    asyncit = Asyncit(pool_size=2)
+    executors = []
+    barrier = threading.Barrier(8)
+
+    def get_executor():
+        barrier.wait()
+        executors.append(asyncit.executor)
+
+    threads = [threading.Thread(target=get_executor) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    asyncit.close()
+    assert len({id(executor) for executor in executors}) == 1
+
+
+def test_get_output_as_json():
+    """save_as_json gives the json representation of the values, str for the values json doesn't support."""
+    stamp = datetime(2024, 1, 2, 3, 4, 5)
+    values = [(1, 2), {"when": stamp}, None, {"ids": {"a"}}]
+    with Asyncit(pool_size=2, save_output=True, save_as_json=True) as asyncit:
+        for value in values:
+            asyncit.run(lambda item: item, value)
+        asyncit.wait()
+        output = asyncit.get_output()
+    assert output == [[1, 2], {"when": str(stamp)}, {"ids": "{'a'}"}]
+
+
+def flaky(calls: list, *errors):
+    """Record the call, raise the next error if any, else return the number of calls."""
+    calls.append(1)
+    if len(calls) <= len(errors):
+        raise errors[len(calls) - 1]
+    return len(calls)
+
+
+def test_retry_policy_sets_the_attempts():
+    """The retry policy decides the number of attempts."""
+    calls = []
+    errors = [FilmotConnectionException("down")] * 3
+    policy = RetryPolicy(max_attempts=4, base_delay=0, max_delay=0, deadline=None)
+    with Asyncit(save_output=True, retry_policy=policy) as asyncit:
+        asyncit.run(flaky, calls, *errors)
+        asyncit.wait()
+        (result,) = asyncit.results()
+    assert result.value == 4
+    assert result.ok
+
+
+@pytest.mark.parametrize("error", [FilmotHTTPException("not found", 404), ValueError("bad value")])
+def test_max_retry_skips_non_retryable_errors(error):
+    """max_retry only retries the retryable errors, a 4xx response or a bug fails at once."""
+    calls = []
+    with Asyncit(save_output=True, max_retry=3) as asyncit:
+        asyncit.run(flaky, calls, error)
+        asyncit.wait()
+        (result,) = asyncit.results()
+    assert calls == [1]
+    assert result.exception is error
+
+
+@pytest.fixture
+def slow_client():
+    """Get a Filmot client of a mock server answering after 20 ms."""
+    with MockFilmotServer(MockConfig(latency=0.02)) as server, Filmot() as filmot:
+        filmot.base_url = server.url
+        yield filmot
+
+
+class InFlight:
+    """Wrap a function, recording the max number of its concurrent calls."""
+
+    def __init__(self, func):
+        """Wrap the function."""
+        self.func = func
+        self.running = self.max_running = 0
+        self.lock = threading.Lock()
+        self.__name__ = func.__name__
+
+    def __call__(self, *args, **kwargs):
+        """Call the function, counting the concurrent calls."""
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        try:
+            return self.func(*args, **kwargs)
+        finally:
+            with self.lock:
+                self.running -= 1
+
+
+def test_max_pending_bounds_the_pending_calls(slow_client):
+    """run() blocks once max_pending calls are pending, whatever the pool size."""
+    search = InFlight(slow_client.search_one)
+    with Asyncit(pool_size=8, max_pending=3, save_output=True) as asyncit:
+        for index in range(12):
+            asyncit.run(search, {"query": f"q{index}"})
+            assert len(asyncit.futures) <= 3
+        asyncit.wait()
+        results = asyncit.results()
+    assert 1 < search.max_running <= 3
+    assert [result.value[0].query for result in results] == [f"q{index}" for index in range(12)]
+
+
+def test_max_pending_in_run_async(slow_client):
+    """run_async() awaits a free slot instead of blocking the loop."""
+    search = InFlight(slow_client.search_one)
+    with Asyncit(pool_size=8, max_pending=2, save_output=True) as asyncit:
+
+        async def feed():
+            for index in range(6):
+                await asyncit.run_async(search, {"query": f"q{index}"})
+                assert len(asyncit.futures) <= 2
+            await asyncit.wait_async()
+
+        asyncit.loop.run_until_complete(feed())
+        assert len(asyncit.results()) == 6
+    assert search.max_running <= 2
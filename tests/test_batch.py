@@ -0,0 +1,96 @@
+"""
+This file is part of Filmot API wrapper.
+
+Filmot API is free software: you can redistribute it and/or modify
+it under the terms of the MIT License as published by the Massachusetts
+Institute of Technology.
+
+For full details, please see the LICENSE file located in the root
+directory of this project.
+
+Tests of the batch runner.
+"""
+import gzip
+import json
+
+import pytest
+
+from filmot.batch import BatchRunner, read_queries
+from filmot.exceptions import FilmotException
+from filmot.query import SearchQuery
+
+
+def write_queries(path, queries: list):
+    """Write the search kwargs as a JSON lines queries file."""
+    path.write_text("".join(json.dumps(kwargs) + "\n" for kwargs in queries), encoding="utf-8")
+    return path
+
+
+def read_output(path) -> list:
+    """Read the records of a gzip JSON lines output."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_duplicate_queries_run_once(client, mock_server, tmp_path):
+    """A query listed twice runs once, and every completed query is checkpointed."""
+    queries = write_queries(tmp_path / "queries.jsonl", [{"query": "a"}, {"query": "b"}, {"query": "a"}])
+    output = tmp_path / "results.jsonl.gz"
+    stats = BatchRunner(client, concurrency=2).run(queries, output, limit=3)
+    assert (stats.total, stats.completed, stats.skipped, stats.failed) == (3, 2, 1, 0)
+    assert stats.lines == 6
+    assert sorted({record["query"] for record in read_output(output)}) == ["a", "b"]
+    assert BatchRunner.load_checkpoint(f"{output}.checkpoint") == {
+        query_hash for query_hash, _ in read_queries(queries)
+    }
+    assert mock_server.requests == 2
+
+
+def test_resume_runs_the_remaining_queries(client, mock_server, tmp_path, monkeypatch):
+    """A resumed run skips the checkpointed queries, runs the failed ones again and appends to the output."""
+    queries = write_queries(tmp_path / "queries.jsonl", [{"query": "a"}, {"query": "b"}])
+    output = tmp_path / "results.jsonl.gz"
+    search = client.search
+
+    def failing_b(query, **kwargs):
+        if query.query == "b":
+            raise ConnectionError("interrupted")
+        return search(query, **kwargs)
+
+    monkeypatch.setattr(client, "search", failing_b)
+    stats = BatchRunner(client).run(queries, output, limit=2)
+    assert (stats.completed, stats.failed) == (1, 1)
+    assert [kwargs["query"].query for kwargs in stats.failed_queries] == ["b"]
+
+    monkeypatch.setattr(client, "search", search)
+    mock_server.reset_counters()
+    stats = BatchRunner(client).run(queries, output, limit=2)
+    assert (stats.total, stats.skipped, stats.completed, stats.failed) == (2, 1, 1, 0)
+    assert mock_server.requests == 1
+    assert [record["query"] for record in read_output(output)] == ["a", "a", "b", "b"]
+    assert BatchRunner(client).run(queries, output, limit=2).skipped == 2
+
+
+def test_query_hash_is_the_normalized_query_key(tmp_path):
+    """Queries that only differ in the text spacing or in the categories order have the same hash."""
+    path = write_queries(
+        tmp_path / "queries.jsonl",
+        [
+            {"query": "Spill The Beans", "category": ["Gaming", "Music"]},
+            {"query": "  Spill  The Beans", "category": ["Music", "Gaming"]},
+            {"query": "Spill The Beans", "category": ["Music", "Gaming"], "limit": 5},
+        ],
+    )
+    (first_hash, first), (second_hash, _), (third_hash, third) = read_queries(path)
+    assert first_hash == second_hash == first["query"].key
+    assert isinstance(first["query"], SearchQuery)
+    assert third_hash != first_hash
+    assert third["limit"] == 5
+
+
+@pytest.mark.parametrize("line", [{"query": "q", "category": "Nope"}, {"query": "q", "unknown": 1}])
+def test_invalid_query_line(tmp_path, line):
+    """An invalid query is reported with its line number."""
+    path = write_queries(tmp_path / "queries.jsonl", [{"query": "q"}, line])
+    with pytest.raises(FilmotException, match="line 2"):
+        list(read_queries(path))
@@ -0,0 +1,215 @@
+"""
+This file is part of Filmot API wrapper.
+
+Filmot API is free software: you can redistribute it and/or modify
+it under the terms of the MIT License as published by the Massachusetts
+Institute of Technology.
+
+For full details, please see the LICENSE file located in the root
+directory of this project.
+
+Tests of the MemoryCache and DiskCache.
+"""
+import asyncio
+import gc
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from filmot import Filmot
+from filmot.cache import DiskCache, MemoryCache, make_cache_key
+
+
+def test_cache_key_ignores_none_and_order():
+    """Equivalent queries share a key."""
+    assert make_cache_key("cmd", {"a": 1, "b": None, "c": 2}) == make_cache_key("cmd", {"c": 2, "a": 1})
+    assert make_cache_key("cmd", {"a": 1}) != make_cache_key("other", {"a": 1})
+
+
+def test_memory_cache_lru_eviction():
+    """The least recently used entry is evicted first."""
+    cache = MemoryCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+
+
+def test_memory_cache_ttl():
+    """An expired entry is a miss, a zero TTL disables caching."""
+    cache = MemoryCache(ttl=60, command_ttl={"nocache": 0})
+    cache.set("a", 1, ttl=-1)
+    assert cache.get("a") is None
+    calls = []
+    assert cache.get_or_load("nocache", {}, lambda: calls.append(1) or "value") == "value"
+    assert cache.get_or_load("nocache", {}, lambda: calls.append(1) or "value") == "value"
+    assert len(calls) == 2
+
+
+def test_memory_cache_coalesces_threads():
+    """Concurrent identical calls from threads send a single request."""
+    cache = MemoryCache()
+    calls = []
+
+    def load():
+        calls.append(1)
+        time.sleep(0.1)
+        return {"value": 1}
+
+    threads = [threading.Thread(target=cache.get_or_load, args=("cmd", {"q": 1}, load)) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert cache.stats()["coalesced"] == 4
+
+
+def test_memory_cache_coalesces_threads_and_tasks():
+    """An asyncio task joins the load of a thread for the same key."""
+    cache = MemoryCache()
+    calls = []
+
+    def load():
+        calls.append("thread")
+        time.sleep(0.2)
+        return {"value": "thread"}
+
+    async def aload():
+        calls.append("task")
+        return {"value": "task"}
+
+    thread = threading.Thread(target=cache.get_or_load, args=("cmd", {"q": 1}, load))
+    thread.start()
+    time.sleep(0.05)
+    results = asyncio.run(asyncio.wait_for(cache.aget_or_load("cmd", {"q": 1}, aload), 5))
+    thread.join()
+    assert results == {"value": "thread"}
+    assert calls == ["thread"]
+
+
+def test_memory_cache_waiter_takes_over_cancelled_leader():
+    """When the leader is cancelled one waiter loads the value for the others."""
+    cache = MemoryCache()
+    calls = []
+
+    async def aload():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return len(calls)
+
+    async def run():
+        leader = asyncio.ensure_future(cache.aget_or_load("cmd", {"q": 1}, aload))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.ensure_future(cache.aget_or_load("cmd", {"q": 1}, aload)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await asyncio.gather(*waiters)
+
+    assert asyncio.run(run()) == [2, 2, 2]
+    assert len(calls) == 2
+
+
+def test_memory_cache_shares_errors():
+    """The waiters get the error of the load, and the next call loads again."""
+    cache = MemoryCache()
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError, match="boom"):
+        cache.get_or_load("cmd", {}, fail)
+    assert cache.get_or_load("cmd", {}, lambda: "value") == "value"
+
+
+@pytest.fixture
+def disk_cache(tmp_path):
+    """Get a DiskCache in a temporary directory."""
+    cache = DiskCache(path=str(tmp_path / "cache.sqlite"), max_size=1000, compress_level=0)
+    yield cache
+    cache.close()
+
+
+def stored_size(cache: DiskCache) -> int:
+    """Sum the stored sizes with a table scan."""
+    connection = sqlite3.connect(str(cache.path))
+    try:
+        return connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+    finally:
+        connection.close()
+
+
+def test_disk_cache_roundtrip(disk_cache):
+    """Values are stored as json, and expire after their TTL."""
+    disk_cache.set("a", {"value": [1, 2]})
+    disk_cache.set("b", "expired", ttl=-1)
+    assert disk_cache.get("a") == {"value": [1, 2]}
+    assert disk_cache.get("b") is None
+    assert disk_cache.get("missing") is None
+
+
+def test_disk_cache_size_and_eviction(disk_cache):
+    """The tracked size matches the stored payloads, and stays under max_size."""
+    for index in range(30):
+        disk_cache.set(f"key{index}", "x" * 100)
+    disk_cache.set("key29", "y")
+    size = disk_cache.stats()["size"]
+    assert size == stored_size(disk_cache)
+    assert size <= disk_cache.max_size
+    assert disk_cache.get("key29") == "y"
+    assert disk_cache.get("key0") is None
+
+
+def test_disk_cache_counters_persist(tmp_path):
+    """Hits and misses are flushed to the database."""
+    path = str(tmp_path / "cache.sqlite")
+    cache = DiskCache(path=path)
+    cache.get_or_load("cmd", {"q": 1}, lambda: "value")
+    cache.get_or_load("cmd", {"q": 1}, lambda: "value")
+    cache.close()
+    stats = DiskCache(path=path).stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+
+def test_disk_cache_purge_and_clear(disk_cache):
+    """Purge removes the expired entries, clear removes everything."""
+    disk_cache.set("a", 1, ttl=-1)
+    disk_cache.set("b", 2)
+    assert disk_cache.purge_expired() == 1
+    assert disk_cache.stats()["size"] == stored_size(disk_cache)
+    disk_cache.clear()
+    assert disk_cache.stats()["size"] == 0
+    assert disk_cache.get("b") is None
+
+
+def test_disk_cache_counters_flushed_when_not_closed(tmp_path):
+    """The pending counters of a cache that is never closed are written when it is collected."""
+    path = str(tmp_path / "cache.sqlite")
+    cache = DiskCache(path=path)
+    cache.get_or_load("cmd", {"q": 1}, lambda: "value")
+    cache.close()
+    cache = DiskCache(path=path)
+    cache.get_or_load("cmd", {"q": 1}, lambda: "value")
+    del cache
+    gc.collect()
+    stats = DiskCache(path=path).stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_client_closes_only_its_own_cache(tmp_path, monkeypatch):
+    """Filmot(cache=True) creates a DiskCache and closes it, a given cache is left open."""
+    monkeypatch.setattr("filmot.cache.DEFAULT_CACHE_PATH", str(tmp_path / "cache.sqlite"))
+    with Filmot(cache=True) as client:
+        client.cache.get_or_load("cmd", {"q": 1}, lambda: "value")
+        own_cache = client.cache
+    with pytest.raises(sqlite3.ProgrammingError):
+        own_cache.get("key")
+    shared_cache = DiskCache(path=str(tmp_path / "shared.sqlite"))
+    with Filmot(cache=shared_cache):
+        pass
+    assert shared_cache.get("key") is None
+    shared_cache.close()
@@ -0,0 +1,42 @@
+"""
+This file is part of Filmot API wrapper.
+
+Filmot API is free software: you can redistribute it and/or modify
+it under the terms of the MIT License as published by the Massachusetts
+Institute of Technology.
+
+For full details, please see the LICENSE file located in the root
+directory of this project.
+
+Tests of the filmot command line against the mock server.
+"""
+import pytest
+
+from filmot import cli
+from filmot.cache import DiskCache
+from filmot.filmot_base import BaseFilmot
+
+
+@pytest.fixture
+def _mock_api(mock_server, monkeypatch):
+    """Send the requests of the clients the command line creates to the mock server."""
+    init = BaseFilmot.__init__
+
+    def mock_init(self):
+        init(self)
+        self.base_url = mock_server.url
+
+    monkeypatch.setattr(BaseFilmot, "__init__", mock_init)
+
+
+@pytest.mark.usefixtures("_mock_api")
+def test_search_cache_hits_are_persisted(tmp_path, capsys):
+    """The cache hits of a run are in the next `cache stats`."""
+    cache_path = str(tmp_path / "cache.sqlite")
+    for _ in range(2):
+        assert cli.main(["search", "hello", "--limit", "3", "--format", "jsonl", "--cache-path", cache_path]) == 0
+    stats = DiskCache(path=cache_path).stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+    capsys.readouterr()
+    assert cli.main(["cache", "stats", "--cache-path", cache_path]) == 0
+    assert "hits: 1" in capsys.readouterr().out
@@ -0,0 +1,27 @@
+"""
+This file is part of Filmot API wrapper.
+
+Filmot API is free software: you can redistribute it and/or modify
+it under the terms of the MIT License as published by the Massachusetts
+Institute of Technology.
+
+For full details, please see the LICENSE file located in the root
+directory of this project.
+
+Tests of the exceptions.
+"""
+import pickle
+
+from filmot.exceptions import FilmotHTTPException, FilmotRateLimitException
+
+
+def test_http_exception_pickles():
+    """An HTTP exception keeps its status code through pickle, e.g. from a process pool."""
+    error = pickle.loads(pickle.dumps(FilmotHTTPException("failed", 503)))
+    assert (str(error), error.status_code) == ("failed", 503)
+
+
+def test_rate_limit_exception_pickles():
+    """A rate limit exception keeps its Retry-After through pickle."""
+    error = pickle.loads(pickle.dumps(FilmotRateLimitException("slow down", 2.5)))
+    assert (str(error), error.status_code, error.retry_after) == ("slow down", 429, 2.5)
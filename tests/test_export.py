@@ -0,0 +1,66 @@
+"""
+This file is part of Filmot API wrapper.
+
+Filmot API is free software: you can redistribute it and/or modify
+it under the terms of the MIT License as published by the Massachusetts
+Institute of Technology.
+
+For full details, please see the LICENSE file located in the root
+directory of this project.
+
+Tests of the JSON lines export, against the mock server.
+"""
+import io
+import gzip
+import json
+import importlib.util
+
+import pytest
+
+from filmot.exceptions import FilmotException
+from filmot.export import write_jsonl
+
+HAS_ZSTD = importlib.util.find_spec("zstandard") is not None
+
+
+def read_lines(data: bytes) -> list:
+    """Parse the JSON lines."""
+    return [json.loads(line) for line in data.decode("utf-8").splitlines()]
+
+
+def test_write_gzip_appends(client, tmp_path):
+    """A .gz path is gzip compressed, appending adds a gzip member that reads as more lines."""
+    path = tmp_path / "results.jsonl.gz"
+    assert write_jsonl(client.iter_search("hello", limit=3), path) == 3
+    assert write_jsonl(client.search("world", limit=2), path, append=True) == 2
+    records = read_lines(gzip.decompress(path.read_bytes()))
+    assert [record["query"] for record in records] == ["hello"] * 3 + ["world"] * 2
+    assert len(records[0]["hits"]) == 5
+    assert records[0]["video_info"]["id"].startswith("v")
+
+
+def test_write_flattened_hits_to_a_text_stream(client):
+    """flatten_hits writes a line per hit, a text file object is written through its buffer and left open."""
+    stream = io.TextIOWrapper(io.BytesIO(), encoding="utf-8")
+    assert write_jsonl(client.iter_search("hello", limit=2), stream, flatten_hits=True) == 10
+    records = read_lines(stream.buffer.getvalue())
+    assert set(records[0]) == {"query", "category", "video_id", "link", "text"}
+    assert not stream.closed
+
+
+@pytest.mark.skipif(not HAS_ZSTD, reason="zstandard is not installed")
+def test_write_zstd(client, tmp_path):
+    """A .zst path is zstd compressed."""
+    import zstandard
+
+    path = tmp_path / "results.jsonl.zst"
+    assert write_jsonl(client.iter_search("hello", limit=3), path) == 3
+    with zstandard.ZstdDecompressor().stream_reader(path.open("rb")) as reader:
+        assert len(read_lines(reader.read())) == 3
+
+
+@pytest.mark.skipif(HAS_ZSTD, reason="zstandard is installed")
+def test_write_zstd_without_zstandard(tmp_path):
+    """Without zstandard installed, the zstd compression fails with an install hint."""
+    with pytest.raises(FilmotException, match="pip install zstandard"):
+        write_jsonl([], tmp_path / "results.jsonl.zst")
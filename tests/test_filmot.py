@@ -0,0 +1,94 @@
+"""
+This file is part of Filmot API wrapper.
+
+Filmot API is free software: you can redistribute it and/or modify
+it under the terms of the MIT License as published by the Massachusetts
+Institute of Technology.
+
+For full details, please see the LICENSE file located in the root
+directory of this project.
+
+Tests of the Filmot client against the mock server.
+"""
+import asyncio
+from itertools import islice
+
+import pytest
+
+from benchmarks.mock_server import MockConfig, MockFilmotServer
+from filmot import Filmot
+from filmot.exceptions import FilmotHTTPException
+
+CATEGORIES = ["Gaming", "Music", "Education"]
+
+
+@pytest.fixture
+def failing_music(client, monkeypatch):
+    """Make the first page of the Music category fail."""
+    search_first_page = client._search_first_page
+
+    def first_page(query_params, limit):
+        if query_params.get("category") == "Music":
+            raise FilmotHTTPException("server error", 500)
+        return search_first_page(query_params, limit)
+
+    monkeypatch.setattr(client, "_search_first_page", first_page)
+    return client
+
+
+def test_search_categories(client):
+    """Each category gets its own results, in the requested order."""
+    results = client.search("hello", category=CATEGORIES, limit=3)
+    assert list(results) == CATEGORIES
+    assert [len(responses) for responses in results.values()] == [3, 3, 3]
+    assert all(response.video_info.category == "Music" for response in results["Music"])
+    assert results.errors == {}
+
+
+def test_failed_category_is_isolated(failing_music):
+    """A failed category is recorded in the errors, the others keep their results."""
+    results = failing_music.search("hello", category=CATEGORIES, limit=3)
+    assert results["Music"] == []
+    assert isinstance(results.errors["Music"], FilmotHTTPException)
+    assert len(results["Gaming"]) == len(results["Education"]) == 3
+
+
+def test_failed_category_is_isolated_in_running_loop(failing_music):
+    """Inside a running event loop (e.g. a notebook) a failed category is isolated the same way."""
+
+    async def search():
+        return failing_music.search("hello", category=CATEGORIES, limit=3)
+
+    results = asyncio.run(search())
+    assert list(results.errors) == ["Music"]
+    assert len(results["Gaming"]) == 3
+
+
+@pytest.mark.parametrize(("limit", "requests"), [(3, 1), (10, 1), (15, 6), (50, 21)])
+def test_limit_follow_up_requests(client, mock_server, limit, requests):
+    """A limit above the first page sends one queryVideoID request per missing video, up to the more_results."""
+    responses = client.search("hello", limit=limit)[None]
+    expected = [f"v{index:09d}" for index in range(10)] + [f"m{index:09d}" for index in range(20)]
+    assert [response.video_info.id for response in responses] == expected[:limit]
+    assert mock_server.requests == requests
+
+
+def test_iter_search_limit_per_category(client, mock_server):
+    """iter_search yields up to `limit` videos of each category, with their follow-up requests."""
+    responses = list(client.iter_search("hello", category=CATEGORIES[:2], limit=12))
+    assert sorted(response.video_info.category for response in responses) == ["Gaming"] * 12 + ["Music"] * 12
+    assert len({(response.category, response.video_info.id) for response in responses}) == 24
+    assert mock_server.requests == 2 + 2 * 2
+
+
+def test_iter_search_early_stop_cancels_the_queued_requests():
+    """Closing the generator cancels the requests that were not sent yet."""
+    with MockFilmotServer(MockConfig(latency=0.05)) as server:
+        with Filmot(concurrency=1) as filmot:
+            filmot.base_url = server.url
+            responses = filmot.iter_search("hello", limit=30, max_pending=5)
+            # the first page, and the first of its follow-ups (the other 4 are pending on the single worker)
+            assert len(list(islice(responses, 11))) == 11
+            responses.close()
+        # the client close waits for the request in flight, the queued ones were never sent
+        assert server.requests <= 3
@@ -0,0 +1,75 @@
+"""
+This file is part of Filmot API wrapper.
+
+Filmot API is free software: you can redistribute it and/or modify
+it under the terms of the MIT License as published by the Massachusetts
+Institute of Technology.
+
+For full details, please see the LICENSE file located in the root
+directory of this project.
+
+Tests of the columnar Table operations.
+"""
+import math
+from array import array
+
+import pytest
+
+from filmot.exceptions import FilmotException
+from filmot.frame import Table
+
+
+@pytest.fixture
+def table():
+    """Get a table with a numeric, a text (with None) and an id column."""
+    return Table(
+        {
+            "views": array("d", [10.0, math.nan, 30.0, 20.0, 30.0]),
+            "title": ["b", "a", None, "c", "a"],
+            "id": ["v0", "v1", "v2", "v3", "v4"],
+        }
+    )
+
+
+def test_where_numeric(table):
+    """Numeric comparisons never match NaN."""
+    assert table.where("views", ">=", 20)["id"] == ["v2", "v3", "v4"]
+    assert table.where("views", "!=", 30)["id"] == ["v0", "v3"]
+
+
+def test_where_text_skips_missing(table):
+    """Comparisons never match None."""
+    assert table.where("title", "<", "c")["id"] == ["v0", "v1", "v4"]
+    assert table.where("title", "in", {"a", "c"})["id"] == ["v1", "v3", "v4"]
+
+
+def test_where_predicate(table):
+    """A predicate gets each column value."""
+    assert table.where("id", lambda value: value.endswith("4"))["id"] == ["v4"]
+
+
+def test_where_invalid_operator(table):
+    """An unknown operator is an error."""
+    with pytest.raises(FilmotException, match="Invalid operator"):
+        table.where("views", "~", 1)
+
+
+def test_sort_missing_last(table):
+    """Missing values are sorted last, in both directions."""
+    assert table.sort("views")["id"] == ["v0", "v3", "v2", "v4", "v1"]
+    assert table.sort("views", reverse=True)["id"] == ["v2", "v4", "v3", "v0", "v1"]
+    assert table.sort("title")["id"] == ["v1", "v4", "v0", "v3", "v2"]
+
+
+def test_sort_keeps_column_types(table):
+    """The sorted columns keep their array / list type."""
+    result = table.sort("id", reverse=True)
+    assert isinstance(result["views"], array)
+    assert result.row(0) == {"views": 30.0, "title": "a", "id": "v4"}
+
+
+def test_select_and_take(table):
+    """Rows are selected by a mask or by indices."""
+    assert table.select([True, False, False, False, True])["id"] == ["v0", "v4"]
+    assert table.take([3])["id"] == ["v3"]
+    assert len(table.take([])) == 0
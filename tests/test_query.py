@@ -0,0 +1,80 @@
+"""
+This file is part of Filmot API wrapper.
+
+Filmot API is free software: you can redistribute it and/or modify
+it under the terms of the MIT License as published by the Massachusetts
+Institute of Technology.
+
+For full details, please see the LICENSE file located in the root
+directory of this project.
+
+Tests of the immutable SearchQuery.
+"""
+import pickle
+
+import pytest
+
+from filmot.exceptions import FilmotException
+from filmot.query import SearchQuery
+
+
+def test_query_is_immutable():
+    """A query can't be changed, replace() returns a changed copy."""
+    query = SearchQuery("Spill The Beans", category="Gaming", min_views=1000)
+    with pytest.raises(AttributeError, match="immutable"):
+        query.min_views = 10
+    with pytest.raises(AttributeError, match="immutable"):
+        del query.query
+    channel_query = query.replace(channel_id="UC1")
+    assert (channel_query.channel_id, channel_query.min_views, channel_query.category) == ("UC1", 1000, "Gaming")
+    assert query.channel_id is None
+    assert query.params() is not query.params()
+
+
+def test_equal_queries_share_the_hash_and_key():
+    """The text spacing and the categories order don't change the query, its filters do."""
+    query = SearchQuery("Spill The Beans", category=["Gaming", "Music"])
+    same = SearchQuery('  "Spill  The Beans"', category=["Music", "Gaming", "Music"])
+    assert query == same
+    assert hash(query) == hash(same)
+    assert query.key == same.key
+    assert len({query, same}) == 1
+    other = query.replace(min_views=1)
+    assert other != query
+    assert other.key != query.key
+
+
+def test_query_params():
+    """The API parameters use the API names, with one request per category."""
+    query = SearchQuery("Spill The Beans", category=["Gaming", "Music"], channel_id="UC1")
+    assert query.category_params() == {
+        "Gaming": {"query": '"Spill The Beans"', "channelID": "UC1", "category": "Gaming"},
+        "Music": {"query": '"Spill The Beans"', "channelID": "UC1", "category": "Music"},
+    }
+    with pytest.raises(FilmotException):
+        query.single_params()
+    assert pickle.loads(pickle.dumps(query)) == query
+
+
+@pytest.mark.parametrize(
+    "arguments",
+    [
+        {"query": " "},
+        {"query": "q", "category": "Nope"},
+        {"query": "q", "language": "xx"},
+        {"query": "q", "license": 3},
+    ],
+)
+def test_invalid_query(arguments):
+    """The arguments are validated when the query is built."""
+    with pytest.raises(FilmotException):
+        SearchQuery(**arguments)
+
+
+def test_search_with_a_query(client):
+    """A query is searched as is, the search filters override its own."""
+    query = SearchQuery("hello", category="Gaming")
+    responses = client.search(query.replace(category="Music"), limit=2)["Music"]
+    assert [response.video_info.category for response in responses] == ["Music", "Music"]
+    assert list(client.search(query, min_views=1, limit=1)) == ["Gaming"]
+    assert query.min_views is None
@@ -0,0 +1,137 @@
+"""
+This file is part of Filmot API wrapper.
+
+Filmot API is free software: you can redistribute it and/or modify
+it under the terms of the MIT License as published by the Massachusetts
+Institute of Technology.
+
+For full details, please see the LICENSE file located in the root
+directory of this project.
+
+Tests of the RateLimiter and the AdaptiveThrottle.
+"""
+from typing import Callable
+
+import pytest
+
+from filmot.exceptions import FilmotException, FilmotRateLimitException
+from filmot.ratelimit import AdaptiveThrottle, RateLimiter, parse_retry_after
+
+
+def calls_in_first_period(limit: dict, clock: Callable[[], float], calls: int = 50) -> int:
+    """Count the calls a limiter allows to start within the first period."""
+    limiter = RateLimiter([limit], clock=clock)
+    waits = [limiter.reserve() for _ in range(calls)]
+    return sum(1 for wait in waits if wait < limit["period_sec"])
+
+
+def test_default_burst_never_exceeds_max_calls(clock):
+    """Without a burst, the first period holds max_calls calls."""
+    assert calls_in_first_period({"period_sec": 1, "max_calls": 8}, clock) == 8
+
+
+def test_burst_allows_extra_calls_in_first_period(clock):
+    """A burst lets burst - 1 more calls in the first period."""
+    assert calls_in_first_period({"period_sec": 1, "max_calls": 8, "burst": 3}, clock) == 10
+
+
+def test_calls_are_spread_evenly(clock):
+    """The calls are allowed one interval apart."""
+    limiter = RateLimiter([{"period_sec": 1, "max_calls": 4}], clock=clock)
+    assert [limiter.reserve() for _ in range(4)] == [0.0, 0.25, 0.5, 0.75]
+
+
+def test_burst_after_idle_period(clock):
+    """After an idle period, burst calls go at once."""
+    limiter = RateLimiter([{"period_sec": 1, "max_calls": 4, "burst": 2}], clock=clock)
+    for _ in range(4):
+        limiter.reserve()
+    clock.now = 10.0
+    assert [limiter.reserve() for _ in range(3)] == [0.0, 0.0, 0.25]
+
+
+def test_stacked_limits_use_the_strictest(clock):
+    """A call waits for all the limits."""
+    limiter = RateLimiter(
+        [{"period_sec": 1, "max_calls": 4}, {"period_sec": 10, "max_calls": 5}],
+        clock=clock,
+    )
+    waits = [limiter.reserve() for _ in range(6)]
+    assert waits[-1] == 10.0
+
+
+@pytest.mark.parametrize("burst", [0, 9])
+def test_invalid_burst(burst):
+    """The burst is between 1 and max_calls."""
+    with pytest.raises(FilmotException, match="Invalid burst"):
+        RateLimiter([{"period_sec": 1, "max_calls": 8, "burst": burst}])
+
+
+def test_no_limits():
+    """A limiter without limits never waits."""
+    limiter = RateLimiter()
+    assert not limiter
+    assert limiter.reserve() == 0.0
+
+
+def test_parse_retry_after():
+    """Retry-After is a number of seconds, invalid values fall back to the default."""
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None, default=2.0) == 2.0
+    assert parse_retry_after("not a date", default=2.0) == 2.0
+
+
+def test_throttle_blocks_after_rate_limited(clock):
+    """A 429 blocks all the callers for its Retry-After."""
+    throttle = AdaptiveThrottle(clock=clock)
+    throttle.on_rate_limited(5.0)
+    assert throttle.reserve() == 5.0
+    clock.now = 5.0
+    assert throttle.reserve() == 0.0
+
+
+MONTHLY_RESET = str(20 * 24 * 3600)
+
+
+def quota_headers(remaining: int, limit: int = 10000, reset: str = MONTHLY_RESET) -> dict:
+    """Get RapidAPI quota headers."""
+    return {
+        "X-RateLimit-Requests-Limit": str(limit),
+        "X-RateLimit-Requests-Remaining": str(remaining),
+        "X-RateLimit-Requests-Reset": reset,
+    }
+
+
+def test_throttle_resumes_after_retry_after(clock):
+    """A 429 blocks for its Retry-After only, not until the quota resets."""
+    throttle = AdaptiveThrottle(clock=clock)
+    throttle.update(quota_headers(remaining=5000))
+    throttle.on_rate_limited(1.0)
+    assert throttle.reserve() == 1.0
+    clock.now = 1.0
+    assert throttle.reserve() == 0.0
+
+
+def test_throttle_pacing_is_capped(clock):
+    """A low quota that resets in days is paced at most max_wait apart."""
+    throttle = AdaptiveThrottle(max_wait=10.0, clock=clock)
+    throttle.update(quota_headers(remaining=900))
+    assert [throttle.reserve() for _ in range(3)] == [0.0, 10.0, 10.0]
+
+
+@pytest.mark.parametrize(
+    ("headers", "retry_after"),
+    [
+        (quota_headers(remaining=0), None),
+        ({}, 3600.0),
+    ],
+)
+def test_throttle_raises_instead_of_long_sleeps(clock, headers, retry_after):
+    """A used up quota, or a Retry-After, longer than max_wait is raised instead of slept."""
+    throttle = AdaptiveThrottle(max_wait=10.0, clock=clock)
+    throttle.update(headers)
+    if retry_after:
+        throttle.on_rate_limited(retry_after)
+    with pytest.raises(FilmotRateLimitException) as exc_info:
+        throttle.reserve()
+    assert exc_info.value.retry_after > 10.0
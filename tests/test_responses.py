@@ -0,0 +1,108 @@
+"""
+This file is part of Filmot API wrapper.
+
+Filmot API is free software: you can redistribute it and/or modify
+it under the terms of the MIT License as published by the Massachusetts
+Institute of Technology.
+
+For full details, please see the LICENSE file located in the root
+directory of this project.
+
+Tests of the SearchResponse hits.
+"""
+import gc
+import json
+import math
+import tracemalloc
+
+from benchmarks.mock_server import make_result
+from filmot.dicts import DotDict
+from filmot.responses import HitList, SearchResponse
+
+HITS = [
+    {"start": "12.50", "ctx_before": "a", "ctx_after": "b", "break": 0},
+    {"start": "0.00", "ctx_before": "", "ctx_after": "c", "break": 0},
+    {"ctx_before": "x", "ctx_after": "y", "break": 1},
+]
+
+
+def test_hits_sorted_by_start_keeping_the_api_values():
+    """The hits are sorted by start time, with the values as the API returned them."""
+    hits = HitList(HITS)
+    assert [hit.get("start") for hit in hits] == ["0.00", "12.50", None]
+    assert hits[0].ctx_after == "c"
+    assert hits.value(1, "start") == "12.50"
+    assert hits.to_dict() == [HITS[1], HITS[0], HITS[2]]
+
+
+def test_start_times():
+    """start() is the float start time, NaN for a hit without one."""
+    hits = HitList(HITS)
+    assert hits.start(0) == 0.0
+    assert hits.start(1) == 12.5
+    assert math.isnan(hits.start(2))
+
+
+def test_hits_data_without_start():
+    """A hit without a start time links to the start of the video."""
+    response = SearchResponse("q", {"id": "v", "category": "Gaming", "hits": HITS})
+    assert response.hit_count() == 3
+    assert [hit["link"] for hit in response.hits_data()] == [
+        "https://www.youtube.com/watch?v=v&t=0s",
+        "https://www.youtube.com/watch?v=v&t=11s",
+        "https://www.youtube.com/watch?v=v&t=0s",
+    ]
+
+
+def test_hits_parsed_on_first_access():
+    """The hits are parsed on first access, releasing the raw hits, hit_count() doesn't parse them."""
+    response = SearchResponse("q", {"id": "v", "category": "Gaming", "hits": HITS})
+    assert response._hits is None
+    assert response.hit_count() == 3
+    assert response._hits is None
+    assert isinstance(response.hits, HitList)
+    assert response._raw_hits is None
+    assert response.hit_count() == 3
+
+
+def test_sort_is_stable():
+    """Hits with the same start time keep the API order."""
+    hits = [{"start": 5, "id": index % 2} for index in range(4)] + [{"start": 1, "id": 9}]
+    assert [(hit.start, hit.id) for hit in HitList(hits)] == [(1, 9), (5, 0), (5, 1), (5, 0), (5, 1)]
+
+
+def test_hits_of_the_same_keys_share_the_key_index():
+    """Hit lists with the same hit keys share one key index, a hit missing a key doesn't get it."""
+    first, second = HitList(HITS[:2]), HitList([dict(HITS[0])])
+    assert first.keys() is second.keys()
+    assert "start" not in HitList(HITS)[2]
+    assert HitList(HITS).value(2, "start", "none") == "none"
+
+
+def test_to_dict_hits_are_plain_lists():
+    """to_dict() returns the hits as plain dicts, and a HitList compares equal to the same hits list."""
+    response = SearchResponse("q", {"id": "v", "category": "Gaming", "hits": HITS})
+    hits = response.to_dict()["hits"]
+    assert type(hits) is list
+    assert hits == [HITS[1], HITS[0], HITS[2]]
+    assert response.hits == hits
+    assert json.loads(response.to_json())["hits"] == hits
+
+
+def test_hits_memory():
+    """A HitList takes well under half the memory of a list of DotDict hits."""
+    text = json.dumps([make_result(f"v{index}", "q", "Gaming", 5)["hits"] for index in range(500)])
+
+    def memory(build) -> int:
+        raw = json.loads(text)
+        gc.collect()
+        tracemalloc.start()
+        try:
+            built = [build(hits) for hits in raw]
+            used = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        assert len(built) == len(raw)
+        return used
+
+    assert memory(HitList) < memory(lambda hits: [DotDict(hit) for hit in hits]) / 2
@@ -0,0 +1,166 @@
+"""
+This file is part of Filmot API wrapper.
+
+Filmot API is free software: you can redistribute it and/or modify
+it under the terms of the MIT License as published by the Massachusetts
+Institute of Technology.
+
+For full details, please see the LICENSE file located in the root
+directory of this project.
+
+Tests of the RetryPolicy and the CircuitBreaker.
+"""
+import asyncio
+
+import pytest
+
+from filmot.exceptions import (
+    FilmotCircuitOpenException,
+    FilmotConnectionException,
+    FilmotException,
+    FilmotHTTPException,
+    FilmotRateLimitException,
+)
+from filmot.retry import CircuitBreaker, RetryPolicy
+
+
+def failing(*errors):
+    """Get a function that raises the given errors in order, then returns "ok"."""
+    errors = list(errors)
+
+    def func():
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+
+    return func
+
+
+@pytest.fixture
+def _no_sleep(monkeypatch):
+    """Skip the retry delays."""
+    monkeypatch.setattr("filmot.retry.time.sleep", lambda seconds: None)
+
+
+@pytest.mark.usefixtures("_no_sleep")
+def test_retries_retryable_errors():
+    """Connection errors and 5xx responses are retried."""
+    policy = RetryPolicy(max_attempts=3, deadline=None)
+    assert policy.call(failing(FilmotConnectionException("down"), FilmotHTTPException("busy", 503))) == "ok"
+
+
+@pytest.mark.usefixtures("_no_sleep")
+def test_does_not_retry_client_errors():
+    """A 4xx response is raised at once."""
+    policy = RetryPolicy(max_attempts=3, deadline=None)
+    with pytest.raises(FilmotHTTPException, match="bad request"):
+        policy.call(failing(FilmotHTTPException("bad request", 400)))
+
+
+@pytest.mark.usefixtures("_no_sleep")
+def test_gives_up_after_max_attempts():
+    """The last failure is raised after max_attempts."""
+    policy = RetryPolicy(max_attempts=2, deadline=None)
+    with pytest.raises(FilmotConnectionException, match="down"):
+        policy.call(failing(*[FilmotConnectionException("down")] * 3))
+
+
+def test_rate_limit_backoff_uses_retry_after():
+    """A 429 is retried after its Retry-After."""
+    policy = RetryPolicy()
+    assert policy.backoff(FilmotRateLimitException("slow down", 7.0)) == 7.0
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    """The circuit opens after failure_threshold upstream failures."""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_error(FilmotHTTPException("down", 502))
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(FilmotCircuitOpenException):
+        breaker.before_call()
+
+
+@pytest.mark.parametrize(
+    "error",
+    [FilmotRateLimitException("slow down", 1.0), FilmotHTTPException("not found", 404), FilmotException("bad json")],
+)
+def test_breaker_ignores_non_upstream_errors(error, clock):
+    """Rate limited and client errors are counted neither as failures nor as successes."""
+    breaker = CircuitBreaker(failure_threshold=2, clock=clock)
+    breaker.record(success=False)
+    for _ in range(3):
+        breaker.before_call()
+        breaker.record_error(error)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.failures == 1
+
+
+def test_breaker_half_open_trial(clock):
+    """After reset_timeout a single trial is allowed, a rate limited trial lets the next call try."""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.before_call()
+    breaker.record_error(FilmotConnectionException("down"))
+    clock.now = 10.0
+    breaker.before_call()
+    with pytest.raises(FilmotCircuitOpenException):
+        breaker.before_call()
+    breaker.record_error(FilmotRateLimitException("slow down", 1.0))
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.before_call()
+    breaker.record(success=True)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.usefixtures("_no_sleep")
+def test_policy_records_errors_in_breaker(clock):
+    """The retry loop records only the upstream failures in the breaker."""
+    breaker = CircuitBreaker(failure_threshold=2, clock=clock)
+    policy = RetryPolicy(max_attempts=4, deadline=None)
+    errors = [FilmotRateLimitException("slow down", 0.0)] * 3
+    assert policy.call(failing(*errors), circuit_breaker=breaker) == "ok"
+    assert breaker.failures == 0
+    with pytest.raises(FilmotCircuitOpenException):
+        policy.call(failing(*[FilmotConnectionException("down")] * 4), circuit_breaker=breaker)
+
+
+def open_breaker(clock) -> CircuitBreaker:
+    """Get a breaker whose reset_timeout passed, the next call is its half-open trial."""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.before_call()
+    breaker.record_error(FilmotConnectionException("down"))
+    clock.now = 10.0
+    return breaker
+
+
+def test_interrupted_trial_lets_the_next_call_try(clock):
+    """A trial interrupted by a BaseException doesn't leave the breaker stuck half-open."""
+    breaker = open_breaker(clock)
+
+    def interrupted():
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        RetryPolicy().call(interrupted, circuit_breaker=breaker)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert RetryPolicy().call(lambda: "ok", circuit_breaker=breaker) == "ok"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_cancelled_trial_lets_the_next_call_try(clock):
+    """A cancelled async trial doesn't leave the breaker stuck half-open."""
+    breaker = open_breaker(clock)
+
+    async def ok():
+        return "ok"
+
+    async def run():
+        trial = asyncio.ensure_future(RetryPolicy().call_async(lambda: asyncio.sleep(10), circuit_breaker=breaker))
+        await asyncio.sleep(0.01)
+        trial.cancel()
+        await asyncio.wait([trial])
+        return await RetryPolicy().call_async(ok, circuit_breaker=breaker)
+
+    assert asyncio.run(run()) == "ok"
+    assert breaker.state == CircuitBreaker.CLOSED
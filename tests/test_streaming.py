@@ -0,0 +1,88 @@
+"""
+This file is part of Filmot API wrapper.
+
+Filmot API is free software: you can redistribute it and/or modify
+it under the terms of the MIT License as published by the Massachusetts
+Institute of Technology.
+
+For full details, please see the LICENSE file located in the root
+directory of this project.
+
+Tests of the streaming json array parser.
+"""
+import json
+
+import pytest
+
+from filmot.streaming import JSONArrayParser, iter_json_array
+
+DOCUMENT = {
+    "total": 7,
+    "result": [1.5, -20, 3e10, 1.25e-3, True, None, "a, ]", {"id": "x", "hits": [{"start": "0.00"}]}, [1, [2]], 0],
+    "more_results": [{"id": "y"}],
+}
+
+
+def chunked(text: str, size: int) -> list:
+    """Split the text in chunks of the given size."""
+    chunks = []
+    for start in range(0, len(text), size):
+        stop = start + size
+        chunks.append(text[start:stop])
+    return chunks
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 7, 64])
+def test_items_split_across_chunks(size):
+    """The items are the same whatever the chunk size."""
+    text = json.dumps(DOCUMENT)
+    assert list(iter_json_array(chunked(text, size))) == DOCUMENT["result"]
+
+
+def test_every_split_position():
+    """The items are the same wherever the document is split."""
+    text = json.dumps(DOCUMENT)
+    for split in range(len(text)):
+        chunks = [text[:split].encode("utf-8"), text[split:].encode("utf-8")]
+        assert list(iter_json_array(chunks)) == DOCUMENT["result"], split
+
+
+def test_number_is_held_until_its_delimiter():
+    """A number at the end of a chunk is only decoded once it is complete."""
+    parser = JSONArrayParser()
+    assert parser.feed('{"result": [12, 1.') == [12]
+    assert parser.feed("5e") == []
+    assert parser.feed("3]}") == [1.5e3]
+    assert parser.done
+
+
+def test_multibyte_characters_split_across_chunks():
+    """A utf-8 character split between chunks is decoded once complete."""
+    data = json.dumps({"result": ["שלום", "ñ"]}, ensure_ascii=False).encode("utf-8")
+    assert list(iter_json_array([bytes([byte]) for byte in data])) == ["שלום", "ñ"]
+
+
+def test_data_after_the_array_is_dropped():
+    """Once the array ended, the rest of the document is not buffered."""
+    parser = JSONArrayParser()
+    assert parser.feed('{"result": [1, 2], "more_results": [') == [1, 2]
+    assert parser.done
+    assert parser.feed("x" * 1000) == []
+    assert parser._buffer == ""
+    assert parser.close() == []
+
+
+def test_missing_key():
+    """A document without the key has no items."""
+    assert list(iter_json_array(['{"other": [1, 2]}'])) == []
+
+
+def test_null_array():
+    """A null array has no items."""
+    assert list(iter_json_array(['{"result": null}'])) == []
+
+
+def test_truncated_document():
+    """A document that ends inside the array is an error."""
+    with pytest.raises(ValueError, match="Invalid or truncated item"):
+        list(iter_json_array(['{"result": [1, {"a": ']))